@@ -0,0 +1,155 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+import requests
+from rich import print
+from mock_server import start_mock_server
+from main_abuseip import (
+    check_abuseipdb_key,
+    get_info_from_ip,
+    get_info_from_ips_list,
+    get_info_from_ips_list_concurrent,
+)
+from key_status import KeyStatusCache
+from http_client import HttpClient
+from virustotal_model import VirusTotalIP, VirusTotalIPLazy
+
+
+def benchmark_abuse_bulk(ip_count: int = 200, latency: float = 0.05, max_workers: int = 20):
+    """
+    Compare sequential and concurrent AbuseIPDB bulk lookups against
+    local stand-in server.
+    Args:
+        ip_count: Number of IP addresses to check
+        latency: Simulated API latency in seconds
+        max_workers: Concurrency limit for the concurrent mode
+    """
+    server = start_mock_server(latency=latency)
+    url = f"http://127.0.0.1:{server.server_port}/api/v2/check"
+    ips = [f"10.0.{i // 256}.{i % 256}" for i in range(ip_count)]
+    client = HttpClient('mock')
+
+    try:
+        start = time.perf_counter()
+        sequential = get_info_from_ips_list(ips, 'test-key', url, client=client)
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = get_info_from_ips_list_concurrent(ips, 'test-key', url, max_workers=max_workers,
+                                                       client=client)
+        concurrent_time = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    in_order = [r['ip-identity']['ipAddress'] for r in concurrent] == ips
+
+    print(f"IPs: {ip_count}, latency: {latency}s, workers: {max_workers}")
+    print(f"Sequential: {sequential_time:.2f}s ({len(sequential) / sequential_time:.1f} IP/s)")
+    print(f"Concurrent: {concurrent_time:.2f}s ({len(concurrent) / concurrent_time:.1f} IP/s)")
+    print(f"Speedup: {sequential_time / concurrent_time:.1f}x, results in input order: {in_order}")
+
+
+def virustotal_payload(engine_count: int = 90) -> dict:
+    """Build VirusTotalIP input with `engine_count` engine results."""
+    categories = ['undetected', 'harmless', 'malicious', 'suspicious', 'timeout']
+    results = {
+        f"Engine{i}": {
+            'method': 'blacklist',
+            'engine_name': f"Engine{i}",
+            'category': categories[i % len(categories)] if i < 10 else 'undetected',
+            'result': 'unrated',
+        }
+        for i in range(engine_count)
+    }
+    return {
+        'ip': '78.62.199.128',
+        'reputation': 0,
+        'last_analysis_stats': {'malicious': 2, 'suspicious': 2, 'undetected': 84, 'harmless': 2, 'timeout': 0},
+        'last_analysis_results': results,
+        'network': '78.62.0.0/16',
+        'country': 'LT',
+        'asn': 8764,
+        'as_owner': 'Telia Lietuva, AB',
+        'total_votes': {'harmless': 0, 'malicious': 0},
+        'tags': [],
+    }
+
+
+def benchmark_vt_validation(records: int = 5000, engine_count: int = 90):
+    """
+    Measure per-record validation cost of VirusTotalIP (full validation)
+    and VirusTotalIPLazy (summary only), including malicious/suspicious
+    engine lookups.
+    Args:
+        records: Number of records to validate
+        engine_count: Engine results per record
+    """
+    payload = virustotal_payload(engine_count)
+
+    for model_class in (VirusTotalIP, VirusTotalIPLazy):
+        start = time.perf_counter()
+        for _ in range(records):
+            model = model_class(**payload)
+            model.get_malicious_engines()
+            model.get_suspicious_engines()
+        elapsed = time.perf_counter() - start
+        print(f"{model_class.__name__}: {elapsed / records * 1_000_000:.1f} µs/record "
+              f"({records / elapsed:.0f} records/s)")
+
+
+def benchmark_startup(latency: float = 0.05, runs: int = 10):
+    """
+    Measure time from script start to first AbuseIPDB result.
+    Compares eager key validation on a new connection per request (old
+    behaviour), validation cached on disk, and lazy validation folded into
+    the first request over pooled keep-alive session.
+    Args:
+        latency: Simulated API latency in seconds
+        runs: Number of simulated script starts per mode
+    """
+    server = start_mock_server(latency=latency)
+    url = f"http://127.0.0.1:{server.server_port}/api/v2/check"
+
+    def eager_run(key_cache):
+        if check_abuseipdb_key('test-key', url, key_status=key_cache):
+            requests.get(url, headers={'Key': 'test-key'}, params={'ipAddress': '8.8.4.4'}, timeout=10)
+
+    def lazy_run(key_cache):
+        client = HttpClient('mock', key_status=key_cache)
+        if check_abuseipdb_key('test-key', url, lazy=True, key_status=key_cache):
+            get_info_from_ip('8.8.4.4', 'test-key', url, client=client)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cached_status = KeyStatusCache(Path(tmp_dir) / 'cached.json')
+            cached_status.set('abuseipdb', 'test-key', True)
+
+            modes = {
+                'eager validation': (eager_run, lambda i: KeyStatusCache(Path(tmp_dir) / f"eager{i}.json")),
+                'cached validation': (eager_run, lambda i: cached_status),
+                'lazy validation': (lazy_run, lambda i: KeyStatusCache(Path(tmp_dir) / f"lazy{i}.json")),
+            }
+            for name, (run, key_cache_for_run) in modes.items():
+                start = time.perf_counter()
+                for i in range(runs):
+                    run(key_cache_for_run(i))
+                elapsed = (time.perf_counter() - start) / runs
+                print(f"{name}: {elapsed * 1000:.1f} ms to first result")
+    finally:
+        server.shutdown()
+
+
+BENCHMARKS = {
+    'abuse-bulk': benchmark_abuse_bulk,
+    'vt-validation': benchmark_vt_validation,
+    'startup': benchmark_startup,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+
+    for name in names:
+        print(f"\n[bold]--- {name} ---[/bold]")
+        BENCHMARKS[name]()
@@ -0,0 +1,147 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from constants import CACHE_FILE, CACHE_MAX_ENTRIES, CACHE_TTLS
+
+
+class ReputationCache:
+    """
+    Persistent TTL cache for IP reputation results stored in SQLite.
+
+    Entries are keyed by (provider, ip) and expire after the provider TTL
+    from constants.CACHE_TTLS. When the cache grows above `max_entries`,
+    least recently used entries are evicted.
+
+    Example:
+        cache = ReputationCache()
+        cache.set('abuseipdb', '8.8.8.8', {'data': {...}})
+        cache.get('abuseipdb', '8.8.8.8')  # -> {'data': {...}}
+        cache.stats()  # -> {'abuseipdb': {'hits': 1, 'misses': 0}}
+    """
+
+    def __init__(self, path: str | Path = CACHE_FILE, ttls: Optional[Dict[str, int]] = None,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttls = ttls if ttls is not None else CACHE_TTLS
+        self.max_entries = max_entries
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+        if str(self.path) != ':memory:':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS reputation_cache (
+                provider TEXT NOT NULL,
+                ip TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (provider, ip)
+            )
+        """)
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS idx_reputation_cache_accessed ON reputation_cache (accessed_at)'
+        )
+        self.connection.commit()
+
+    def get(self, provider: str, ip: str) -> Optional[dict]:
+        """
+        Get cached payload for IP address.
+        Args:
+            provider: Provider name, e.g. 'abuseipdb' or 'virustotal'
+            ip: IP address
+        Returns:
+            dict: Cached payload or None if missing or expired
+        """
+        now = time.time()
+        ttl = self.ttls.get(provider, 0)
+
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT payload, created_at FROM reputation_cache WHERE provider = ? AND ip = ?',
+                (provider, ip),
+            ).fetchone()
+
+            if row is None or now - row[1] > ttl:
+                if row is not None:
+                    self.connection.execute(
+                        'DELETE FROM reputation_cache WHERE provider = ? AND ip = ?', (provider, ip)
+                    )
+                    self.connection.commit()
+                self.misses[provider] = self.misses.get(provider, 0) + 1
+                return None
+
+            self.connection.execute(
+                'UPDATE reputation_cache SET accessed_at = ? WHERE provider = ? AND ip = ?',
+                (now, provider, ip),
+            )
+            self.connection.commit()
+            self.hits[provider] = self.hits.get(provider, 0) + 1
+
+        return json.loads(row[0])
+
+    def set(self, provider: str, ip: str, payload: dict):
+        """
+        Store payload for IP address and evict old entries if cache is full.
+        Args:
+            provider: Provider name
+            ip: IP address
+            payload: JSON serializable validated result
+        """
+        now = time.time()
+
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO reputation_cache VALUES (?, ?, ?, ?, ?)',
+                (provider, ip, json.dumps(payload), now, now),
+            )
+            self._evict()
+            self.connection.commit()
+
+    def _evict(self):
+        count = self.connection.execute('SELECT COUNT(*) FROM reputation_cache').fetchone()[0]
+        overflow = count - self.max_entries
+
+        if overflow > 0:
+            self.connection.execute(
+                """DELETE FROM reputation_cache WHERE rowid IN (
+                    SELECT rowid FROM reputation_cache ORDER BY accessed_at LIMIT ?
+                )""",
+                (overflow,),
+            )
+
+    def items(self, provider: str) -> Iterator[Tuple[str, dict]]:
+        """
+        Iterate over not expired (ip, payload) entries of a provider.
+        Args:
+            provider: Provider name
+        Yields:
+            tuple: (ip, payload)
+        """
+        min_created = time.time() - self.ttls.get(provider, 0)
+
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT ip, payload FROM reputation_cache WHERE provider = ? AND created_at >= ?',
+                (provider, min_created),
+            ).fetchall()
+
+        for ip, payload in rows:
+            yield ip, json.loads(payload)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hit/miss counters per provider."""
+        providers = set(self.hits) | set(self.misses)
+        return {
+            provider: {'hits': self.hits.get(provider, 0), 'misses': self.misses.get(provider, 0)}
+            for provider in sorted(providers)
+        }
+
+    def close(self):
+        self.connection.close()
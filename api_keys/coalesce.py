@@ -0,0 +1,114 @@
+import ipaddress
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+def normalize_ip(ip: str) -> Optional[str]:
+    """
+    Convert IP address to canonical form.
+    Args:
+        ip: IPv4 or IPv6 address, e.g. ' 2001:DB8:0:0::1 '
+    Returns:
+        str: Canonical address ('2001:db8::1'), IPv4-mapped IPv6 addresses
+            are returned as IPv4. None if value is not a valid IP address.
+    """
+    if not isinstance(ip, str):
+        return None
+
+    try:
+        address = ipaddress.ip_address(ip.strip())
+    except ValueError:
+        return None
+
+    if address.version == 6 and address.ipv4_mapped is not None:
+        address = address.ipv4_mapped
+
+    return address.compressed
+
+
+def dedupe_ips(ip_list: List[str]) -> Tuple[List[str], Dict[str, List[int]]]:
+    """
+    Normalize and deduplicate a batch of IP addresses.
+    Args:
+        ip_list: IP addresses, may contain duplicates and invalid values
+    Returns:
+        tuple: (unique normalized IPs in first-seen order,
+                {normalized IP: positions in ip_list})
+    Example:
+        dedupe_ips(['78.62.199.128', '::ffff:78.62.199.128', None])
+        -> (['78.62.199.128'], {'78.62.199.128': [0, 1]})
+    """
+    positions: Dict[str, List[int]] = {}
+
+    for index, ip in enumerate(ip_list):
+        normalized = normalize_ip(ip)
+        if normalized is None:
+            print(f"Skipping invalid IP address: {ip}")
+            continue
+        positions.setdefault(normalized, []).append(index)
+
+    return list(positions), positions
+
+
+def fan_out(results: Dict[str, Optional[dict]], positions: Dict[str, List[int]]) -> List[dict]:
+    """
+    Put results of unique IPs back to every original position.
+    Args:
+        results: {normalized IP: result or None if lookup failed}
+        positions: Positions returned by dedupe_ips()
+    Returns:
+        list: Results in original input order, failed lookups skipped
+    """
+    ordered = []
+
+    for ip, indexes in positions.items():
+        result = results.get(ip)
+        if result is None:
+            continue
+        ordered.extend((index, result) for index in indexes)
+
+    ordered.sort(key=lambda pair: pair[0])
+    return [result for _, result in ordered]
+
+
+class InFlightCoalescer:
+    """
+    Share one in-flight call among concurrent callers with the same key.
+    The first caller runs the function, the others wait for its result.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[Hashable, Future] = {}
+        self.lock = threading.Lock()
+
+    def run(self, key: Hashable, func: Callable):
+        """
+        Call func() unless a call for the same key is already running.
+        Args:
+            key: Request key, e.g. (provider, normalized IP)
+            func: Function without arguments doing the real request
+        Returns:
+            Result of func() shared by all concurrent callers
+        """
+        with self.lock:
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.in_flight[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.in_flight[key]
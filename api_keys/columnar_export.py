@@ -0,0 +1,336 @@
+import csv
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from constants import ABUSE_OUTPUT_FILE, VIRUSTOTAL_OUTPUT_FILE, EXPORT_BATCH_SIZE
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+def _get(record: dict, *path: str) -> Any:
+    for key in path:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(key)
+    return record
+
+
+def _engines(category: str) -> Callable[[dict], List[str]]:
+    def extract(record: dict) -> List[str]:
+        results = record.get('last_analysis_results') or {}
+        return [name for name, result in results.items() if result.get('category') == category]
+    return extract
+
+
+# (column name, type, extractor) for AbuseModel dump (by alias)
+ABUSE_COLUMNS: List[Tuple[str, str, Callable[[dict], Any]]] = [
+    ('ip', 'string', lambda r: _get(r, 'ip-identity', 'ipAddress')),
+    ('ip_version', 'int64', lambda r: _get(r, 'ip-identity', 'ipVersion')),
+    ('is_public', 'bool', lambda r: _get(r, 'ip-identity', 'isPublic')),
+    ('isp', 'string', lambda r: _get(r, 'network', 'isp')),
+    ('domain', 'string', lambda r: _get(r, 'network', 'domain')),
+    ('hostnames', 'list<string>', lambda r: _get(r, 'network', 'hostnames') or []),
+    ('usage_type', 'string', lambda r: _get(r, 'network', 'usageType')),
+    ('country_code', 'string', lambda r: _get(r, 'geolocation', 'countryCode')),
+    ('country_name', 'string', lambda r: _get(r, 'geolocation', 'countryName')),
+    ('abuse_confidence_score', 'int64', lambda r: _get(r, 'reputation', 'abuseConfidenceScore')),
+    ('is_whitelisted', 'bool', lambda r: _get(r, 'reputation', 'isWhitelisted')),
+    ('is_tor', 'bool', lambda r: _get(r, 'reputation', 'isTor')),
+    ('total_reports', 'int64', lambda r: _get(r, 'abuse-history', 'totalReports')),
+    ('num_distinct_users', 'int64', lambda r: _get(r, 'abuse-history', 'numDistinctUsers')),
+    ('last_reported_at', 'string', lambda r: _get(r, 'abuse-history', 'lastReportedAt')),
+    ('reports_count', 'int64', lambda r: len(_get(r, 'abuse-history', 'reports') or [])),
+]
+
+
+# (column name, type, extractor) for VirusTotalIP dump
+VIRUSTOTAL_COLUMNS: List[Tuple[str, str, Callable[[dict], Any]]] = [
+    ('ip', 'string', lambda r: r.get('ip')),
+    ('reputation', 'int64', lambda r: r.get('reputation')),
+    ('malicious', 'int64', lambda r: _get(r, 'last_analysis_stats', 'malicious')),
+    ('suspicious', 'int64', lambda r: _get(r, 'last_analysis_stats', 'suspicious')),
+    ('undetected', 'int64', lambda r: _get(r, 'last_analysis_stats', 'undetected')),
+    ('harmless', 'int64', lambda r: _get(r, 'last_analysis_stats', 'harmless')),
+    ('timeout', 'int64', lambda r: _get(r, 'last_analysis_stats', 'timeout')),
+    ('malicious_engines', 'list<string>', _engines('malicious')),
+    ('suspicious_engines', 'list<string>', _engines('suspicious')),
+    ('network', 'string', lambda r: r.get('network')),
+    ('country', 'string', lambda r: r.get('country')),
+    ('continent', 'string', lambda r: r.get('continent')),
+    ('asn', 'int64', lambda r: r.get('asn')),
+    ('as_owner', 'string', lambda r: r.get('as_owner')),
+    ('regional_internet_registry', 'string', lambda r: r.get('regional_internet_registry')),
+    ('whois_date', 'int64', lambda r: r.get('whois_date')),
+    ('last_analysis_date', 'int64', lambda r: r.get('last_analysis_date')),
+    ('last_modification_date', 'int64', lambda r: r.get('last_modification_date')),
+    ('votes_harmless', 'int64', lambda r: _get(r, 'total_votes', 'harmless')),
+    ('votes_malicious', 'int64', lambda r: _get(r, 'total_votes', 'malicious')),
+    ('tags', 'list<string>', lambda r: r.get('tags') or []),
+    ('inferred_from', 'string', lambda r: r.get('inferred_from')),
+]
+
+
+COLUMNS = {
+    'abuse': ABUSE_COLUMNS,
+    'virustotal': VIRUSTOTAL_COLUMNS,
+}
+
+
+def flatten_records(records: Iterable[dict], kind: str) -> Dict[str, list]:
+    """
+    Flatten nested model dumps into typed columns.
+    Args:
+        records: AbuseModel (by alias) or VirusTotalIP dumps
+        kind: 'abuse' or 'virustotal'
+    Returns:
+        dict: {column name: list of values}
+    """
+    columns = COLUMNS[kind]
+    data = {name: [] for name, _, _ in columns}
+
+    for record in records:
+        for name, _, extract in columns:
+            data[name].append(extract(record))
+
+    return data
+
+
+def arrow_schema(kind: str):
+    """Build pyarrow schema for record kind."""
+    types = {
+        'string': pa.string(),
+        'int64': pa.int64(),
+        'bool': pa.bool_(),
+        'list<string>': pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[column_type]) for name, column_type, _ in COLUMNS[kind]])
+
+
+class ColumnarExporter:
+    """
+    Incremental exporter of reputation results into columnar files.
+
+    Output format is chosen by path:
+        - directory or '.parquet' path -> Parquet dataset directory; every
+          exporter writes a new part file and every append() one row group
+          (pandas.read_parquet(path) reads all parts). Needs pyarrow.
+        - '.csv' path -> CSV file appended across runs, list columns are
+          joined with '|'.
+    export_jsonl() keeps track of exported JSONL lines, so appending runs
+    do not duplicate rows. A Parquet part is written under a temporary
+    '_' name and renamed on close, with `source_offset` (JSONL byte offset
+    covered by its rows) in the part name when it is set.
+
+    Example:
+        with ColumnarExporter('data/abuseip.parquet', 'abuse') as exporter:
+            exporter.append(records)
+    """
+
+    def __init__(self, path: str | Path, kind: str):
+        if kind not in COLUMNS:
+            raise ValueError(f"Unknown record kind '{kind}', expected one of {list(COLUMNS)}")
+
+        self.path = Path(path)
+        self.kind = kind
+        self.rows = 0
+        self.source_offset: Optional[int] = None
+        self.writer = None
+        self.part_path = None
+        self.csv_file = None
+
+        if self.path.suffix == '.csv':
+            self.format = 'csv'
+        else:
+            if pa is None:
+                raise ImportError("Parquet export needs pyarrow: pip install -e '.[export]'")
+            self.format = 'parquet'
+
+    def _open_parquet(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        part = len(list(self.path.glob('part-*.parquet')))
+        self.part_path = self.path / f"_part-{part:05d}.parquet.tmp"
+        self.writer = pq.ParquetWriter(self.part_path, arrow_schema(self.kind))
+
+    def _open_csv(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        new_file = not self.path.exists() or self.path.stat().st_size == 0
+        self.csv_file = open(self.path, 'a', encoding='utf-8', newline='')
+        self.csv_writer = csv.writer(self.csv_file)
+        if new_file:
+            self.csv_writer.writerow([name for name, _, _ in COLUMNS[self.kind]])
+
+    def append(self, records: Iterable[dict]) -> int:
+        """
+        Append batch of records.
+        Returns:
+            int: Number of rows written
+        """
+        data = flatten_records(records, self.kind)
+        count = len(next(iter(data.values())))
+        if count == 0:
+            return 0
+
+        if self.format == 'parquet':
+            if self.writer is None:
+                self._open_parquet()
+            self.writer.write_table(pa.table(data, schema=arrow_schema(self.kind)))
+        else:
+            if self.csv_file is None:
+                self._open_csv()
+            list_columns = {name for name, column_type, _ in COLUMNS[self.kind] if column_type == 'list<string>'}
+            for row in zip(*(
+                ['|'.join(value) for value in values] if name in list_columns else values
+                for name, values in data.items()
+            )):
+                self.csv_writer.writerow(row)
+            self.csv_file.flush()
+
+        self.rows += count
+        return count
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            # Rename makes the part visible to readers together with its offset
+            name = self.part_path.name[1:-len('.parquet.tmp')]
+            if self.source_offset is not None:
+                name = f"{name}-{self.source_offset}"
+            os.replace(self.part_path, self.path / f"{name}.parquet")
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self.writer is not None:
+            # Incomplete part is never renamed, so readers do not see it
+            self.writer.close()
+            self.writer = None
+            self.part_path.unlink()
+        self.close()
+
+
+def export_checkpoint_path(output_path: str | Path) -> Path:
+    """
+    File with the JSONL byte offset exported so far and the CSV size after
+    that export: '<file>.csv.offset' next to a CSV file. Parquet parts keep
+    their end offset in the file name instead ('part-00003-<offset>.parquet').
+    """
+    return Path(output_path).with_name(f"{Path(output_path).name}.offset")
+
+
+def _parquet_offset(output_path: Path) -> int:
+    """Highest JSONL offset stored in committed part names, 0 if none."""
+    if not output_path.is_dir():
+        return 0
+    for temp_part in output_path.glob('_part-*.parquet.tmp'):
+        temp_part.unlink()
+    offsets = [int(part.stem.split('-')[2]) for part in output_path.glob('part-*-*.parquet')]
+    return max(offsets, default=0)
+
+
+def _csv_offset(output_path: Path) -> int:
+    """
+    JSONL offset from the CSV checkpoint. Rows appended after the last
+    checkpoint (interrupted export) are cut off, so they are exported again.
+    """
+    checkpoint = export_checkpoint_path(output_path)
+    try:
+        offset, size = map(int, checkpoint.read_text(encoding='utf-8').split())
+    except (OSError, ValueError):
+        return 0
+
+    if not output_path.exists() or output_path.stat().st_size < size:
+        return 0
+    if output_path.stat().st_size > size:
+        with open(output_path, 'r+b') as csv_file:
+            csv_file.truncate(size)
+    return offset
+
+
+def _write_csv_checkpoint(output_path: Path, offset: int):
+    checkpoint = export_checkpoint_path(output_path)
+    temp_path = checkpoint.with_name(f"{checkpoint.name}.tmp")
+    temp_path.write_text(f"{offset} {output_path.stat().st_size}", encoding='utf-8')
+    os.replace(temp_path, checkpoint)
+
+
+def _clear_output(output_path: Path):
+    if output_path.suffix == '.csv':
+        output_path.unlink(missing_ok=True)
+        export_checkpoint_path(output_path).unlink(missing_ok=True)
+    elif output_path.is_dir():
+        for part in output_path.glob('part-*.parquet'):
+            part.unlink()
+
+
+def export_jsonl(jsonl_path: str | Path, output_path: str | Path, kind: str,
+                 batch_size: int = EXPORT_BATCH_SIZE, incremental: bool = True) -> int:
+    """
+    Convert JSONL scan output into columnar file batch by batch.
+    The exported JSONL offset is committed together with the output (in the
+    Parquet part name, or in a CSV checkpoint holding the CSV size), so a
+    following run exports only lines appended since (new Parquet part, CSV
+    rows appended) and an interrupted run does not duplicate or lose rows.
+    Without a checkpoint, or when the JSONL file was replaced by a shorter
+    one, the output is rewritten from the start. A partial last line of a
+    running scan is left for the next export.
+    Args:
+        jsonl_path: JSONL file written by scan_*_to_jsonl()
+        output_path: Parquet directory or CSV file
+        kind: 'abuse' or 'virustotal'
+        batch_size: Rows per row group / write
+        incremental: False rewrites the output from the whole JSONL file
+    Returns:
+        int: Number of rows exported during this run
+    """
+    output_path = Path(output_path)
+    is_csv = output_path.suffix == '.csv'
+
+    offset = 0
+    if incremental:
+        offset = _csv_offset(output_path) if is_csv else _parquet_offset(output_path)
+    if offset > Path(jsonl_path).stat().st_size:
+        offset = 0
+    if offset == 0:
+        _clear_output(output_path)
+
+    with ColumnarExporter(output_path, kind) as exporter, open(jsonl_path, 'rb') as jsonl_file:
+        jsonl_file.seek(offset)
+        batch = []
+        for line in jsonl_file:
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                exporter.append(batch)
+                batch = []
+        exporter.append(batch)
+        exporter.source_offset = offset
+        rows = exporter.rows
+
+    if is_csv and rows:
+        _write_csv_checkpoint(output_path, offset)
+    return rows
+
+
+if __name__ == "__main__":
+    extension = sys.argv[1] if len(sys.argv) > 1 else ('.parquet' if pa is not None else '.csv')
+
+    for kind, jsonl_path in (('abuse', ABUSE_OUTPUT_FILE), ('virustotal', VIRUSTOTAL_OUTPUT_FILE)):
+        if not Path(jsonl_path).exists():
+            continue
+        output_path = Path(jsonl_path).with_suffix(extension)
+        rows = export_jsonl(jsonl_path, output_path, kind)
+        print(f"Exported {rows} rows from {jsonl_path} to {output_path}")
@@ -0,0 +1,94 @@
+from pathlib import Path
+
+
+# AbuseIPDB API endpoint
+ABUSE_API_URL = 'https://api.abuseipdb.com/api/v2/check'
+
+
+# Default number of concurrent requests in bulk mode
+ABUSE_MAX_WORKERS = 10
+
+
+# Provider quotas used by rate_limiter.py (free/public API tiers)
+RATE_LIMITS = {
+    'abuseipdb': {'per_minute': None, 'per_day': 1000},
+    'virustotal': {'per_minute': 4, 'per_day': 500},
+}
+
+
+# How many times to retry request after 429 Too Many Requests
+RATE_LIMIT_MAX_RETRIES = 3
+
+
+# Local cache of reputation results (cache.py)
+CACHE_FILE = Path(__file__).parent / 'data' / 'reputation_cache.sqlite3'
+CACHE_MAX_ENTRIES = 100_000
+CACHE_TTLS = {
+    'abuseipdb': 6 * 60 * 60,
+    'virustotal': 24 * 60 * 60,
+}
+
+
+# DNS resolution (socket_domain_ip.py), TTLs in seconds
+DNS_CACHE_TTL = 5 * 60
+DNS_NEGATIVE_TTL = 60
+DNS_MAX_WORKERS = 50
+
+
+# Streaming JSONL output (jsonl_writer.py)
+ABUSE_OUTPUT_FILE = Path(__file__).parent / 'data' / 'abuseip_output.jsonl'
+VIRUSTOTAL_OUTPUT_FILE = Path(__file__).parent / 'data' / 'virustotal_output.jsonl'
+JSONL_FLUSH_EVERY = 50
+JSONL_FLUSH_SECONDS = 5
+
+
+# AbuseIPDB confidence score thresholds for combined verdict (reputation_engine.py)
+ABUSE_MALICIOUS_SCORE = 75
+ABUSE_SUSPICIOUS_SCORE = 25
+
+
+# Concurrent VirusTotal requests (still paced by RATE_LIMITS)
+VIRUSTOTAL_MAX_WORKERS = 4
+
+
+# Shared HTTP client (http_client.py), timeouts and backoff in seconds
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 20
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_BASE = 0.5
+HTTP_BACKOFF_MAX = 30
+HTTP_RETRY_STATUS_CODES = (500, 502, 503, 504)
+HTTP_POOL_MAXSIZE = 20
+
+
+# Circuit breaker: consecutive failures to open, seconds before trial request
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 60
+
+
+# Cached API key validation status (key_status.py), TTL in seconds
+KEY_STATUS_FILE = Path(__file__).parent / 'data' / 'key_status.json'
+KEY_STATUS_TTL = 24 * 60 * 60
+
+
+# Header carrying API key of each provider
+API_KEY_HEADERS = {
+    'abuseipdb': 'Key',
+    'virustotal': 'x-apikey',
+}
+
+
+# Connection pools kept by shared session (one per API host)
+HTTP_POOL_CONNECTIONS = 4
+
+
+# Environment variables with API keys (key_pool.py), more keys in
+# <NAME>_2, <NAME>_3, ... or comma separated <NAME>S
+API_KEY_ENV_VARS = {
+    'abuseipdb': 'ABUSEIPDB_API',
+    'virustotal': 'VIRUSTOTAL_API',
+}
+
+
+# Rows per write in columnar export (columnar_export.py)
+EXPORT_BATCH_SIZE = 10_000
@@ -0,0 +1,342 @@
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from rate_limiter import RateLimiter, get_rate_limiter
+from key_status import KeyStatusCache, get_key_status_cache
+from key_pool import ApiKeyState, KeyPool, load_key_pool
+from constants import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_BASE,
+    HTTP_BACKOFF_MAX,
+    HTTP_RETRY_STATUS_CODES,
+    HTTP_POOL_MAXSIZE,
+    HTTP_POOL_CONNECTIONS,
+    API_KEY_HEADERS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    RATE_LIMIT_MAX_RETRIES,
+)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised when provider circuit is open and request is not sent."""
+
+
+class InvalidApiKeyError(requests.exceptions.RequestException):
+    """Raised when the API key was rejected (401) and request is not sent."""
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+    Opens after `failure_threshold` consecutive failures and rejects requests
+    for `reset_timeout` seconds. After that one trial request is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_progress = False
+        self.open_count = 0
+        self.open_seconds = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow_request(self) -> bool:
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_in_progress:
+                self.trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                self.open_seconds += time.monotonic() - self.opened_at
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_progress = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            now = time.monotonic()
+            if self.trial_in_progress or (self.opened_at is None and self.failures >= self.failure_threshold):
+                if self.opened_at is not None:
+                    self.open_seconds += now - self.opened_at
+                else:
+                    self.open_count += 1
+                self.opened_at = now
+            self.trial_in_progress = False
+
+    def total_open_seconds(self) -> float:
+        with self.lock:
+            current = time.monotonic() - self.opened_at if self.opened_at is not None else 0.0
+            return self.open_seconds + current
+
+
+class HttpClient:
+    """
+    HTTP client for one reputation API provider.
+
+    Adds to every GET request:
+        - connect/read timeouts
+        - waiting for the provider rate limiter (and 429 Retry-After handling)
+        - retries with exponential backoff and jitter on connection errors,
+          timeouts and 5xx responses
+        - circuit breaker, which fails fast while the provider is down
+        - API key status tracking: 401 marks the key invalid and the first
+          successful response marks it valid in KeyStatusCache, so key
+          validation does not need a separate request, later requests with
+          a rejected key fail fast with InvalidApiKeyError
+        - optional KeyPool: the API key header is replaced by the pool key
+          with the most remaining quota, each key has its own limiter
+
+    Example:
+        client = get_http_client('abuseipdb')
+        response = client.get(url, headers=headers, params=params)
+        client.metrics()  # -> {'requests': 1, 'retries': 0, ...}
+    """
+
+    def __init__(self, provider: str, session: Optional[requests.Session] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT,
+                 max_retries: int = HTTP_MAX_RETRIES,
+                 key_status: Optional[KeyStatusCache] = None,
+                 key_pool: Optional[KeyPool] = None):
+        self.provider = provider
+        self.session = session if session is not None else get_shared_session()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(provider)
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.key_status = key_status
+        self.key_pool = key_pool
+        self.key_header = API_KEY_HEADERS.get(provider)
+        self.confirmed_keys = set()
+        self.rejected_keys = set()
+        self.counters = {'requests': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'rate_limited': 0}
+        self.lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def _track_key_status(self, headers: Optional[dict], status_code: int):
+        """Fold API key validation into regular requests."""
+        if self.key_status is None or not headers or self.key_header not in headers:
+            return
+
+        api_key = headers[self.key_header]
+        if status_code == 401:
+            with self.lock:
+                self.confirmed_keys.discard(api_key)
+                self.rejected_keys.add(api_key)
+            self.key_status.set(self.provider, api_key, False)
+            print(f"{self.provider} API key is invalid or expired")
+        elif status_code < 400:
+            with self.lock:
+                if api_key in self.confirmed_keys:
+                    return
+                self.confirmed_keys.add(api_key)
+            if self.key_status.get(self.provider, api_key) is not True:
+                self.key_status.set(self.provider, api_key, True)
+
+    def _check_key(self, headers: Optional[dict]):
+        """
+        Fail fast with a key already rejected by a 401 (or cached as invalid),
+        so the rest of a batch does not send requests bound to fail.
+        Keys of a KeyPool are disabled by the pool instead.
+        """
+        if self.key_pool is not None or not headers or self.key_header not in headers:
+            return
+
+        api_key = headers[self.key_header]
+        with self.lock:
+            if api_key in self.confirmed_keys:
+                return
+            rejected = api_key in self.rejected_keys
+        if not rejected and self.key_status is not None:
+            rejected = self.key_status.get(self.provider, api_key) is False
+        if rejected:
+            with self.lock:
+                if api_key in self.confirmed_keys:
+                    return
+                self.rejected_keys.add(api_key)
+            self._count('rejected')
+            raise InvalidApiKeyError(f"{self.provider} API key is invalid, request not sent")
+
+    def _acquire(self, kwargs: dict) -> Tuple[RateLimiter, Optional[ApiKeyState]]:
+        """Wait for quota of the provider, or of the best pool key."""
+        if self.key_pool is None:
+            self.rate_limiter.acquire()
+            return self.rate_limiter, None
+
+        key_state = self.key_pool.acquire()
+        kwargs['headers'] = {**(kwargs.get('headers') or {}), self.key_header: key_state.api_key}
+        return key_state.rate_limiter, key_state
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt)
+        return random.uniform(0, delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send GET request with retries, rate limiting and circuit breaker.
+        Args:
+            url: Request URL
+            **kwargs: Passed to requests.Session.get()
+        Returns:
+            requests.Response: Final response (may still be 4xx)
+        Raises:
+            CircuitOpenError: Provider circuit is open
+            InvalidApiKeyError: API key was rejected by an earlier request
+            NoActiveKeysError: Every key of the KeyPool is disabled
+            requests.exceptions.RequestException: All retries failed
+        """
+        self._check_key(kwargs.get('headers'))
+        kwargs.setdefault('timeout', self.timeout)
+        max_rate_limited = RATE_LIMIT_MAX_RETRIES + (len(self.key_pool) if self.key_pool else 0)
+        rate_limited = 0
+        attempt = 0
+
+        while True:
+            # Acquire first, so NoActiveKeysError does not take the half-open trial
+            rate_limiter, key_state = self._acquire(kwargs)
+
+            if not self.circuit_breaker.allow_request():
+                self._count('rejected')
+                raise CircuitOpenError(f"{self.provider} circuit is open, request to {url} not sent")
+
+            # Every exit of the attempt, including unexpected exceptions,
+            # records one outcome, so a half-open trial is always released
+            succeeded = False
+            try:
+                self._count('requests')
+
+                try:
+                    response = self.session.get(url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    if attempt >= self.max_retries:
+                        self._count('failures')
+                        raise
+                    error = e
+                else:
+                    rate_limiter.update_from_headers(response.headers)
+                    self._track_key_status(kwargs.get('headers'), response.status_code)
+
+                    if key_state is not None:
+                        key_state.record(response.status_code)
+                        if response.status_code == 401:
+                            self.key_pool.disable(key_state)
+                            if len(self.key_pool):
+                                # Provider answered, only the key was bad
+                                succeeded = True
+                                continue
+
+                    if response.status_code == 429:
+                        succeeded = True
+                        self._count('rate_limited')
+                        if rate_limited >= max_rate_limited:
+                            return response
+                        if response.headers.get('Retry-After') is None:
+                            rate_limiter.block_for(2 ** min(rate_limited, RATE_LIMIT_MAX_RETRIES))
+                        rate_limited += 1
+                        continue
+
+                    if response.status_code not in HTTP_RETRY_STATUS_CODES:
+                        succeeded = True
+                        return response
+
+                    if attempt >= self.max_retries:
+                        self._count('failures')
+                        return response
+                    error = f"status code {response.status_code}"
+            finally:
+                if succeeded:
+                    self.circuit_breaker.record_success()
+                else:
+                    self.circuit_breaker.record_failure()
+
+            delay = self._backoff(attempt)
+            print(f"{self.provider} request failed ({error}), retry {attempt + 1} in {delay:.1f}s")
+            self._count('retries')
+            attempt += 1
+            time.sleep(delay)
+
+    def metrics(self) -> Dict[str, float]:
+        """Return request, retry and circuit breaker counters."""
+        with self.lock:
+            metrics = dict(self.counters)
+        metrics['circuit_state'] = self.circuit_breaker.state
+        metrics['circuit_open_count'] = self.circuit_breaker.open_count
+        metrics['circuit_open_seconds'] = round(self.circuit_breaker.total_open_seconds(), 3)
+        if self.key_pool is not None:
+            metrics['keys'] = self.key_pool.report()
+        return metrics
+
+
+_shared_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_shared_session() -> requests.Session:
+    """
+    Get process-wide pooled requests.Session.
+    All provider clients and key checks share its keep-alive connections,
+    so TCP/TLS handshakes happen once per host.
+    """
+    global _shared_session
+    with _session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _shared_session = session
+        return _shared_session
+
+
+_clients: Dict[str, HttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(provider: str) -> HttpClient:
+    """
+    Get process-wide HTTP client of provider.
+    Uses the shared session, the shared provider rate limiter from
+    rate_limiter.get_rate_limiter() and the on-disk key status cache.
+    When more than one key of provider is configured in .env, requests
+    rotate over a KeyPool instead of the single key passed by the caller.
+    Args:
+        provider: Provider name, e.g. 'abuseipdb' or 'virustotal'
+    Returns:
+        HttpClient: Shared client instance
+    """
+    with _clients_lock:
+        if provider not in _clients:
+            _clients[provider] = HttpClient(provider, rate_limiter=get_rate_limiter(provider),
+                                            key_status=get_key_status_cache(),
+                                            key_pool=load_key_pool(provider))
+        return _clients[provider]
@@ -0,0 +1,144 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Set
+from coalesce import normalize_ip
+from constants import JSONL_FLUSH_EVERY, JSONL_FLUSH_SECONDS
+
+# Bytes read at a time when looking for the last complete line
+PARTIAL_LINE_BLOCK_SIZE = 64 * 1024
+
+
+class JsonlWriter:
+    """
+    Incremental JSONL (NDJSON) writer.
+    Appends one record per line and flushes to disk every `flush_every`
+    records or `flush_seconds` seconds, so a crash loses at most the last
+    unflushed records. A partial last line left by a crash is removed on open.
+
+    Example:
+        with JsonlWriter('data/abuseip_output.jsonl') as writer:
+            for record in records:
+                writer.write(record)
+    """
+
+    def __init__(self, path: str | Path, flush_every: int = JSONL_FLUSH_EVERY,
+                 flush_seconds: float = JSONL_FLUSH_SECONDS):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.written = 0
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _drop_partial_line(self.path)
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def write(self, record: dict):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.written += 1
+        self.unflushed += 1
+
+        if (self.unflushed >= self.flush_every
+                or time.monotonic() - self.last_flush >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _drop_partial_line(path: Path):
+    """Truncate file after its last complete line."""
+    if not path.exists() or path.stat().st_size == 0:
+        return
+
+    with open(path, 'rb+') as file:
+        end = file.seek(0, os.SEEK_END)
+        file.seek(end - 1)
+        if file.read(1) == b'\n':
+            return
+
+        # Read backwards in blocks, only the partial line is read
+        position = end
+        while position > 0:
+            start = max(0, position - PARTIAL_LINE_BLOCK_SIZE)
+            file.seek(start)
+            last_newline = file.read(position - start).rfind(b'\n')
+            if last_newline != -1:
+                file.truncate(start + last_newline + 1)
+                return
+            position = start
+        file.truncate(0)
+
+
+def load_checkpoint(path: str | Path, ip_key: Callable[[dict], str]) -> Set[str]:
+    """
+    Read IP addresses already present in JSONL output file.
+    Args:
+        path: JSONL output file of a previous (possibly crashed) run
+        ip_key: Function returning IP address of a record
+    Returns:
+        set: Normalized IP addresses found in the file
+    """
+    path = Path(path)
+    done = set()
+
+    if not path.exists():
+        return done
+
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                ip = normalize_ip(ip_key(json.loads(line)))
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+            if ip is not None:
+                done.add(ip)
+
+    return done
+
+
+def pending_ips(ip_list: List[str], path: str | Path, ip_key: Callable[[dict], str]) -> List[str]:
+    """
+    Remove IP addresses already saved in output file (resume from checkpoint).
+    Args:
+        ip_list: All IP addresses of the scan
+        path: JSONL output file
+        ip_key: Function returning IP address of a record
+    Returns:
+        list: IP addresses still to be checked
+    """
+    done = load_checkpoint(path, ip_key)
+    return [ip for ip in ip_list if normalize_ip(ip) not in done]
+
+
+def write_jsonl(records: Iterable[dict], path: str | Path, **kwargs) -> int:
+    """
+    Stream records into JSONL file as they arrive.
+    Args:
+        records: Iterable or generator of records
+        path: JSONL output file (appended)
+        **kwargs: Passed to JsonlWriter
+    Returns:
+        int: Number of records written
+    """
+    with JsonlWriter(path, **kwargs) as writer:
+        for record in records:
+            writer.write(record)
+        return writer.written
@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+import requests
+from rate_limiter import RateLimiter
+from constants import RATE_LIMITS, API_KEY_ENV_VARS
+
+
+def load_api_keys(provider: str) -> List[str]:
+    """
+    Load all API keys of provider from environment (.env).
+    Reads the single key variable (e.g. ABUSEIPDB_API), numbered variables
+    (ABUSEIPDB_API_2, ABUSEIPDB_API_3, ...) and comma separated list
+    (ABUSEIPDB_APIS).
+    Args:
+        provider: Provider name, e.g. 'abuseipdb' or 'virustotal'
+    Returns:
+        list: Unique API keys in the order found
+    """
+    env_var = API_KEY_ENV_VARS[provider]
+    keys = [os.getenv(env_var)]
+
+    number = 2
+    while os.getenv(f"{env_var}_{number}"):
+        keys.append(os.getenv(f"{env_var}_{number}"))
+        number += 1
+
+    keys.extend(os.getenv(f"{env_var}S", '').split(','))
+
+    return list(dict.fromkeys(key.strip() for key in keys if key and key.strip()))
+
+
+class NoActiveKeysError(requests.exceptions.RequestException):
+    """Raised when every key of the pool is disabled and request is not sent."""
+
+
+class ApiKeyState:
+    """One API key with its own quota limiter and usage counters."""
+
+    def __init__(self, provider: str, api_key: str):
+        self.api_key = api_key
+        self.rate_limiter = RateLimiter(provider, **RATE_LIMITS.get(provider, {}))
+        self.disabled = False
+        self.usage = {'requests': 0, 'rate_limited': 0, 'errors': 0}
+
+    @property
+    def masked_key(self) -> str:
+        return f"{self.api_key[:4]}...{self.api_key[-4:]}" if len(self.api_key) > 8 else '***'
+
+    def record(self, status_code: int):
+        self.usage['requests'] += 1
+        if status_code == 429:
+            self.usage['rate_limited'] += 1
+        elif status_code >= 400:
+            self.usage['errors'] += 1
+
+
+class KeyPool:
+    """
+    Pool of API keys of one provider.
+    Every request goes to the usable key with the most remaining quota.
+    A key that hits its quota is benched by its own limiter (Retry-After /
+    X-RateLimit-Reset) until reset, an invalid key (401) is disabled.
+
+    Example:
+        pool = KeyPool('abuseipdb', load_api_keys('abuseipdb'))
+        key_state = pool.acquire()
+        ...
+        pool.report()
+    """
+
+    def __init__(self, provider: str, api_keys: List[str]):
+        if not api_keys:
+            raise ValueError(f"No API keys for {provider}")
+        self.provider = provider
+        self.keys = [ApiKeyState(provider, api_key) for api_key in api_keys]
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.active_keys())
+
+    def active_keys(self) -> List[ApiKeyState]:
+        return [key_state for key_state in self.keys if not key_state.disabled]
+
+    def acquire(self) -> ApiKeyState:
+        """
+        Block until one of the keys may send a request.
+        Returns:
+            ApiKeyState: Key to use, its quota token is already taken
+        Raises:
+            NoActiveKeysError: All keys are disabled
+        """
+        while True:
+            with self.lock:
+                active = self.active_keys()
+                if not active:
+                    raise NoActiveKeysError(f"All {self.provider} API keys are disabled, request not sent")
+
+                waits = []
+                for key_state in sorted(active, key=lambda k: k.rate_limiter.available(), reverse=True):
+                    wait = key_state.rate_limiter.try_acquire()
+                    if wait <= 0:
+                        return key_state
+                    waits.append(wait)
+
+            time.sleep(min(waits))
+
+    def disable(self, key_state: ApiKeyState):
+        """Stop using invalid or revoked key."""
+        with self.lock:
+            key_state.disabled = True
+        print(f"{self.provider} API key {key_state.masked_key} disabled")
+
+    def report(self) -> Dict[str, dict]:
+        """Per-key usage, remaining quota and state."""
+        now = time.monotonic()
+        report = {}
+        for key_state in self.keys:
+            limiter = key_state.rate_limiter
+            if key_state.disabled:
+                state = 'disabled'
+            elif limiter.blocked_until > now:
+                state = f"benched {limiter.blocked_until - now:.0f}s"
+            else:
+                state = 'active'
+            report[key_state.masked_key] = {
+                **key_state.usage,
+                'remaining_now': round(limiter.available(), 1),
+                'state': state,
+            }
+        return report
+
+
+def load_key_pool(provider: str) -> Optional[KeyPool]:
+    """Create KeyPool from environment, None if provider has less than two keys."""
+    api_keys = load_api_keys(provider)
+    return KeyPool(provider, api_keys) if len(api_keys) > 1 else None
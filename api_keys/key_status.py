@@ -0,0 +1,79 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from constants import KEY_STATUS_FILE, KEY_STATUS_TTL
+
+
+class KeyStatusCache:
+    """
+    On-disk cache of API key validation results.
+    Keys are stored as SHA-256 fingerprints, never in plain text.
+    A status older than `ttl` seconds is treated as unknown.
+
+    Example:
+        key_cache = KeyStatusCache()
+        key_cache.set('abuseipdb', api_key, True)
+        key_cache.get('abuseipdb', api_key)  # -> True
+    """
+
+    def __init__(self, path: str | Path = KEY_STATUS_FILE, ttl: float = KEY_STATUS_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, indent=2)
+        tmp_path.replace(self.path)
+
+    @staticmethod
+    def _fingerprint(provider: str, api_key: str) -> str:
+        digest = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:32]
+        return f"{provider}:{digest}"
+
+    def get(self, provider: str, api_key: str) -> Optional[bool]:
+        """
+        Get cached validation result.
+        Returns:
+            bool: True/False if key was checked less than ttl seconds ago, else None
+        """
+        with self.lock:
+            entry = self.entries.get(self._fingerprint(provider, api_key))
+        if entry is None or time.time() - entry['checked_at'] > self.ttl:
+            return None
+        return entry['valid']
+
+    def set(self, provider: str, api_key: str, valid: bool):
+        """Save validation result of API key."""
+        with self.lock:
+            self.entries[self._fingerprint(provider, api_key)] = {
+                'valid': valid,
+                'checked_at': time.time(),
+            }
+            self._save()
+
+
+_key_status_cache: Optional[KeyStatusCache] = None
+_key_status_lock = threading.Lock()
+
+
+def get_key_status_cache() -> KeyStatusCache:
+    """Get process-wide KeyStatusCache stored in KEY_STATUS_FILE."""
+    global _key_status_cache
+    with _key_status_lock:
+        if _key_status_cache is None:
+            _key_status_cache = KeyStatusCache()
+        return _key_status_cache
@@ -1,26 +1,43 @@
 import os
 from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 import requests
 from ip_list import ip_addresses
 from abuseip_model import AbuseModel
 from rich import print
 from ip_list import domain_list
-from socket_domain_ip import domain_to_ip
+from socket_domain_ip import domains_to_ips
+from constants import ABUSE_API_URL, ABUSE_MAX_WORKERS, ABUSE_OUTPUT_FILE
+from http_client import get_http_client, get_shared_session
+from key_status import get_key_status_cache
+from cache import ReputationCache
+from coalesce import InFlightCoalescer, dedupe_ips, fan_out
+from jsonl_writer import pending_ips, write_jsonl
 
 from dotenv import load_dotenv
 load_dotenv(dotenv_path=Path(__file__).parent / '.env')
 
+_coalescer = InFlightCoalescer()
 
-def get_info_from_ip(ip_address, api_key_abuse, abuse_url):
+
+def get_info_from_ip(ip_address, api_key_abuse, abuse_url, client=None, cache=None):
     """
     Check IP address using AbuseIPDB API
     Args:
         ip_address: IP address to check
         api_key_abuse: API key for AbuseIPDB
         abuse_url: AbuseIPDB API URL
+        client: Optional HttpClient, shared AbuseIPDB client by default
+        cache: Optional ReputationCache, consulted before calling the API
      Returns:
         dict: Results from API for the IP address or None if error occurs
     """
+    if cache is not None:
+        cached_data = cache.get('abuseipdb', ip_address)
+        if cached_data is not None:
+            return cached_data
+
     try:
         querystring = {
             'ipAddress': ip_address,
@@ -33,9 +50,15 @@ def get_info_from_ip(ip_address, api_key_abuse, abuse_url):
             'Key': api_key_abuse
         }
 
-        response = requests.get(url=abuse_url, headers=headers, params=querystring)
+        http = client if client is not None else get_http_client('abuseipdb')
+        response = http.get(abuse_url, headers=headers, params=querystring)
         response.raise_for_status()
         data = response.json()
+
+        # Cache only responses which pass AbuseModel validation
+        if cache is not None and transform_to_abuse_model(data) is not None:
+            cache.set('abuseipdb', ip_address, data)
+
         return data
 
     except requests.exceptions.RequestException as e:
@@ -92,40 +115,168 @@ def transform_to_abuse_model(data: dict) -> AbuseModel:
         return None
 
 
-def get_info_from_ips_list(ip_list, api_key_abuse, abuse_url):
+def get_info_from_ips_list(ip_list, api_key_abuse, abuse_url, client=None, cache=None):
     """
     Check multiple IP addresses using AbuseIPDB API
+    Duplicate addresses (also different notations of the same IPv4/IPv6
+    address) are queried once and the result is repeated at every position.
     Args:
         ip_list: List of IP addresses to check
         api_key_abuse: API key for AbuseIPDB
         abuse_url: AbuseIPDB API URL
+        client: Optional HttpClient, shared AbuseIPDB client by default
+        cache: Optional ReputationCache for previously checked IPs
     Returns:
         list: List of structured data for each successfully processed IP address
     """
-    collected_data = []
+    unique_ips, positions = dedupe_ips(ip_list)
+
+    results = {
+        ip_address: _check_single_ip(ip_address, api_key_abuse, abuse_url, client, cache)
+        for ip_address in unique_ips
+    }
+
+    return fan_out(results, positions)
 
-    for ip_address in ip_list:
-        first_data = get_info_from_ip(ip_address, api_key_abuse, abuse_url)
+
+def _check_single_ip(ip_address, api_key_abuse, abuse_url, client, cache):
+    """
+    Fetch and transform a single IP address for the bulk modes.
+    Concurrent callers asking for the same IP share one request.
+    Returns:
+        dict: AbuseModel dump (by alias) or None if request/transform failed
+    """
+    def fetch():
+        first_data = get_info_from_ip(ip_address, api_key_abuse, abuse_url, client=client, cache=cache)
 
         if first_data is None:
-            continue
+            return None
 
         abuse_data = transform_to_abuse_model(first_data)
 
         if abuse_data is None:
-            continue
+            return None
+
+        return abuse_data.model_dump(by_alias=True)
+
+    return _coalescer.run(('abuseipdb', ip_address), fetch)
+
+
+def get_info_from_ips_list_concurrent(ip_list, api_key_abuse, abuse_url,
+                                      max_workers=ABUSE_MAX_WORKERS, client=None, cache=None):
+    """
+    Check multiple IP addresses concurrently using AbuseIPDB API.
+    All workers share the keep-alive session of the HTTP client, so TCP/TLS
+    connections are reused between requests. Duplicate addresses are
+    queried once and the result is repeated at every position.
+    Args:
+        ip_list: List of IP addresses to check
+        api_key_abuse: API key for AbuseIPDB
+        abuse_url: AbuseIPDB API URL
+        max_workers: Maximum number of requests in flight at the same time
+        client: Optional HttpClient, shared AbuseIPDB client by default
+        cache: Optional ReputationCache for previously checked IPs
+    Returns:
+        list: Structured data for each successfully processed IP address,
+            in the same order as ip_list
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    unique_ips, positions = dedupe_ips(ip_list)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda ip: _check_single_ip(ip, api_key_abuse, abuse_url, client, cache),
+            unique_ips,
+        )
+        results_by_ip = dict(zip(unique_ips, results))
+
+    return fan_out(results_by_ip, positions)
 
-        collected_data.append(abuse_data.model_dump(by_alias=True))
 
-    return collected_data
+def iter_info_from_ips_list(ip_list, api_key_abuse, abuse_url,
+                            max_workers=ABUSE_MAX_WORKERS, client=None, cache=None):
+    """
+    Generator version of get_info_from_ips_list_concurrent().
+    Yields records as soon as each request completes (completion order),
+    one record per unique IP address, without holding the whole batch in memory.
+    Args:
+        ip_list: List of IP addresses to check
+        api_key_abuse: API key for AbuseIPDB
+        abuse_url: AbuseIPDB API URL
+        max_workers: Maximum number of requests in flight at the same time
+        client: Optional HttpClient, shared AbuseIPDB client by default
+        cache: Optional ReputationCache for previously checked IPs
+    Yields:
+        dict: AbuseModel dump (by alias) for each successfully processed IP
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    unique_ips, _ = dedupe_ips(ip_list)
+
+    # At most max_workers * 2 submitted lookups, a finished future is
+    # dropped as soon as its result is yielded
+    window = max_workers * 2
+    ips = iter(unique_ips)
+    pending = set()
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while True:
+            for ip in islice(ips, window - len(pending)):
+                pending.add(executor.submit(_check_single_ip, ip, api_key_abuse, abuse_url, client, cache))
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result is not None:
+                    yield result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
 
+def abuse_record_ip(record: dict) -> str:
+    """Return IP address of AbuseModel dump (by alias)."""
+    return record['ip-identity']['ipAddress']
 
-def check_abuseipdb_key(api_key, abuse_url):
+
+def scan_ips_to_jsonl(ip_list, api_key_abuse, abuse_url, output_file=ABUSE_OUTPUT_FILE, **kwargs):
+    """
+    Check IP addresses and stream results into JSONL file.
+    IP addresses already present in output_file are skipped, so a crashed
+    scan continues from where it stopped.
+    Args:
+        ip_list: List of IP addresses to check
+        api_key_abuse: API key for AbuseIPDB
+        abuse_url: AbuseIPDB API URL
+        output_file: JSONL file, appended
+        **kwargs: Passed to iter_info_from_ips_list()
+    Returns:
+        int: Number of records written during this run
+    """
+    remaining = pending_ips(ip_list, output_file, abuse_record_ip)
+    print(f"{len(ip_list) - len(remaining)} IPs already in {output_file}, {len(remaining)} to check")
+
+    records = iter_info_from_ips_list(remaining, api_key_abuse, abuse_url, **kwargs)
+    return write_jsonl(records, output_file)
+
+
+def check_abuseipdb_key(api_key, abuse_url, lazy=False, key_status=None):
     """
     Validate AbuseIPDB API key by making a test request.
+    Result is cached on disk (KeyStatusCache), so following runs skip the
+    test request until the status expires. The request goes through the
+    shared pooled session, so its connection is reused by later calls.
     Args:
         api_key (str): AbuseIPDB API key from environment variables.
         abuse_url (str): AbuseIPDB API endpoint URL.
+        lazy (bool): If status is not cached, skip the test request and let
+            the first real request validate the key.
+        key_status (KeyStatusCache): Status cache, shared cache by default.
     Returns:
         bool: True if API key is valid, False otherwise.
     Raises:
@@ -140,6 +291,15 @@ def check_abuseipdb_key(api_key, abuse_url):
             print("AbuseIPDB API key not found in environment variables")
             return False
 
+        key_status = key_status if key_status is not None else get_key_status_cache()
+        cached_status = key_status.get('abuseipdb', api_key)
+        if cached_status is not None:
+            if not cached_status:
+                print("AbuseIPDB API key is invalid or expired (cached status)")
+            return cached_status
+        if lazy:
+            return True
+
         # Simple validation with a test request
         headers = {
             'Key': api_key,
@@ -152,10 +312,11 @@ def check_abuseipdb_key(api_key, abuse_url):
             'verbose': '',
         }
 
-        response = requests.get(url=abuse_url, headers=headers, params=querystring, timeout=10)
+        response = get_shared_session().get(url=abuse_url, headers=headers, params=querystring, timeout=10)
 
         if response.status_code == 401:
             print("AbuseIPDB API key is invalid or expired")
+            key_status.set('abuseipdb', api_key, False)
             return False
         elif response.status_code == 504:
             print("AbuseIPDB API timeout - server not responding")
@@ -164,6 +325,7 @@ def check_abuseipdb_key(api_key, abuse_url):
             print(f"AbuseIPDB API returned status code: {response.status_code}")
             return False
 
+        key_status.set('abuseipdb', api_key, True)
         return True
 
     except requests.exceptions.Timeout:
@@ -179,13 +341,17 @@ def check_abuseipdb_key(api_key, abuse_url):
 
 if __name__ == "__main__":
     api_key = os.getenv('ABUSEIPDB_API')
-    abuse_api_url = 'https://api.abuseipdb.com/api/v2/check'
-    abuse_api_key_check = check_abuseipdb_key(api_key, abuse_api_url)
+    abuse_api_url = ABUSE_API_URL
+    abuse_api_key_check = check_abuseipdb_key(api_key, abuse_api_url, lazy=True)
 
-    domain_to_ip_results = [domain_to_ip(domain) for domain in domain_list]
+    domain_to_ip_results = domains_to_ips(domain_list)
 
     if abuse_api_key_check:
-        results_list = get_info_from_ips_list( domain_to_ip_results, api_key, abuse_url=abuse_api_url)
-        print(results_list)
+        reputation_cache = ReputationCache()
+        written = scan_ips_to_jsonl(domain_to_ip_results, api_key, abuse_url=abuse_api_url,
+                                    cache=reputation_cache)
+        print(f"Saved {written} records to {ABUSE_OUTPUT_FILE}")
+        print(f"Cache stats: {reputation_cache.stats()}")
+        print(f"HTTP client metrics: {get_http_client('abuseipdb').metrics()}")
     else:
         print("AbuseIPDB API key is not valid. Please check your '.env' file.")
@@ -1,39 +1,62 @@
 import os
-import requests
 from pathlib import Path
-from typing import Optional, List, Dict
-from virustotal_model import VirusTotalIP
+from typing import Optional, List, Dict, Iterator
+from pydantic import ValidationError
+from virustotal_model import VirusTotalIP, VirusTotalIPLazy
 from ip_list import ip_addresses
 from rich import print
 from ip_list import domain_list
-from socket_domain_ip import domain_to_ip
+from socket_domain_ip import domains_to_ips
+from http_client import HttpClient, get_http_client, get_shared_session
+from key_status import KeyStatusCache, get_key_status_cache
+from cache import ReputationCache
+from coalesce import dedupe_ips, fan_out
+from jsonl_writer import pending_ips, write_jsonl
+from constants import VIRUSTOTAL_OUTPUT_FILE
+from network_index import NetworkIndex, group_ips_by_network, group_networks_by_asn
 
 from dotenv import load_dotenv
 load_dotenv(dotenv_path=Path(__file__).parent / '.env')
 
 
-def check_virustotal_key(api_key: str) -> bool:
-    """Validate VirusTotal API key by making a test request."""
+def check_virustotal_key(api_key: str, lazy: bool = False,
+                         key_status: Optional[KeyStatusCache] = None) -> bool:
+    """
+    Validate VirusTotal API key by making a test request.
+    Uses cached status when fresh; with lazy=True an unknown key is accepted
+    and validated by the first real request.
+    """
     try:
         if not api_key:
             print("VirusTotal API key not found in environment variables")
             return False
 
+        key_status = key_status if key_status is not None else get_key_status_cache()
+        cached_status = key_status.get('virustotal', api_key)
+        if cached_status is not None:
+            if not cached_status:
+                print("VirusTotal API key is invalid or expired (cached status)")
+            return cached_status
+        if lazy:
+            return True
+
         url = "https://www.virustotal.com/api/v3/ip_addresses/8.8.8.8"
         headers = {
             'x-apikey': api_key,
             'Accept': 'application/json',
         }
 
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_shared_session().get(url, headers=headers, timeout=10)
 
         if response.status_code == 401:
             print("VirusTotal API key is invalid or expired")
+            key_status.set('virustotal', api_key, False)
             return False
         elif response.status_code != 200:
             print(f"VirusTotal API returned status code: {response.status_code}")
             return False
 
+        key_status.set('virustotal', api_key, True)
         return True
 
     except Exception as e:
@@ -41,16 +64,37 @@ def check_virustotal_key(api_key: str) -> bool:
         return False
 
 
-def check_ip_virustotal(ip: str, api_key: str) -> Optional[VirusTotalIP]:
-    """Check IP reputation via VirusTotal API v3."""
+def check_ip_virustotal(ip: str, api_key: str,
+                        client: Optional[HttpClient] = None,
+                        cache: Optional[ReputationCache] = None,
+                        lazy: bool = False) -> Optional[VirusTotalIP]:
+    """
+    Check IP reputation via VirusTotal API v3.
+    Uses shared VirusTotal HTTP client by default and returns cached
+    result when `cache` holds a fresh entry for the IP. With lazy=True
+    returns VirusTotalIPLazy, which validates engine results on demand.
+    """
+    model_class = VirusTotalIPLazy if lazy else VirusTotalIP
+
     url = f"https://www.virustotal.com/api/v3/ip_addresses/{ip}"
     headers = {
         "x-apikey": api_key,
         "Accept": "application/json"
     }
 
+    http = client if client is not None else get_http_client('virustotal')
+
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        if cache is not None:
+            cached_data = cache.get('virustotal', ip)
+            if cached_data is not None:
+                try:
+                    return model_class.model_validate(cached_data)
+                except ValidationError as e:
+                    # Entry written before results were validated, query again
+                    print(f"[WARNING] Invalid cached VirusTotal result for IP {ip}: {e.error_count()} errors")
+
+        response = http.get(url, headers=headers)
         response.raise_for_status()
 
         data = response.json()
@@ -81,43 +125,202 @@ def check_ip_virustotal(ip: str, api_key: str) -> Optional[VirusTotalIP]:
         }
 
         # Sukuriam Pydantic modelį
-        return VirusTotalIP(**vt_data)
+        vt_result = model_class(**vt_data)
+
+        if cache is not None:
+            # Cache holds validated payloads only: lazy results are fully
+            # validated first, and not cached if an engine result is invalid
+            try:
+                full_result = vt_result.to_full_model() if lazy else vt_result
+            except ValidationError as e:
+                print(f"[WARNING] VirusTotal result for IP {ip} not cached: {e.error_count()} invalid engine results")
+            else:
+                cache.set('virustotal', ip, full_result.model_dump())
+
+        return vt_result
 
     except Exception as e:
         print(f"[ERROR] Failed to check IP {ip}: {e}")
         return None
 
 
-def get_virustotal_info_from_ips_list(ip_list: List[str], api_key: str) -> List[Dict]:
+def get_virustotal_info_from_ips_list(ip_list: List[str], api_key: str,
+                                      client: Optional[HttpClient] = None,
+                                      cache: Optional[ReputationCache] = None,
+                                      lazy: bool = False) -> List[Dict]:
     """
     Check multiple IP addresses using VirusTotal API.
+    Requests are paced by the VirusTotal client rate limiter, so the loop runs at
+    the quota ceiling instead of failing with 429 responses. Duplicate
+    addresses are queried once.
     Args:
         ip_list: List of IP addresses to check
         api_key: API key for VirusTotal
+        client: Optional HttpClient, shared VirusTotal client by default
+        cache: Optional ReputationCache for previously checked IPs
+        lazy: Skip validation of per-engine results (faster bulk runs)
     Returns:
         list: List of VirusTotalIP models converted to dictionaries
     """
-    collected_data = []
+    unique_ips, positions = dedupe_ips(ip_list)
+    results = {}
+
+    for ip_address in unique_ips:
+        vt_result = check_ip_virustotal(ip_address, api_key, client=client,
+                                        cache=cache, lazy=lazy)
+
+        if vt_result is None:
+            continue
+
+        results[ip_address] = vt_result.model_dump(exclude_none=True)
+
+    return fan_out(results, positions)
+
+
+def iter_virustotal_info_from_ips_list(ip_list: List[str], api_key: str,
+                                       client: Optional[HttpClient] = None,
+                                       cache: Optional[ReputationCache] = None,
+                                       lazy: bool = False) -> Iterator[Dict]:
+    """
+    Generator version of get_virustotal_info_from_ips_list().
+    Yields each record as soon as it is checked, one per unique IP address.
+    Args:
+        ip_list: List of IP addresses to check
+        api_key: API key for VirusTotal
+        client: Optional HttpClient, shared VirusTotal client by default
+        cache: Optional ReputationCache for previously checked IPs
+        lazy: Skip validation of per-engine results (faster bulk runs)
+    Yields:
+        dict: VirusTotalIP model dump for each successfully processed IP
+    """
+    unique_ips, _ = dedupe_ips(ip_list)
+
+    for ip_address in unique_ips:
+        vt_result = check_ip_virustotal(ip_address, api_key, client=client,
+                                        cache=cache, lazy=lazy)
+
+        if vt_result is not None:
+            yield vt_result.model_dump(exclude_none=True)
+
+
+def virustotal_record_ip(record: Dict) -> str:
+    """Return IP address of VirusTotalIP model dump."""
+    return record['ip']
+
+
+def scan_virustotal_to_jsonl(ip_list: List[str], api_key: str,
+                             output_file=VIRUSTOTAL_OUTPUT_FILE, **kwargs) -> int:
+    """
+    Check IP addresses with VirusTotal and stream results into JSONL file.
+    IP addresses already present in output_file are skipped (resume).
+    Args:
+        ip_list: List of IP addresses to check
+        api_key: API key for VirusTotal
+        output_file: JSONL file, appended
+        **kwargs: Passed to iter_virustotal_info_from_ips_list()
+    Returns:
+        int: Number of records written during this run
+    """
+    remaining = pending_ips(ip_list, output_file, virustotal_record_ip)
+    print(f"{len(ip_list) - len(remaining)} IPs already in {output_file}, {len(remaining)} to check")
+
+    records = iter_virustotal_info_from_ips_list(remaining, api_key, **kwargs)
+    return write_jsonl(records, output_file)
+
+
+def _network_record(ip: str, payload: dict) -> Dict:
+    """Reuse network-level result of another IP (or the IP itself) for given IP."""
+    record = {key: value for key, value in payload.items() if value is not None}
+    if record['ip'] != ip:
+        record['inferred_from'] = record['ip']
+        record['ip'] = ip
+    return record
+
+
+def get_virustotal_info_grouped(ip_list: List[str], api_key: str, cache: ReputationCache,
+                                query_representative: bool = False,
+                                client: Optional[HttpClient] = None) -> List[Dict]:
+    """
+    Check IP addresses with VirusTotal, one query per network range.
+    IPs inside a network known from cached results are answered from that
+    result (marked with `inferred_from`). Other IPs are queried one by one
+    and each new result adds its network to the index, so following IPs of
+    the same range do not spend quota.
+    Args:
+        ip_list: List of IP addresses to check
+        api_key: API key for VirusTotal
+        cache: ReputationCache with previous VirusTotal results
+        query_representative: Query one fresh IP per known ASN (or per network
+            if its ASN is unknown) instead of reusing the cached result
+        client: Optional HttpClient, shared VirusTotal client by default
+    Returns:
+        list: VirusTotalIP dicts in the same order as ip_list
+    """
+    index = NetworkIndex.from_cache(cache)
+    groups, unknown = group_ips_by_network(ip_list, index)
+    results = {}
+    queries = 0
 
-    for ip_address in ip_list:
-        vt_result = check_ip_virustotal(ip_address, api_key)
+    if query_representative:
+        for networks in group_networks_by_asn(groups, index).values():
+            representative = groups[networks[0]][0]
+            cached_asn = index.lookup(representative)[1].get('asn')
+            vt_result = check_ip_virustotal(representative, api_key, client=client)
+            queries += 1
+            if vt_result is None:
+                continue
 
+            cache.set('virustotal', representative, vt_result.model_dump())
+            fresh = vt_result.model_dump(exclude_none=True)
+            results[representative] = fresh
+            if vt_result.network:
+                index.add(vt_result.network, fresh)
+
+            # Fresh verdict covers the whole ASN only if the ASN did not change
+            same_asn = vt_result.asn is not None and vt_result.asn == cached_asn
+            for network in networks if same_asn else networks[:1]:
+                for ip in groups[network]:
+                    if ip not in results:
+                        results[ip] = _network_record(ip, fresh)
+
+    for ips in groups.values():
+        for ip in ips:
+            if ip not in results:
+                results[ip] = _network_record(ip, index.lookup(ip)[1])
+
+    for ip in unknown:
+        match = index.lookup(ip)
+        if match is not None:
+            results[ip] = _network_record(ip, match[1])
+            continue
+
+        vt_result = check_ip_virustotal(ip, api_key, client=client, cache=cache)
+        queries += 1
         if vt_result is None:
             continue
 
-        collected_data.append(vt_result.model_dump(exclude_none=True))
+        results[ip] = vt_result.model_dump(exclude_none=True)
+        if vt_result.network:
+            index.add(vt_result.network, results[ip])
+
+    print(f"VirusTotal grouped check: {len(results)} IPs answered with {queries} API queries")
 
-    return collected_data
+    _, positions = dedupe_ips(ip_list)
+    return fan_out(results, positions)
 
 
 if __name__ == "__main__":
     virustotal_api_key = os.getenv('VIRUSTOTAL_API')
 
-    vt_api_key_check = check_virustotal_key(virustotal_api_key)
-    domain_to_ip_results = [domain_to_ip(domain) for domain in domain_list]
+    vt_api_key_check = check_virustotal_key(virustotal_api_key, lazy=True)
+    domain_to_ip_results = domains_to_ips(domain_list)
 
     if vt_api_key_check:
-        results = get_virustotal_info_from_ips_list(domain_to_ip_results, virustotal_api_key)
-        print(results)
+        reputation_cache = ReputationCache()
+        written = scan_virustotal_to_jsonl(domain_to_ip_results, virustotal_api_key,
+                                           cache=reputation_cache)
+        print(f"Saved {written} records to {VIRUSTOTAL_OUTPUT_FILE}")
+        print(f"HTTP client metrics: {get_http_client('virustotal').metrics()}")
+        print(f"Cache stats: {reputation_cache.stats()}")
     else:
         print("VirusTotal API key is not valid. Please check your '.env' file.")
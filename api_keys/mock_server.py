@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def abuse_payload(ip_address: str) -> dict:
+    """
+    Build a fake AbuseIPDB /check response for given IP address.
+    Args:
+        ip_address: IP address to put in the response
+    Returns:
+        dict: Response body in the same shape as the real API
+    """
+    return {
+        'data': {
+            'ipAddress': ip_address,
+            'isPublic': True,
+            'ipVersion': 6 if ':' in ip_address else 4,
+            'isWhitelisted': None,
+            'abuseConfidenceScore': 0,
+            'countryCode': 'LT',
+            'usageType': 'Fixed Line ISP',
+            'isp': 'Telia Lietuva, AB',
+            'domain': 'telia.lt',
+            'hostnames': [],
+            'isTor': False,
+            'countryName': 'Lithuania',
+            'totalReports': 0,
+            'numDistinctUsers': 0,
+            'lastReportedAt': None,
+            'reports': []
+        }
+    }
+
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    """Answers AbuseIPDB style requests after a configurable delay."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        self.server.request_count += 1
+
+        url = urlparse(self.path)
+        ip_address = parse_qs(url.query).get('ipAddress', ['127.0.0.1'])[0]
+        body = json.dumps(abuse_payload(ip_address)).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(latency: float = 0.05) -> ThreadingHTTPServer:
+    """
+    Start local stand-in API server in a background thread.
+    Args:
+        latency: Seconds to wait before answering each request
+    Returns:
+        ThreadingHTTPServer: Running server, call .shutdown() when done.
+            Base URL is f"http://127.0.0.1:{server.server_port}/api/v2/check"
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockApiHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.request_count = 0
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,118 @@
+import ipaddress
+from typing import Dict, List, Optional, Tuple
+from cache import ReputationCache
+from coalesce import normalize_ip
+
+
+class NetworkIndex:
+    """
+    Longest-prefix-match index over CIDR ranges.
+
+    Networks are kept in one dict per (IP version, prefix length), so lookup
+    costs one dict access per distinct prefix length instead of a scan over
+    all cached ranges.
+
+    Example:
+        index = NetworkIndex()
+        index.add('78.62.0.0/16', {'asn': 8764})
+        index.lookup('78.62.199.128')  # -> ('78.62.0.0/16', {'asn': 8764})
+    """
+
+    def __init__(self):
+        self.tables: Dict[Tuple[int, int], Dict[int, Tuple[str, dict]]] = {}
+        self.prefix_lengths: Dict[int, List[int]] = {4: [], 6: []}
+
+    def __len__(self):
+        return sum(len(table) for table in self.tables.values())
+
+    def add(self, cidr: str, payload: dict) -> bool:
+        """
+        Add network range with payload (e.g. cached VirusTotalIP dump).
+        Returns:
+            bool: False if cidr is not a valid network
+        """
+        try:
+            network = ipaddress.ip_network(cidr, strict=False)
+        except (TypeError, ValueError):
+            return False
+
+        key = (network.version, network.prefixlen)
+        if key not in self.tables:
+            self.tables[key] = {}
+            lengths = self.prefix_lengths[network.version]
+            lengths.append(network.prefixlen)
+            lengths.sort(reverse=True)
+
+        shift = network.max_prefixlen - network.prefixlen
+        self.tables[key][int(network.network_address) >> shift] = (network.with_prefixlen, payload)
+        return True
+
+    def lookup(self, ip: str) -> Optional[Tuple[str, dict]]:
+        """
+        Find the most specific network containing IP address.
+        Returns:
+            tuple: (network CIDR, payload) or None if IP is not in any network
+        """
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+
+        value = int(address)
+        for prefixlen in self.prefix_lengths[address.version]:
+            shift = address.max_prefixlen - prefixlen
+            match = self.tables[(address.version, prefixlen)].get(value >> shift)
+            if match is not None:
+                return match
+
+        return None
+
+    @classmethod
+    def from_cache(cls, cache: ReputationCache, provider: str = 'virustotal') -> 'NetworkIndex':
+        """Build index from `network` field of cached provider results."""
+        index = cls()
+        for _, payload in cache.items(provider):
+            if payload.get('network') and not payload.get('inferred_from'):
+                index.add(payload['network'], payload)
+        return index
+
+
+def group_ips_by_network(ip_list: List[str], index: NetworkIndex) -> Tuple[Dict[str, List[str]], List[str]]:
+    """
+    Group IP addresses by known network ranges.
+    Args:
+        ip_list: IP addresses to group
+        index: NetworkIndex with known ranges
+    Returns:
+        tuple: ({network CIDR: [normalized IPs]}, [IPs outside known networks])
+    """
+    groups: Dict[str, List[str]] = {}
+    unknown = []
+
+    for ip in dict.fromkeys(filter(None, map(normalize_ip, ip_list))):
+        match = index.lookup(ip)
+        if match is None:
+            unknown.append(ip)
+        else:
+            groups.setdefault(match[0], []).append(ip)
+
+    return groups, unknown
+
+
+def group_networks_by_asn(groups: Dict[str, List[str]], index: NetworkIndex) -> Dict[str, List[str]]:
+    """
+    Merge network groups that belong to the same autonomous system.
+    Args:
+        groups: {network CIDR: [IPs]} from group_ips_by_network
+        index: NetworkIndex the groups were built from
+    Returns:
+        dict: {'AS<number>' or network CIDR if ASN is unknown: [network CIDRs]}
+    """
+    by_asn: Dict[str, List[str]] = {}
+
+    for network, ips in groups.items():
+        _, payload = index.lookup(ips[0])
+        asn = payload.get('asn')
+        by_asn.setdefault(f"AS{asn}" if asn is not None else network, []).append(network)
+
+    return by_asn
@@ -0,0 +1,165 @@
+import threading
+import time
+from typing import Dict, Optional
+from constants import RATE_LIMITS
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    Holds up to `capacity` tokens and refills `capacity` tokens every `period` seconds.
+    """
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self) -> float:
+        """
+        Take one token if available.
+        Returns:
+            float: 0 if token was taken, otherwise seconds until next token
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def peek(self) -> float:
+        """Return number of tokens available now without taking one."""
+        with self.lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+    def give_back(self):
+        """Return one token taken by try_acquire (used when other bucket is empty)."""
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def set_remaining(self, remaining: int):
+        """Lower available tokens to the value reported by the provider."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, float(remaining))
+
+
+class RateLimiter:
+    """
+    Quota-aware scheduler for one API provider.
+    Combines per-minute and per-day token buckets with pauses requested by
+    the provider through `Retry-After` / `X-RateLimit-*` response headers.
+    """
+
+    def __init__(self, provider: str, per_minute: Optional[int] = None, per_day: Optional[int] = None):
+        self.provider = provider
+        self.minute_bucket = TokenBucket(per_minute, 60) if per_minute else None
+        self.day_bucket = TokenBucket(per_day, 24 * 60 * 60) if per_day else None
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Take permission for one request without waiting.
+        Returns:
+            float: 0 if request is allowed, otherwise seconds to wait
+        """
+        with self.lock:
+            blocked = self.blocked_until - time.monotonic()
+        if blocked > 0:
+            return blocked
+
+        taken = []
+        for bucket in (self.minute_bucket, self.day_bucket):
+            if bucket is None:
+                continue
+            wait = bucket.try_acquire()
+            if wait > 0:
+                for taken_bucket in taken:
+                    taken_bucket.give_back()
+                return wait
+            taken.append(bucket)
+
+        return 0.0
+
+    def acquire(self):
+        """Block until a request to the provider is allowed."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def available(self) -> float:
+        """Number of requests allowed right now (lowest of the buckets)."""
+        if self.blocked_until > time.monotonic():
+            return 0.0
+        buckets = [bucket for bucket in (self.minute_bucket, self.day_bucket) if bucket is not None]
+        if not buckets:
+            return float('inf')
+        return min(bucket.peek() for bucket in buckets)
+
+    def block_for(self, seconds: float):
+        """Pause all requests to the provider for given number of seconds."""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """
+        Sync limiter with rate limit headers returned by the provider.
+        Args:
+            headers: Response headers (case-insensitive mapping)
+        """
+        retry_after = _parse_number(headers.get('Retry-After'))
+        if retry_after is not None:
+            self.block_for(retry_after)
+
+        remaining = _parse_number(headers.get('X-RateLimit-Remaining'))
+        if remaining is None:
+            return
+
+        if self.day_bucket is not None:
+            self.day_bucket.set_remaining(int(remaining))
+
+        if remaining <= 0:
+            reset = _parse_number(headers.get('X-RateLimit-Reset'))
+            if reset is not None:
+                # AbuseIPDB sends Unix timestamp, other providers send seconds
+                seconds = reset - time.time() if reset > 1_000_000_000 else reset
+                self.block_for(max(seconds, 0))
+
+
+def _parse_number(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """
+    Get process-wide rate limiter for provider configured in constants.RATE_LIMITS.
+    Args:
+        provider: Provider name, e.g. 'abuseipdb' or 'virustotal'
+    Returns:
+        RateLimiter: Shared limiter instance
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            limits = RATE_LIMITS.get(provider, {})
+            _limiters[provider] = RateLimiter(provider, **limits)
+        return _limiters[provider]
+
@@ -0,0 +1,152 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from rich import print
+from abuseip_model import AbuseModel
+from virustotal_model import VirusTotalIP
+from reputation_model import CombinedVerdict
+from cache import ReputationCache
+from coalesce import dedupe_ips, fan_out
+from ip_list import domain_list
+from socket_domain_ip import domains_to_ips
+from main_abuseip import check_abuseipdb_key, get_info_from_ip, transform_to_abuse_model
+from main_virustotal import check_virustotal_key, check_ip_virustotal
+from constants import (
+    ABUSE_API_URL,
+    ABUSE_MAX_WORKERS,
+    ABUSE_MALICIOUS_SCORE,
+    ABUSE_SUSPICIOUS_SCORE,
+    VIRUSTOTAL_MAX_WORKERS,
+)
+
+
+def check_api_keys(abuse_key: Optional[str], virustotal_key: Optional[str],
+                   lazy: bool = False) -> Dict[str, str]:
+    """
+    Validate API keys of all providers.
+    Args:
+        abuse_key: AbuseIPDB API key or None
+        virustotal_key: VirusTotal API key or None
+        lazy: Accept keys without cached status, first real request validates them
+    Returns:
+        dict: {provider: api key} only for providers with a valid key
+    """
+    valid_keys = {}
+
+    if abuse_key and check_abuseipdb_key(abuse_key, ABUSE_API_URL, lazy=lazy):
+        valid_keys['abuseipdb'] = abuse_key
+    if virustotal_key and check_virustotal_key(virustotal_key, lazy=lazy):
+        valid_keys['virustotal'] = virustotal_key
+
+    return valid_keys
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _fetch_abuse(ip_address: str, api_key: str, cache) -> Optional[AbuseModel]:
+    data = get_info_from_ip(ip_address, api_key, ABUSE_API_URL, cache=cache)
+    return transform_to_abuse_model(data) if data is not None else None
+
+
+def combine_verdict(ip_address: str, abuse: Optional[AbuseModel], virustotal: Optional[VirusTotalIP],
+                    latency: Dict[str, float]) -> CombinedVerdict:
+    """
+    Merge provider results into one verdict record.
+    Malicious wins over suspicious, suspicious over clean; 'unknown' when
+    no provider returned data.
+    """
+    abuse_score = abuse.reputation.abuseConfidenceScore if abuse is not None else 0
+
+    if abuse is None and virustotal is None:
+        verdict = 'unknown'
+    elif abuse_score >= ABUSE_MALICIOUS_SCORE or (virustotal is not None and virustotal.is_malicious()):
+        verdict = 'malicious'
+    elif abuse_score >= ABUSE_SUSPICIOUS_SCORE or (virustotal is not None and virustotal.is_suspicious()):
+        verdict = 'suspicious'
+    else:
+        verdict = 'clean'
+
+    return CombinedVerdict(ip=ip_address, verdict=verdict, abuse=abuse,
+                           virustotal=virustotal, latency=latency)
+
+
+def enrich_ips_list(ip_list: List[str], api_keys: Dict[str, str],
+                    cache: Optional[ReputationCache] = None) -> List[Dict]:
+    """
+    Check IP addresses with AbuseIPDB and VirusTotal in parallel.
+    Every provider has its own worker pool, so the slower provider does not
+    hold back requests to the faster one.
+    Args:
+        ip_list: List of IP addresses to check
+        api_keys: {provider: api key} from check_api_keys()
+        cache: Optional ReputationCache for previously checked IPs
+    Returns:
+        list: CombinedVerdict dumps in the same order as ip_list
+    """
+    unique_ips, positions = dedupe_ips(ip_list)
+    abuse_futures: Dict[str, Future] = {}
+    vt_futures: Dict[str, Future] = {}
+
+    with ThreadPoolExecutor(max_workers=ABUSE_MAX_WORKERS) as abuse_executor, \
+            ThreadPoolExecutor(max_workers=VIRUSTOTAL_MAX_WORKERS) as vt_executor:
+        for ip_address in unique_ips:
+            if 'abuseipdb' in api_keys:
+                abuse_futures[ip_address] = abuse_executor.submit(
+                    _timed, _fetch_abuse, ip_address, api_keys['abuseipdb'], cache
+                )
+            if 'virustotal' in api_keys:
+                vt_futures[ip_address] = vt_executor.submit(
+                    _timed, check_ip_virustotal, ip_address, api_keys['virustotal'], cache=cache
+                )
+
+        results = {}
+        for ip_address in unique_ips:
+            latency = {}
+            abuse, virustotal = None, None
+
+            if ip_address in abuse_futures:
+                abuse, latency['abuseipdb'] = abuse_futures[ip_address].result()
+            if ip_address in vt_futures:
+                virustotal, latency['virustotal'] = vt_futures[ip_address].result()
+
+            verdict = combine_verdict(ip_address, abuse, virustotal, latency)
+            results[ip_address] = verdict.model_dump(by_alias=True, exclude_none=True)
+
+    return fan_out(results, positions)
+
+
+def latency_summary(records: List[Dict]) -> Dict[str, Dict[str, float]]:
+    """
+    Average and max latency per provider.
+    Args:
+        records: Output of enrich_ips_list()
+    Returns:
+        dict: {provider: {'avg': seconds, 'max': seconds, 'count': n}}
+    """
+    latencies: Dict[str, List[float]] = {}
+    for record in records:
+        for provider, seconds in record.get('latency', {}).items():
+            latencies.setdefault(provider, []).append(seconds)
+
+    return {
+        provider: {'avg': sum(values) / len(values), 'max': max(values), 'count': len(values)}
+        for provider, values in latencies.items()
+    }
+
+
+if __name__ == "__main__":
+    keys = check_api_keys(os.getenv('ABUSEIPDB_API'), os.getenv('VIRUSTOTAL_API'), lazy=True)
+
+    if keys:
+        ips = domains_to_ips(domain_list)
+        reputation_cache = ReputationCache()
+        enriched = enrich_ips_list(ips, keys, cache=reputation_cache)
+        print(enriched)
+        print(f"Latency per provider: {latency_summary(enriched)}")
+    else:
+        print("No valid API keys found. Please check your '.env' file.")
@@ -0,0 +1,22 @@
+from typing import Dict, Literal, Optional
+from pydantic import BaseModel, Field
+from abuseip_model import AbuseModel
+from virustotal_model import VirusTotalIP
+
+
+class CombinedVerdict(BaseModel):
+    """
+    IP reputation merged from AbuseIPDB and VirusTotal.
+
+    Attributes:
+        ip: IP address that was analyzed
+        verdict: Overall verdict from all providers which answered
+        abuse: AbuseIPDB result or None if provider failed / not used
+        virustotal: VirusTotal result or None if provider failed / not used
+        latency: Seconds spent on each provider request
+    """
+    ip: str = Field(description="IP address")
+    verdict: Literal['malicious', 'suspicious', 'clean', 'unknown']
+    abuse: Optional[AbuseModel] = None
+    virustotal: Optional[VirusTotalIP] = None
+    latency: Dict[str, float] = Field(default_factory=dict, description="Provider latency in seconds")
@@ -1,4 +1,9 @@
 import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from constants import DNS_CACHE_TTL, DNS_NEGATIVE_TTL, DNS_MAX_WORKERS
 
 
 def clean_domain(domain: str) -> str:
@@ -68,10 +73,122 @@ def domain_to_ip(domain: str) -> str:
         return None
 
 
+class DnsCache:
+    """
+    Thread-safe in-memory DNS answer cache.
+    Successful answers live for `ttl` seconds, failed lookups are cached
+    as empty answers for `negative_ttl` seconds (negative caching).
+    """
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL, negative_ttl: float = DNS_NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.entries: Dict[str, tuple] = {}
+        self.lock = threading.Lock()
+
+    def get(self, domain: str) -> Optional[List[str]]:
+        """Return cached addresses (empty list for cached failure) or None if not cached."""
+        with self.lock:
+            entry = self.entries.get(domain)
+            if entry is None:
+                return None
+            expires_at, addresses = entry
+            if time.monotonic() > expires_at:
+                del self.entries[domain]
+                return None
+            return addresses
+
+    def set(self, domain: str, addresses: List[str]):
+        ttl = self.ttl if addresses else self.negative_ttl
+        with self.lock:
+            self.entries[domain] = (time.monotonic() + ttl, addresses)
+
+
+_dns_cache = DnsCache()
+
+
+def resolve_all(domain: str, resolver: Callable = socket.getaddrinfo) -> List[str]:
+    """
+    Resolve domain name to all its A and AAAA records.
+    Args:
+        domain: Cleaned domain name (e.g., 'google.com')
+        resolver: getaddrinfo compatible function, can be replaced by a stub
+    Returns:
+        list: Unique IPv4 and IPv6 addresses in resolver order,
+            empty list if domain can not be resolved
+    """
+    try:
+        answers = resolver(domain, None, proto=socket.IPPROTO_TCP)
+    # OSError includes socket.gaierror, one failed domain must not fail the batch
+    except (OSError, UnicodeError) as e:
+        print(f"Failed to resolve domain {domain}: {e}")
+        return []
+
+    addresses = []
+    for family, _, _, _, sockaddr in answers:
+        if family in (socket.AF_INET, socket.AF_INET6) and sockaddr[0] not in addresses:
+            addresses.append(sockaddr[0])
+    return addresses
+
+
+def resolve_domains(domains: List[str], max_workers: int = DNS_MAX_WORKERS,
+                    resolver: Callable = socket.getaddrinfo,
+                    cache: Optional[DnsCache] = None) -> Dict[str, List[str]]:
+    """
+    Resolve many domains concurrently with caching.
+    Args:
+        domains: Domain names or URLs (cleaned with clean_domain)
+        max_workers: Number of parallel lookups
+        resolver: getaddrinfo compatible function, can be replaced by a stub
+        cache: DnsCache to use, module-level cache by default
+    Returns:
+        dict: {cleaned domain: list of A/AAAA addresses}, empty list if
+            domain could not be resolved
+    Example:
+        resolve_domains(['https://www.google.com/', 'github.com'])
+        -> {'google.com': ['142.250.185.46', '2a00:1450:4001:82b::200e'],
+            'github.com': ['140.82.121.4']}
+    """
+    cache = cache if cache is not None else _dns_cache
+    cleaned = [domain for domain in dict.fromkeys(clean_domain(d) for d in domains) if domain]
+
+    results = {}
+    to_resolve = []
+    for domain in cleaned:
+        cached = cache.get(domain)
+        if cached is None:
+            to_resolve.append(domain)
+        else:
+            results[domain] = cached
+
+    if to_resolve:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_resolve)))) as executor:
+            answers = executor.map(lambda domain: resolve_all(domain, resolver), to_resolve)
+            for domain, addresses in zip(to_resolve, answers):
+                cache.set(domain, addresses)
+                results[domain] = addresses
+
+    return {domain: results[domain] for domain in cleaned}
+
+
+def domains_to_ips(domains: List[str], **kwargs) -> List[str]:
+    """
+    Resolve domains concurrently and return one flat list of unique IPs.
+    Args:
+        domains: Domain names or URLs
+        **kwargs: Passed to resolve_domains()
+    Returns:
+        list: All resolved IPv4 and IPv6 addresses
+    """
+    resolved = resolve_domains(domains, **kwargs)
+    return list(dict.fromkeys(ip for addresses in resolved.values() for ip in addresses))
+
+
 if __name__ == "__main__":
     domain = "https://www.skelbiu.lt/skelbimai"
     ip = domain_to_ip(domain)
     print(f"{domain} → {ip}")
+    print(resolve_domains([domain, "https://www.google.com/", "github.com"]))
 
 # https://www.skelbiu.lt/
 # "https://www.google.com/"
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Literal
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Any, Dict, List, Optional, Literal
 
 
 class TotalVotes(BaseModel):
@@ -49,6 +49,8 @@ class VirusTotalIP(BaseModel):
         last_modification_date: Last data update timestamp (Unix epoch)
         total_votes: Community votes about this IP
         tags: Security tags applied to this IP
+        inferred_from: IP of the same network whose result was reused, None
+            for results checked directly
     """
     ip: str = Field(description="IP address")
     reputation: int = Field(description="Reputation score")
@@ -78,6 +80,14 @@ class VirusTotalIP(BaseModel):
     total_votes: Optional[TotalVotes] = Field(None, description="Community votes")
     tags: Optional[List[str]] = Field(default_factory=list, description="Security tags")
 
+    # Set when result is reused from another IP of the same network
+    inferred_from: Optional[str] = Field(None, description="IP whose result was reused for this network")
+
+    # Engine names grouped by category, built on first use from last_analysis_results
+    _engines_by_category: Optional[Dict[str, List[str]]] = PrivateAttr(None)
+    # Identity and size of the results dict the index was built from
+    _indexed_results: Optional[tuple] = PrivateAttr(None)
+
     class Config:
             """Pydantic configuration."""
             json_schema_extra = {
@@ -97,6 +107,34 @@ class VirusTotalIP(BaseModel):
                 }
             }
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == 'last_analysis_results':
+            self._engines_by_category = None
+
+    def _category_index(self) -> Dict[str, List[str]]:
+        """
+        Return per-category engine index, rebuilding it if results changed.
+
+        The index is dropped when last_analysis_results is reassigned and
+        rebuilt when engines are added or removed in place. Changing the
+        category of an existing entry in place requires reassigning the dict.
+        """
+        results = self.last_analysis_results
+        key = (id(results), len(results))
+        if self._engines_by_category is None or self._indexed_results != key:
+            index: Dict[str, List[str]] = {}
+            for engine_name, result in results.items():
+                category = result.get('category') if isinstance(result, dict) else result.category
+                index.setdefault(category, []).append(engine_name)
+            self._engines_by_category = index
+            self._indexed_results = key
+        return self._engines_by_category
+
+    def get_engines_by_category(self, category: str) -> List[str]:
+        """Get list of engines that put this IP into given category."""
+        return list(self._category_index().get(category, []))
+
     def is_malicious(self) -> bool:
         """Check if IP is flagged as malicious by any engine."""
         return self.last_analysis_stats.malicious > 0
@@ -112,16 +150,42 @@ class VirusTotalIP(BaseModel):
 
     def get_malicious_engines(self) -> List[str]:
         """Get list of engines that flagged this IP as malicious."""
-        return [
-            engine_name
-            for engine_name, result in self.last_analysis_results.items()
-            if result.category == 'malicious'
-        ]
+        return self.get_engines_by_category('malicious')
 
     def get_suspicious_engines(self) -> List[str]:
         """Get list of engines that flagged this IP as suspicious."""
-        return [
-            engine_name
-            for engine_name, result in self.last_analysis_results.items()
-            if result.category == 'suspicious'
-        ]
+        return self.get_engines_by_category('suspicious')
+
+
+class VirusTotalIPLazy(VirusTotalIP):
+    """
+    VirusTotalIP for bulk runs with lazy engine results validation.
+
+    Only summary fields are validated up front, last_analysis_results
+    keeps raw API dicts and each EngineResult is validated on first access.
+    Engine category index and model_dump() output are the same as VirusTotalIP.
+    """
+    last_analysis_results: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Raw results from each security engine, validated on demand"
+    )
+
+    _parsed_results: Dict[str, EngineResult] = PrivateAttr(default_factory=dict)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == 'last_analysis_results':
+            self._parsed_results = {}
+
+    def get_engine_result(self, engine_name: str) -> Optional[EngineResult]:
+        """Get validated result of one engine, None if engine is missing."""
+        if engine_name not in self._parsed_results:
+            raw = self.last_analysis_results.get(engine_name)
+            if raw is None:
+                return None
+            self._parsed_results[engine_name] = EngineResult.model_validate(raw)
+        return self._parsed_results[engine_name]
+
+    def to_full_model(self) -> VirusTotalIP:
+        """Validate all engine results and return regular VirusTotalIP."""
+        return VirusTotalIP.model_validate(self.model_dump())
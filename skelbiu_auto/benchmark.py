@@ -0,0 +1,677 @@
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from rich import print
+
+PROJECT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_DIR))
+os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "crawler.settings")
+
+from mock_site import start_mock_site
+
+
+def _crawl_worker(spider_name, settings_overrides, spider_kwargs, workdir, queue):
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+    from crawler.spiders.skelbiu_auto import SkelbiuAutoSpider
+    from crawler.spiders.autoplius import AutopliusSpider
+
+    spiders = {"skelbiu": SkelbiuAutoSpider, "autoplius": AutopliusSpider}
+
+    os.chdir(workdir)
+    # Spiders print every page, keep benchmark output readable
+    sys.stdout = open(os.devnull, "w")
+
+    settings = get_project_settings()
+    settings.set("LOG_ENABLED", False)
+    settings.set("LOG_FILE", None)
+    for name, value in settings_overrides.items():
+        settings.set(name, value)
+
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(spiders[spider_name])
+    started_at = time.monotonic()
+    cpu_started_at = time.process_time()
+    process.crawl(crawler, **spider_kwargs)
+    process.start()
+
+    stats = dict(crawler.stats.get_stats())
+    stats["runtime"] = time.monotonic() - started_at
+    stats["cpu_time"] = time.process_time() - cpu_started_at
+    queue.put({key: value for key, value in stats.items() if isinstance(value, (int, float, str))})
+
+
+def run_crawl(spider_name: str, workdir: str, settings_overrides: dict = None, **spider_kwargs) -> dict:
+    """
+    Run one crawl in a child process (Twisted reactor can not be restarted).
+    Args:
+        spider_name: 'skelbiu' or 'autoplius'
+        workdir: Working directory, data/ files of the crawl are kept there
+        settings_overrides: Scrapy settings set on top of crawler/settings.py
+        **spider_kwargs: Spider arguments
+    Returns:
+        dict: Scrapy stats of the crawl plus 'runtime' and 'cpu_time' in seconds
+    """
+    queue = multiprocessing.get_context("fork").Queue()
+    process = multiprocessing.get_context("fork").Process(
+        target=_crawl_worker,
+        args=(spider_name, settings_overrides or {}, spider_kwargs, workdir, queue),
+    )
+    process.start()
+    stats = queue.get()
+    process.join()
+    return stats
+
+
+def _main_worker(mode, start_urls, workdir, queue):
+    import main
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+
+    os.chdir(workdir)
+    sys.stdout = open(os.devnull, "w")
+
+    settings = get_project_settings()
+    settings.set("LOG_ENABLED", False)
+    settings.set("LOG_FILE", None)
+    process = CrawlerProcess(settings)
+    started_at = time.monotonic()
+    if mode == "pipelined":
+        main.run_pipelined(process, False, start_urls)
+    else:
+        main.run_sequential(process, False, start_urls)
+    queue.put(time.monotonic() - started_at)
+
+
+def run_main(mode: str, workdir: str, start_urls: list) -> float:
+    """
+    Run main.run_pipelined() or main.run_sequential() in a child process.
+    Returns:
+        float: Runtime in seconds
+    """
+    queue = multiprocessing.get_context("fork").Queue()
+    process = multiprocessing.get_context("fork").Process(
+        target=_main_worker, args=(mode, start_urls, workdir, queue),
+    )
+    process.start()
+    runtime = queue.get()
+    process.join()
+    return runtime
+
+
+def benchmark_conditional(ads_total: int = 480, latency: float = 0.05):
+    """
+    Compare a repeated Skelbiu crawl with and without ConditionalRequestMiddleware
+    against the local mock site. One ad changes price between crawls.
+    Args:
+        ads_total: Number of ads in the mock category (24 per page)
+        latency: Simulated server latency in seconds
+    """
+    server = start_mock_site(ads_total=ads_total, latency=latency)
+    base_settings = {"AUTOTHROTTLE_ENABLED": False, "CONCURRENT_REQUESTS": 8}
+    spider_kwargs = {"start_urls": [server.category_url]}
+
+    def report(label, stats):
+        print(f"{label:<24} requests={stats.get('downloader/request_count', 0):<4} "
+              f"KB={stats.get('downloader/response_bytes', 0) // 1024:<5} "
+              f"parsed={stats.get('response_received_count', 0):<4} "
+              f"items={stats.get('item_scraped_count', 0):<4} "
+              f"cpu={stats['cpu_time']:.2f}s")
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            enabled = dict(base_settings, CONDITIONAL_REQUESTS_ENABLED=True)
+            report("first crawl", run_crawl("skelbiu", workdir, enabled, **spider_kwargs))
+
+            # One ad on page 3 changes price
+            server.prices[1000000 + ads_total - 50] = 4500
+
+            report("repeat, middleware off", run_crawl("skelbiu", workdir, base_settings, **spider_kwargs))
+            report("repeat, ETag (304)", run_crawl("skelbiu", workdir, enabled, **spider_kwargs))
+
+            server.validators = False
+            report("repeat, body hash only", run_crawl("skelbiu", workdir, enabled, **spider_kwargs))
+    finally:
+        server.shutdown()
+
+
+def write_detail_links(workdir: str, server, count: int):
+    """Write SkelbiuAutoSpider output with `count` mock Autoplius links for AutopliusSpider."""
+    from crawler.spiders.constants import SKELBIU_AUTO_OUTPUT_FILE
+
+    output_file = Path(workdir) / SKELBIU_AUTO_OUTPUT_FILE
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as jsonl_file:
+        for item_id in range(1000000, 1000000 + count):
+            link = f"{server.base_url}/autoplius/skelbimai/audi-a4-allroad-{item_id}.html"
+            jsonl_file.write(json.dumps({"Item_ID": str(item_id), "Link": link}) + "\n")
+
+
+def benchmark_adaptive(ads: int = 400, latency: float = 0.1, capacity: int = 10):
+    """
+    Compare fixed and adaptive (AIMD) concurrency of the Autoplius detail
+    crawl against a mock server that slows down above `capacity` concurrent
+    requests and sheds load with 503 above twice the capacity.
+    Args:
+        ads: Number of ad pages to crawl
+        latency: Server latency in seconds at or below capacity
+        capacity: Concurrent requests the server handles without slowing down
+    """
+    server = start_mock_site(latency=latency, capacity=capacity)
+    runs = {
+        "4 + AutoThrottle": {"ADAPTIVE_CONCURRENCY_ENABLED": False, "CONCURRENT_REQUESTS": 4,
+                             "AUTOTHROTTLE_ENABLED": True},
+        "fixed 32": {"ADAPTIVE_CONCURRENCY_ENABLED": False, "CONCURRENT_REQUESTS_PER_DOMAIN": 32},
+        "adaptive (AIMD)": {},
+    }
+
+    try:
+        for label, settings_overrides in runs.items():
+            with tempfile.TemporaryDirectory() as workdir:
+                write_detail_links(workdir, server, ads)
+                server.reset_counters()
+                stats = run_crawl("autoplius", workdir, settings_overrides)
+                concurrency = ", ".join(
+                    f"{key.split('/')[1]}:{value}" for key, value in stats.items()
+                    if key.startswith("adaptive_concurrency/") and key.count("/") == 1
+                )
+                print(f"{label:<20} items={stats.get('item_scraped_count', 0):<4} "
+                      f"503={server.overload_count:<4} runtime={stats['runtime']:.1f}s "
+                      f"concurrency={concurrency or '-'}")
+    finally:
+        server.shutdown()
+
+
+def legacy_css_parse(response) -> dict:
+    """Previous AutopliusSpider.parse extraction (CSS query per row, nested models), baseline for benchmark_parse."""
+    from crawler.models.autop_models import AutopliusCarModel
+
+    parameter_data = {}
+    for row in response.css("div.parameter-row"):
+        label = row.css("div.parameter-label::text").get(default="N/A").strip()
+        value = row.css("div.parameter-value::text").get(default="N/A").strip()
+        if label and value:
+            parameter_data[label] = value
+
+    features_data = {}
+    for row in response.css("div.feature-row"):
+        label = row.css("div.feature-label::text").get(default="").strip()
+        items = row.css("div.feature-list span.feature-item::text").getall()
+        cleaned_items = [item.strip() for item in items if item.strip()]
+        if label and cleaned_items:
+            features_data[label] = cleaned_items
+
+    labels = ["Pirma registracija", "Rida", "Variklis", "Kuro tipas", "Kėbulo tipas", "Durų skaičius",
+              "Varantieji ratai", "Pavarų dėžė", "Klimato valdymas", "Spalva", "Tech. apžiūra iki",
+              "Ratlankių skersmuo", "Nuosava masė, kg", "Sėdimų vietų skaičius", "Euro standartas",
+              "CO₂ emisija, g/km", "Taršos mokestis", "Mieste", "Užmiestyje", "Vidutinės"]
+    fields = ["First_Registration", "Mileage", "Engine", "Fuel", "Body_Type", "Doors", "Drive",
+              "Gearbox", "Climate_Control", "Color", "Tech_Inspection", "Rim_Size", "Weight", "Seats",
+              "Euro_Standard", "CO2_Emission", "Pollution_Tax", "City_Consumption",
+              "Highway_Consumption", "Average_Consumption"]
+    parameters = {field: parameter_data.get(label, "N/A") for label, field in zip(labels, fields)}
+
+    description = (response.css("div.announcement-description").xpath("string(.)")
+                   .get(default="N/A").strip())
+    return AutopliusCarModel.model_validate({
+        "Id": response.css("span.announcement-id::text").get(default="N/A").strip(" ID:"),
+        "Price": response.css("div.price::text").get(default="N/A").strip().replace(" ", ""),
+        "Phone": response.css("div.js-phone-number::text").get(default="N/A").strip(),
+        "Link": response.url,
+        "Title": response.css("title::text").get(default="N/A").strip(),
+        "Parameters": parameters,
+        "Description": {"Description": [description.replace("\r", "").replace("\n", "")]},
+        "Features": {"Features": features_data},
+    }).model_dump()
+
+
+def load_fixtures(fixtures_dir: str = None, pages: int = 300) -> list:
+    """
+    Load saved Autoplius pages (*.html) from fixtures_dir, or build `pages`
+    mock pages when no directory is given.
+    Returns:
+        list: (url, body bytes) tuples
+    """
+    from mock_site import autoplius_html
+
+    if fixtures_dir:
+        return [(f"https://autoplius.lt/skelbimai/{path.name}", path.read_bytes())
+                for path in sorted(Path(fixtures_dir).glob("*.html"))]
+    return [(f"https://autoplius.lt/skelbimai/audi-a4-allroad-{item_id}.html",
+             autoplius_html(item_id, 5000 + item_id % 1000, padding=20000).encode("utf-8"))
+            for item_id in range(1000000, 1000000 + pages)]
+
+
+def benchmark_parse(fixtures_dir: str = None, pages: int = 300):
+    """
+    Pages/sec of Autoplius ad extraction over saved HTML pages.
+    Args:
+        fixtures_dir: Directory with saved Autoplius ad pages (*.html),
+            mock pages are generated when empty
+        pages: Number of mock pages
+    """
+    from lxml import html
+    from pydantic import TypeAdapter
+    from scrapy.http import HtmlResponse
+    from crawler.models.autop_models import AutopliusCarModel
+    from crawler.spiders.autoplius import AutopliusSpider, extract_car_data
+
+    fixtures = load_fixtures(fixtures_dir, pages)
+    spider = AutopliusSpider()
+    # Spider output is validated by ValidationPipeline
+    adapter = TypeAdapter(list[AutopliusCarModel])
+
+    def validated(items):
+        return adapter.dump_python(adapter.validate_python(items))
+
+    def css_path():
+        return [legacy_css_parse(HtmlResponse(url, body=body, encoding="utf-8")) for url, body in fixtures]
+
+    def spider_parse():
+        return [item for url, body in fixtures
+                for item in spider.parse(HtmlResponse(url, body=body, encoding="utf-8"))]
+
+    def lxml_direct():
+        return [extract_car_data(html.fromstring(body.decode("utf-8")), url) for url, body in fixtures]
+
+    expected = css_path()
+    assert validated(spider_parse()) == expected, "fast path output differs from CSS path"
+    assert validated(lxml_direct()) == expected, "lxml direct output differs from CSS path"
+
+    for label, run in [("CSS per row (old)", css_path), ("XPath table (spider)", spider_parse),
+                       ("lxml direct", lxml_direct)]:
+        started_at = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started_at
+        print(f"{label:<24} {len(fixtures) / elapsed:>8.0f} pages/s")
+
+
+def benchmark_shards(categories: int = 8, ads: int = 240, latency: float = 0.02, shards: int = 4):
+    """
+    Compare one process with `shards` processes for the full two-phase crawl
+    (main.run_sharded) of `categories` mock categories.
+    Args:
+        categories: Number of mock categories in start_urls
+        ads: Ads per category (24 per page)
+        latency: Simulated server latency in seconds
+        shards: Worker processes of the sharded run
+    """
+    import main
+
+    server = start_mock_site(ads_total=ads, latency=latency, padding=5000)
+    settings_overrides = {"LOG_ENABLED": False, "LOG_FILE": None}
+    workdir_before = os.getcwd()
+
+    try:
+        for shard_count in (1, shards):
+            with tempfile.TemporaryDirectory() as workdir:
+                os.chdir(workdir)
+                # Spiders print every page, keep benchmark output readable
+                stdout_fd = os.dup(1)
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, 1)
+                started_at = time.monotonic()
+                try:
+                    reports = main.run_sharded(shard_count, False, server.category_urls(categories),
+                                               settings_overrides)
+                finally:
+                    sys.stdout.flush()
+                    os.dup2(stdout_fd, 1)
+                    os.close(devnull)
+                    os.close(stdout_fd)
+                    os.chdir(workdir_before)
+                runtime = time.monotonic() - started_at
+
+            items = sum(report["items"] for report in reports if report["spider"] == "autoplius")
+            print(f"{shard_count} process(es): {items} detail items in {runtime:.1f}s "
+                  f"({items / runtime:.0f} items/s)")
+            for report in reports:
+                print(f"    {report['spider']:<10} shard {report['shard']}: {report['items']:>5} items "
+                      f"{report['runtime']:>6}s {report['items_per_sec']:>7} items/s")
+    finally:
+        server.shutdown()
+
+
+def benchmark_resume(ads: int = 400, latency: float = 0.05, kill_after: float = 3.0):
+    """
+    Kill (SIGKILL) an Autoplius detail crawl midway, run it again and check
+    that it resumes from the persistent frontier instead of starting over.
+    Args:
+        ads: Number of ad pages to crawl
+        latency: Simulated server latency in seconds
+        kill_after: Seconds before the first crawl is killed
+    """
+    from crawler.spiders.constants import AUTOP_OUTPUT_FILE
+
+    server = start_mock_site(latency=latency, capacity=None)
+
+    def feed_ids(workdir):
+        output_file = Path(workdir) / AUTOP_OUTPUT_FILE
+        if not output_file.exists():
+            return []
+        with open(output_file, "r", encoding="utf-8") as jsonl_file:
+            return [json.loads(line)["Id"] for line in jsonl_file]
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            write_detail_links(workdir, server, ads)
+
+            queue = multiprocessing.get_context("fork").Queue()
+            process = multiprocessing.get_context("fork").Process(
+                target=_crawl_worker, args=("autoplius", {}, {}, workdir, queue))
+            process.start()
+            time.sleep(kill_after)
+            process.kill()
+            process.join()
+            # Let server threads of the killed connections finish before forking again
+            while server.in_flight:
+                time.sleep(0.05)
+            killed_ids = feed_ids(workdir)
+            print(f"killed run:  {len(killed_ids)} items in feed, {server.request_count} requests")
+
+            server.reset_counters()
+            stats = run_crawl("autoplius", workdir)
+            ids = feed_ids(workdir)
+            print(f"resumed run: {stats.get('item_scraped_count', 0)} items, {server.request_count} requests, "
+                  f"{stats.get('frontier/resumed_pending', 0)} pending requests resumed")
+            print(f"feed:        {len(ids)} items, {len(set(ids))} unique of {ads} ads, "
+                  f"{len(ids) - len(set(ids))} duplicates")
+    finally:
+        server.shutdown()
+
+
+def _timed(run) -> float:
+    started_at = time.perf_counter()
+    run()
+    return time.perf_counter() - started_at
+
+
+def benchmark_validation(items: int = 5000):
+    """
+    Items/sec of item validation and normalization: model instance per item
+    (previous spider callbacks) vs ValidationPipeline TypeAdapter batches.
+    Args:
+        items: Number of raw items of each spider
+    """
+    from lxml import html
+    from pydantic import TypeAdapter
+    from crawler.models.autop_models import AutopliusCarModel
+    from crawler.models.skelbiu_models import SkelbiuAutoModel
+    from crawler.spiders.autoplius import extract_car_data
+
+    url, body = load_fixtures(pages=1)[0]
+    autoplius_item = extract_car_data(html.fromstring(body.decode("utf-8")), url)
+    raw_items = {
+        SkelbiuAutoModel: [{
+            "Item_ID": str(item_id), "Title": "Audi A4 allroad, 3.0 l., universalas", "City": "Kaunas,",
+            "Creation date": "rugsėjo 30 d.", "Item Params": ["2017 m.", "Dyzelinas", "212 000 km"],
+            "Price": str(4000 + item_id % 3000), "Link": f"https://www.skelbiu.lt/skelbimai/{item_id}.html",
+            "Image URL": f"https://www.skelbiu.lt/img/{item_id}.jpg",
+        } for item_id in range(items)],
+        AutopliusCarModel: [dict(autoplius_item, Id=str(item_id)) for item_id in range(items)],
+    }
+
+    for model, data in raw_items.items():
+        adapter = TypeAdapter(list[model])
+
+        def per_item():
+            return [model(**item).model_dump() for item in data]
+
+        def batched(batch_size):
+            return [dumped for start in range(0, len(data), batch_size)
+                    for dumped in adapter.dump_python(adapter.validate_python(data[start:start + batch_size]))]
+
+        assert batched(100) == per_item(), "batched output differs from per item output"
+        print(f"{model.__name__}")
+        runs = [("model per item", per_item)] + [
+            (f"TypeAdapter batch {size}", lambda size=size: batched(size)) for size in (1, 10, 100, 1000)]
+        for label, run in runs:
+            elapsed = min(_timed(run) for _ in range(3))
+            print(f"  {label:<22} {len(data) / elapsed:>9.0f} items/s")
+
+
+def benchmark_near_duplicates(ads_total: int = 480, duplicate_every: int = 5, latency: float = 0.02):
+    """
+    Skelbiu listing crawl followed by the Autoplius detail crawl, with and
+    without NearDuplicatePipeline, against a mock site where every
+    `duplicate_every`-th ad is a repost of another ad's car.
+    Args:
+        ads_total: Number of ads in the mock category
+        duplicate_every: Every n-th ad is a repost
+        latency: Simulated server latency in seconds
+    """
+    server = start_mock_site(ads_total=ads_total, latency=latency, duplicate_every=duplicate_every)
+    reposts = sum(1 for item_id in range(1000001, 1000001 + ads_total) if item_id % duplicate_every == 0)
+    spider_kwargs = {"start_urls": [server.category_url]}
+
+    try:
+        for label, enabled in [("without dedup", False), ("with dedup", True)]:
+            with tempfile.TemporaryDirectory() as workdir:
+                settings = {"NEAR_DUPLICATES_ENABLED": enabled}
+                listing = run_crawl("skelbiu", workdir, settings, **spider_kwargs)
+                detail = run_crawl("autoplius", workdir, settings)
+                print(f"{label:<14} listings={listing.get('item_scraped_count', 0):<4} "
+                      f"duplicates={listing.get('near_duplicates/found', 0)}/{reposts} "
+                      f"detail_requests={detail.get('downloader/request_count', 0):<4} "
+                      f"saved={detail.get('near_duplicates/detail_requests_saved', 0)}")
+    finally:
+        server.shutdown()
+
+
+def benchmark_store(listings: int = 50000, per_item_sample: int = 2000):
+    """
+    Listings store vs JSONL feed: upsert items/sec per item and in batch
+    transactions, then a model + price range + year query against the
+    indexed store and by re-parsing the JSONL file.
+    Args:
+        listings: Number of synthetic validated Skelbiu items
+        per_item_sample: Items upserted one transaction each (slow path)
+    """
+    from crawler.listings_store import ListingsStore
+    from mock_site import mock_car
+
+    models = ["A4 allroad", "A6", "A6 allroad", "Q5", "A3"]
+    items = []
+    for item_id in range(1000000, 1000000 + listings):
+        car = mock_car(item_id)
+        items.append({
+            "Item_ID": str(item_id), "Title": f"Audi {models[item_id % len(models)]}, 2.0 l., universalas",
+            "City": ["Vilnius,", "Kaunas,", "Klaipėda,"][item_id % 3], "Creation_date": "rugsėjo 30 d.",
+            "Item_Params": [f"{car['year']} m.", "Dyzelinas"], "Price": str(car["price"]),
+            "Link": f"https://www.skelbiu.lt/skelbimai/{item_id}.html", "Image_URL": "",
+            "Price_EUR": car["price"], "Year": car["year"], "Mileage_KM": car["mileage"], "Engine_Size_L": 2.0,
+        })
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = ListingsStore(Path(workdir) / "listings.sqlite3")
+        elapsed = _timed(lambda: [store.upsert([item]) for item in items[:per_item_sample]])
+        print(f"upsert, transaction per item  {per_item_sample / elapsed:>9.0f} items/s")
+        for batch_size in (100, 500):
+            elapsed = _timed(lambda: [store.upsert(items[start:start + batch_size])
+                                      for start in range(0, len(items), batch_size)])
+            print(f"upsert, batch {batch_size:<4}            {len(items) / elapsed:>9.0f} items/s")
+
+        feed = Path(workdir) / "skelbiu_output.jsonl"
+        with open(feed, "w", encoding="utf-8") as jsonl_file:
+            for item in items:
+                jsonl_file.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+        def scan_feed():
+            with open(feed, "r", encoding="utf-8") as jsonl_file:
+                return [item for item in map(json.loads, jsonl_file)
+                        if item["Title"].startswith("Audi A6 allroad,") and 8000 <= item["Price_EUR"] <= 12000
+                        and item["Year"] >= 2015]
+
+        def query_store():
+            return store.find(make="audi", model="a6 allroad", min_price=8000, max_price=12000,
+                              min_year=2015, limit=None)
+
+        assert len(scan_feed()) == len(query_store()), "store and feed results differ"
+        for label, run in [("re-parse JSONL feed", scan_feed), ("indexed store query", query_store)]:
+            elapsed = min(_timed(run) for _ in range(3))
+            print(f"{label:<29} {elapsed * 1000:>9.1f} ms ({len(run())} listings)")
+        store.close()
+
+
+def benchmark_price_history(listings: int = 10000, days: int = 30, change_rate: float = 0.03):
+    """
+    Daily crawls of the same listings into ListingsStore, `change_rate` of
+    them change price every day. Compares history size with a row per crawl
+    and the indexed "dropped >10% this week" query with a full history scan.
+    Args:
+        listings: Number of listings crawled every day
+        days: Number of daily crawls
+        change_rate: Share of listings changing price per day
+    """
+    import random
+    from crawler.listings_store import ListingsStore
+
+    rng = random.Random(1)
+    prices = {item_id: rng.randrange(2000, 40000, 100) for item_id in range(listings)}
+    now = time.time()
+    day = 24 * 3600
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = ListingsStore(Path(workdir) / "listings.sqlite3")
+        started_at = time.perf_counter()
+        for crawl in range(days):
+            for item_id in rng.sample(range(listings), int(listings * change_rate)) if crawl else []:
+                prices[item_id] = int(prices[item_id] * rng.uniform(0.75, 1.05)) // 100 * 100
+            items = [{"Item_ID": str(item_id), "Title": "Audi A6, 2.0 l., sedanas", "Price_EUR": price,
+                      "Link": f"https://www.skelbiu.lt/skelbimai/{item_id}.html"}
+                     for item_id, price in prices.items()]
+            for start in range(0, listings, 500):
+                store.upsert(items[start:start + 500], seen_at=now - (days - 1 - crawl) * day)
+        elapsed = time.perf_counter() - started_at
+        store.connection.execute("ANALYZE")
+
+        history_rows = store.connection.execute("SELECT COUNT(*) FROM price_history").fetchone()[0]
+        print(f"{days} crawls x {listings} listings in {elapsed:.1f}s, "
+              f"{history_rows} history rows instead of {days * listings}")
+
+        since = now - 7 * day
+
+        def full_scan():
+            # Every crawl's price of every listing, as diffing daily output files
+            drops = []
+            history = {}
+            for site, item_id, seen_at, price in store.connection.execute(
+                    "SELECT site, item_id, seen_at, price FROM price_history NOT INDEXED ORDER BY site, item_id, seen_at"):
+                history.setdefault((site, item_id), []).append((seen_at, price))
+            for changes in history.values():
+                before = [price for seen_at, price in changes if seen_at < since]
+                inside = [price for seen_at, price in changes if seen_at >= since]
+                if inside:
+                    old_price = before[-1] if before else inside[0]
+                    if changes[-1][1] <= old_price * 0.9:
+                        drops.append(changes)
+            return drops
+
+        def indexed():
+            return store.price_drops(10, since=since, limit=None)
+
+        assert len(full_scan()) == len(indexed()), "indexed query and full scan differ"
+        for label, run in [("full history scan", full_scan), ("price_drops() index", indexed)]:
+            elapsed = min(_timed(run) for _ in range(3))
+            print(f"{label:<22} {elapsed * 1000:>8.1f} ms ({len(run())} listings dropped >10% this week)")
+        store.close()
+
+
+def benchmark_pipelined(ads_total: int = 480, latency: float = 0.3):
+    """
+    Skelbiu listing crawl + Autoplius detail crawl as main.py runs them:
+    sequential (details after the listing output file is written) and
+    pipelined (LinkFeeder schedules details while listings are crawled).
+    Latency of an ad is the time from its listing stored to its details
+    stored, both read from the listings store.
+    Args:
+        ads_total: Number of ads in the mock category
+        latency: Simulated server latency in seconds
+    """
+    from crawler.listings_store import ListingsStore
+    from crawler.spiders.constants import LISTINGS_STORE_FILE
+
+    server = start_mock_site(ads_total=ads_total, latency=latency)
+
+    try:
+        for mode in ("sequential", "pipelined"):
+            with tempfile.TemporaryDirectory() as workdir:
+                runtime = run_main(mode, workdir, [server.category_url])
+                store = ListingsStore(Path(workdir) / LISTINGS_STORE_FILE)
+                latencies = sorted(row[0] for row in store.connection.execute(
+                    """SELECT detail.first_seen - listing.first_seen FROM listings AS listing
+                       JOIN listings AS detail ON detail.site = 'autoplius' AND detail.link = listing.link
+                       WHERE listing.site = 'skelbiu'"""
+                ))
+                store.close()
+                count = len(latencies)
+                average = sum(latencies) / count if count else 0.0
+                p50 = latencies[count // 2] if count else 0.0
+                print(f"{mode:<11} ads={count:<4} runtime={runtime:.2f}s "
+                      f"latency avg={average:.2f}s p50={p50:.2f}s max={latencies[-1] if count else 0.0:.2f}s")
+    finally:
+        server.shutdown()
+
+
+def benchmark_telemetry(ads_total: int = 480, latency: float = 0.02, error_rate: float = 0.05):
+    """
+    Skelbiu listing crawl and Autoplius detail crawl with and without
+    CrawlTelemetry (CPU overhead), then the final telemetry snapshots:
+    per-callback time, latency percentiles and retries of the 503s the
+    mock site returns for `error_rate` of requests.
+    Args:
+        ads_total: Number of ads in the mock category
+        latency: Simulated server latency in seconds
+        error_rate: Share of mock site requests answered with 503
+    """
+    from crawler.spiders.constants import TELEMETRY_FILE
+    from crawler.telemetry import print_summary
+
+    server = start_mock_site(ads_total=ads_total, latency=latency, error_rate=error_rate)
+    spider_kwargs = {"start_urls": [server.category_url]}
+
+    try:
+        for label, enabled in [("telemetry off", False), ("telemetry on", True)]:
+            with tempfile.TemporaryDirectory() as workdir:
+                settings = {"TELEMETRY_ENABLED": enabled, "TELEMETRY_INTERVAL": 1.0}
+                listing = run_crawl("skelbiu", workdir, settings, **spider_kwargs)
+                detail = run_crawl("autoplius", workdir, settings)
+                items = listing.get("item_scraped_count", 0) + detail.get("item_scraped_count", 0)
+                print(f"{label:<14} items={items} cpu={listing['cpu_time'] + detail['cpu_time']:.2f}s")
+                if not enabled:
+                    continue
+                for spider in ("skelbiu_spider", "autoplius_spider"):
+                    path = TELEMETRY_FILE.format(spider=spider)
+                    with open(Path(workdir) / path, "r", encoding="utf-8") as jsonl_file:
+                        snapshots = [json.loads(line) for line in jsonl_file]
+                    print(f"{len(snapshots)} snapshots in {path}, last one:")
+                    print_summary(snapshots[-1])
+    finally:
+        server.shutdown()
+
+
+BENCHMARKS = {
+    'conditional': benchmark_conditional,
+    'pipelined': benchmark_pipelined,
+    'adaptive': benchmark_adaptive,
+    'parse': benchmark_parse,
+    'shards': benchmark_shards,
+    'resume': benchmark_resume,
+    'validation': benchmark_validation,
+    'near_duplicates': benchmark_near_duplicates,
+    'store': benchmark_store,
+    'price_history': benchmark_price_history,
+    'telemetry': benchmark_telemetry,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+
+    for name in names:
+        print(f"\n[bold]--- {name} ---[/bold]")
+        BENCHMARKS[name]()
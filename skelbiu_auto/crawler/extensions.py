@@ -0,0 +1,151 @@
+import logging
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+
+logger = logging.getLogger(__name__)
+
+
+class SlotWindow:
+    """Latency and error counts of one download slot since last adjustment."""
+
+    def __init__(self):
+        self.responses = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+
+    def add(self, latency, error):
+        self.responses += 1
+        self.errors += int(error)
+        if latency is not None:
+            self.latency_sum += latency
+
+    @property
+    def average_latency(self):
+        return self.latency_sum / self.responses if self.responses else 0.0
+
+    @property
+    def error_rate(self):
+        return self.errors / self.responses if self.responses else 0.0
+
+
+class AdaptiveConcurrency:
+    """
+    Tunes concurrency of every download slot (domain) with AIMD, the way
+    TCP congestion control does.
+
+    Once per window (as many finished requests as the slot's current
+    concurrency) the slot is evaluated:
+        - error rate above ADAPTIVE_CONCURRENCY_ERROR_RATE (429, 5xx, timeouts)
+          or average latency above ADAPTIVE_CONCURRENCY_LATENCY_FACTOR times
+          the best latency seen on the slot -> concurrency is multiplied by
+          ADAPTIVE_CONCURRENCY_DECREASE
+        - otherwise concurrency grows by ADAPTIVE_CONCURRENCY_INCREASE
+    and is kept within ADAPTIVE_CONCURRENCY_MIN .. ADAPTIVE_CONCURRENCY_MAX.
+    Requests already sent when concurrency was decreased are not counted,
+    so one congestion event decreases concurrency once.
+
+    Live concurrency is in stats as ``adaptive_concurrency/<slot>``, with
+    ``/max``, ``/increases`` and ``/decreases`` next to it.
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.start = settings.getint("ADAPTIVE_CONCURRENCY_START", 4)
+        self.minimum = settings.getint("ADAPTIVE_CONCURRENCY_MIN", 1)
+        self.maximum = settings.getint("ADAPTIVE_CONCURRENCY_MAX", 16)
+        self.increase = settings.getint("ADAPTIVE_CONCURRENCY_INCREASE", 1)
+        self.decrease = settings.getfloat("ADAPTIVE_CONCURRENCY_DECREASE", 0.5)
+        self.max_error_rate = settings.getfloat("ADAPTIVE_CONCURRENCY_ERROR_RATE", 0.05)
+        self.latency_factor = settings.getfloat("ADAPTIVE_CONCURRENCY_LATENCY_FACTOR", 2.0)
+        self.windows = {}
+        self.known_slots = {}
+        self.epochs = {}
+        self.best_latency = {}
+        self.responded = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("ADAPTIVE_CONCURRENCY_ENABLED"):
+            raise NotConfigured
+        ext = cls(crawler)
+        crawler.signals.connect(ext.request_reached_downloader, signal=signals.request_reached_downloader)
+        crawler.signals.connect(ext.response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(ext.request_left_downloader, signal=signals.request_left_downloader)
+        return ext
+
+    def slot(self, key):
+        return self.crawler.engine.downloader.slots.get(key)
+
+    def request_reached_downloader(self, request, spider):
+        key = request.meta.get("download_slot")
+        request.meta["adaptive_concurrency_epoch"] = self.epochs.get(key, 0)
+        slot = self.slot(key)
+        if slot is None or self.known_slots.get(key) is slot:
+            return
+        # New slot, or slot recreated after the downloader dropped it while idle
+        self.known_slots[key] = slot
+        self.windows[key] = SlotWindow()
+        concurrency = self.stats.get_value(f"adaptive_concurrency/{key}", self.start)
+        self.set_concurrency(key, slot, concurrency)
+
+    def response_downloaded(self, response, request, spider):
+        self.responded.add(id(request))
+        error = response.status == 429 or response.status >= 500
+        self.record(request, request.meta.get("download_latency"), error)
+
+    def request_left_downloader(self, request, spider):
+        if id(request) in self.responded:
+            self.responded.discard(id(request))
+            return
+        # Download failed without a response (timeout, connection error)
+        self.record(request, None, True)
+
+    def record(self, request, latency, error):
+        key = request.meta.get("download_slot")
+        window = self.windows.get(key)
+        slot = self.slot(key)
+        if window is None or slot is None:
+            return
+        # Requests sent before the last decrease would decrease it again
+        if request.meta.get("adaptive_concurrency_epoch", 0) < self.epochs.get(key, 0):
+            return
+
+        window.add(latency, error)
+        if latency is not None and not error:
+            self.best_latency[key] = min(latency, self.best_latency.get(key, latency))
+        if window.responses >= slot.concurrency:
+            self.adjust(key, slot, window)
+            self.windows[key] = SlotWindow()
+
+    def adjust(self, key, slot, window):
+        """AIMD step for one slot at the end of its window."""
+        best_latency = self.best_latency.get(key)
+        congested = window.error_rate > self.max_error_rate or (
+            best_latency is not None
+            and window.average_latency > best_latency * self.latency_factor
+        )
+
+        if congested:
+            concurrency = max(self.minimum, int(slot.concurrency * self.decrease))
+            if concurrency != slot.concurrency:
+                self.stats.inc_value(f"adaptive_concurrency/{key}/decreases")
+                self.epochs[key] = self.epochs.get(key, 0) + 1
+        else:
+            concurrency = min(self.maximum, slot.concurrency + self.increase)
+            if concurrency != slot.concurrency:
+                self.stats.inc_value(f"adaptive_concurrency/{key}/increases")
+
+        if concurrency != slot.concurrency:
+            logger.info(
+                "slot %s: concurrency %d -> %d (latency %.3fs, errors %.0f%%)",
+                key, slot.concurrency, concurrency, window.average_latency, window.error_rate * 100,
+            )
+            self.set_concurrency(key, slot, concurrency)
+
+    def set_concurrency(self, key, slot, concurrency):
+        slot.concurrency = concurrency
+        self.stats.set_value(f"adaptive_concurrency/{key}", concurrency)
+        self.stats.max_value(f"adaptive_concurrency/{key}/max", concurrency)
@@ -0,0 +1,261 @@
+import pickle
+import sqlite3
+from pathlib import Path
+from scrapy import Request, signals
+from scrapy.core.scheduler import BaseScheduler
+from scrapy.extensions.feedexport import FileFeedStorage
+from scrapy.utils.request import request_from_dict
+from crawler.spiders.constants import FRONTIER_DIR
+
+PENDING, IN_FLIGHT, DONE = 0, 1, 2
+
+# Sent by FrontierMiddleware when a request's callback output was processed
+request_done = object()
+
+
+def frontier_path(spider_name, settings):
+    """data/frontier/<spider name><FRONTIER_JOB_SUFFIX>.sqlite3"""
+    directory = settings.get("FRONTIER_DIR", FRONTIER_DIR)
+    suffix = settings.get("FRONTIER_JOB_SUFFIX", "")
+    return Path(directory) / f"{spider_name}{suffix}.sqlite3"
+
+
+def apply_frontier_settings(spider_name, settings):
+    """
+    Switch feeds to append mode when an unfinished frontier of the spider
+    exists, so items of the interrupted run are kept. Called from spider
+    update_settings(), before feed exporters are created.
+    """
+    if not frontier_path(spider_name, settings).exists():
+        return
+
+    priority = settings.getpriority("FEEDS")
+    feeds = {uri: dict(options, overwrite=False) for uri, options in settings.getdict("FEEDS").items()}
+    settings.set("FEEDS", feeds, priority=priority)
+
+
+class FrontierStore:
+    """
+    SQLite request queue and seen-fingerprint store of one spider.
+    Every row is one scheduled request: pending -> in flight -> done.
+    WAL journal keeps committed rows when the process is killed.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fingerprint TEXT,
+                priority INTEGER NOT NULL,
+                state INTEGER NOT NULL,
+                request BLOB
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS frontier_fingerprint ON frontier (fingerprint)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (state, priority DESC, id)")
+        self.connection.commit()
+
+    def seen(self, fingerprint):
+        return self.connection.execute(
+            "SELECT 1 FROM frontier WHERE fingerprint = ? LIMIT 1", (fingerprint,)
+        ).fetchone() is not None
+
+    def push(self, fingerprint, priority, request):
+        """Add pending request, returns its row id."""
+        cursor = self.connection.execute(
+            "INSERT INTO frontier (fingerprint, priority, state, request) VALUES (?, ?, ?, ?)",
+            (fingerprint, priority, PENDING, request),
+        )
+        self.connection.commit()
+        return cursor.lastrowid
+
+    def pop(self):
+        """
+        Take pending request with the highest priority (oldest first) and
+        mark it in flight.
+        Returns:
+            tuple | None: (row id, request blob)
+        """
+        row = self.connection.execute(
+            "SELECT id, request FROM frontier WHERE state = ? ORDER BY priority DESC, id LIMIT 1",
+            (PENDING,),
+        ).fetchone()
+        if row is None:
+            return None
+        self.connection.execute("UPDATE frontier SET state = ? WHERE id = ?", (IN_FLIGHT, row[0]))
+        self.connection.commit()
+        return row
+
+    def done(self, row_id):
+        self.connection.execute(
+            "UPDATE frontier SET state = ?, request = NULL WHERE id = ?", (DONE, row_id)
+        )
+        self.connection.commit()
+
+    def requeue_in_flight(self):
+        """Requests in flight when the previous run stopped are pending again."""
+        cursor = self.connection.execute(
+            "UPDATE frontier SET state = ? WHERE state = ?", (PENDING, IN_FLIGHT)
+        )
+        self.connection.commit()
+        return cursor.rowcount
+
+    def count(self, state):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM frontier WHERE state = ?", (state,)
+        ).fetchone()[0]
+
+    def close(self, remove=False):
+        self.connection.close()
+        if remove:
+            for path in (self.path, Path(f"{self.path}-wal"), Path(f"{self.path}-shm")):
+                path.unlink(missing_ok=True)
+
+
+class FrontierScheduler(BaseScheduler):
+    """
+    Scheduler keeping the crawl frontier (request queue and seen request
+    fingerprints) in FrontierStore, so a killed crawl resumes where it
+    stopped: pending and in-flight requests of the previous run are
+    crawled, already done ones are filtered as duplicates.
+
+    A finished crawl removes its store, next run starts from the beginning.
+    Requests are marked done by FrontierMiddleware after their callback
+    output was processed. Requests that never reach a callback (ignored,
+    failed after retries) stay in flight and are retried on resume.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.path = frontier_path(crawler.spidercls.name, crawler.settings)
+        self.store = None
+        self.spider = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        scheduler = cls(crawler)
+        crawler.signals.connect(scheduler.mark_done, signal=request_done)
+        return scheduler
+
+    def open(self, spider):
+        self.spider = spider
+        self.store = FrontierStore(self.path)
+        requeued = self.store.requeue_in_flight()
+        pending = self.store.count(PENDING)
+        if pending:
+            self.stats.set_value("frontier/resumed_pending", pending)
+            self.stats.set_value("frontier/resumed_in_flight", requeued)
+            spider.logger.info("Resuming crawl from %s: %d pending requests", self.path, pending)
+
+    def close(self, reason):
+        self.store.close(remove=reason == "finished")
+
+    def has_pending_requests(self):
+        return self.store.count(PENDING) > 0
+
+    def enqueue_request(self, request):
+        fingerprint = None
+        if not request.dont_filter:
+            # Like RFPDupeFilter, dont_filter requests are not remembered as seen
+            fingerprint = self.crawler.request_fingerprinter.fingerprint(request).hex()
+            if self.store.seen(fingerprint):
+                self.stats.inc_value("dupefilter/filtered")
+                return False
+
+        payload = pickle.dumps(request.to_dict(spider=self.spider), protocol=pickle.HIGHEST_PROTOCOL)
+        row_id = self.store.push(fingerprint, request.priority, payload)
+        # Retried or redirected request replaces the one it was made from
+        previous_id = request.meta.get("frontier_id")
+        if previous_id is not None:
+            self.store.done(previous_id)
+        request.meta["frontier_id"] = row_id
+        self.stats.inc_value("scheduler/enqueued/frontier")
+        return True
+
+    def next_request(self):
+        row = self.store.pop()
+        if row is None:
+            return None
+        row_id, payload = row
+        request = request_from_dict(pickle.loads(payload), spider=self.spider)
+        request.meta["frontier_id"] = row_id
+        self.stats.inc_value("scheduler/dequeued/frontier")
+        return request
+
+    def mark_done(self, request):
+        row_id = request.meta.get("frontier_id")
+        if row_id is not None and self.store is not None:
+            self.store.done(row_id)
+
+    def __len__(self):
+        return self.store.count(PENDING)
+
+
+class FrontierMiddleware:
+    """
+    Spider middleware marking a request done in FrontierScheduler once all
+    requests its callback returned were scheduled and all its items went
+    through the item pipelines (scraped, dropped or failed), so a killed
+    crawl never loses an item of a done request. A request whose callback
+    raised is not marked done.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        # id(response) -> [response, items in pipelines, callback finished]
+        self.outstanding = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        middleware = cls(crawler)
+        crawler.signals.connect(middleware.item_finished, signal=signals.item_scraped)
+        crawler.signals.connect(middleware.item_finished, signal=signals.item_dropped)
+        crawler.signals.connect(middleware.item_finished, signal=signals.item_error)
+        return middleware
+
+    def process_spider_output(self, response, result, spider):
+        state = self.outstanding.setdefault(id(response), [response, 0, False])
+        try:
+            for item_or_request in result:
+                if not isinstance(item_or_request, Request):
+                    state[1] += 1
+                yield item_or_request
+        except Exception:
+            # Failed callback: request stays in flight and is crawled again on resume
+            del self.outstanding[id(response)]
+            raise
+        state[2] = True
+        self.check_done(response)
+
+    def item_finished(self, item, response, spider, **kwargs):
+        state = self.outstanding.get(id(response))
+        if state is not None:
+            state[1] -= 1
+            self.check_done(response)
+
+    def check_done(self, response):
+        state = self.outstanding.get(id(response))
+        if state is None or state[1] > 0 or not state[2]:
+            return
+        del self.outstanding[id(response)]
+        if response.request is not None:
+            self.crawler.signals.send_catch_log(request_done, request=response.request)
+
+
+class UnbufferedFileFeedStorage(FileFeedStorage):
+    """
+    Local file feed written without buffering: every exported item is one
+    write() call, so a killed crawl leaves only complete JSON lines for
+    the resumed run to append to.
+    """
+
+    def open(self, spider):
+        path = Path(self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.open(self.write_mode, buffering=0)
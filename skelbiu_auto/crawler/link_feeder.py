@@ -0,0 +1,99 @@
+import time
+import scrapy
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+
+
+class LinkFeeder:
+    """
+    Connects two crawlers running in the same CrawlerProcess.
+
+    Every item scraped by the listing crawler (SkelbiuAutoSpider) is turned
+    into a detail page request and scheduled on the detail crawler
+    (AutopliusSpider) immediately, so both phases run at the same time.
+    The detail spider is kept open while the listing spider is running.
+
+    Attributes
+    ----------
+    latencies : list[float]
+        Seconds from listing item scraped to its detail item scraped.
+        ``enqueued_at`` is wall-clock time, it is kept in the persisted
+        frontier and stays comparable after a resumed crawl.
+    """
+
+    def __init__(self, listing_crawler, detail_crawler, link_field="Link"):
+        self.detail_crawler = detail_crawler
+        self.link_field = link_field
+        self.pending = []
+        self.detail_spider = None
+        self.listing_done = False
+        self.scheduled = 0
+        self.skipped_duplicates = 0
+        self.latencies = []
+        self.started_at = time.monotonic()
+
+        listing_crawler.signals.connect(self.listing_item_scraped, signal=signals.item_scraped)
+        listing_crawler.signals.connect(self.listing_closed, signal=signals.spider_closed)
+        detail_crawler.signals.connect(self.detail_opened, signal=signals.spider_opened)
+        detail_crawler.signals.connect(self.detail_idle, signal=signals.spider_idle)
+        detail_crawler.signals.connect(self.detail_item_scraped, signal=signals.item_scraped)
+
+    def schedule(self, link, enqueued_at):
+        request = scrapy.Request(
+            link,
+            callback=self.detail_spider.parse,
+            meta={"enqueued_at": enqueued_at},
+        )
+        self.detail_crawler.engine.crawl(request)
+        self.scheduled += 1
+
+    def listing_item_scraped(self, item, response, spider):
+        link = item.get(self.link_field)
+        if not link:
+            return
+        if item.get("Duplicate_Of"):
+            # Near-duplicate of another listing, its details are crawled once
+            self.skipped_duplicates += 1
+            self.detail_crawler.stats.inc_value("near_duplicates/detail_requests_saved")
+            return
+        if self.detail_spider is None:
+            self.pending.append((link, time.time()))
+        else:
+            self.schedule(link, time.time())
+
+    def listing_closed(self, spider, reason):
+        self.listing_done = True
+
+    def detail_opened(self, spider):
+        self.detail_spider = spider
+        for link, enqueued_at in self.pending:
+            self.schedule(link, enqueued_at)
+        self.pending = []
+
+    def detail_idle(self, spider):
+        if not self.listing_done:
+            raise DontCloseSpider
+
+    def detail_item_scraped(self, item, response, spider):
+        enqueued_at = response.meta.get("enqueued_at")
+        if enqueued_at is not None:
+            self.latencies.append(time.time() - enqueued_at)
+
+    def summary(self):
+        """
+        End-to-end latency and runtime summary.
+        Returns:
+            dict: scheduled requests, skipped near-duplicate listings, detail
+                items, latency avg/p50/max and total runtime in seconds
+        """
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "scheduled": self.scheduled,
+            "skipped_duplicates": self.skipped_duplicates,
+            "detail_items": count,
+            "latency_avg": round(sum(latencies) / count, 3) if count else None,
+            "latency_p50": round(latencies[count // 2], 3) if count else None,
+            "latency_max": round(latencies[-1], 3) if count else None,
+            "runtime": round(time.monotonic() - self.started_at, 3),
+        }
@@ -0,0 +1,267 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+# Makes of more than one word, everything else is the first title word
+TWO_WORD_MAKES = {"alfa romeo", "aston martin", "land rover", "mercedes benz", "rolls royce"}
+
+# Item ID field -> site of the listing
+ID_FIELDS = {"Item_ID": "skelbiu", "Id": "autoplius"}
+
+COLUMNS = ("site", "item_id", "make", "model", "title", "price_eur", "year", "mileage_km",
+           "engine_size_l", "city", "link", "duplicate_of", "data", "first_seen", "last_seen")
+
+
+def make_model(title):
+    """
+    'Audi A4 allroad, 3.0 l., universalas' -> ('Audi', 'A4 allroad')
+    'Audi A4 allroad, 2011 | A29574861' -> ('Audi', 'A4 allroad')
+    """
+    name = str(title or "").split("|")[0].split(",")[0].split()
+    if not name:
+        return None, None
+    words = 2 if " ".join(name[:2]).lower() in TWO_WORD_MAKES else 1
+    return " ".join(name[:words]), " ".join(name[words:]) or None
+
+
+def listing_row(item, seen_at):
+    """
+    Validated Skelbiu or Autoplius item -> listings table row.
+    Returns:
+        tuple | None: Values in COLUMNS order, None for items without ID
+    """
+    for id_field, site in ID_FIELDS.items():
+        if item.get(id_field) not in (None, "", "N/A"):
+            break
+    else:
+        return None
+
+    make, model = make_model(item.get("Title"))
+    city = item.get("City")
+    return (
+        site, str(item[id_field]), make, model, item.get("Title"), item.get("Price_EUR"),
+        item.get("Year"), item.get("Mileage_KM"), item.get("Engine_Size_L"),
+        city.strip(" ,") if city and city != "N/A" else None,
+        item.get("Link"), item.get("Duplicate_Of"), json.dumps(item, ensure_ascii=False),
+        seen_at, seen_at,
+    )
+
+
+class ListingsStore:
+    """
+    SQLite store of Skelbiu and Autoplius listings, one row per
+    (site, item_id), updated when a listing is crawled again. Indexed for
+    make/model, price, year and city filters, full item is in ``data``.
+
+    Example:
+        store = ListingsStore("data/listings.sqlite3")
+        store.find(make="audi", model="a4 allroad", max_price=10000, min_year=2012)
+        store.close()
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shards of a sharded crawl write to the same store
+        self.connection = sqlite3.connect(str(self.path), timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS listings (
+                site TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                make TEXT COLLATE NOCASE,
+                model TEXT COLLATE NOCASE,
+                title TEXT,
+                price_eur INTEGER,
+                year INTEGER,
+                mileage_km INTEGER,
+                engine_size_l REAL,
+                city TEXT COLLATE NOCASE,
+                link TEXT,
+                duplicate_of TEXT,
+                data TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (site, item_id)
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS listings_make_model ON listings (make, model, price_eur)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS listings_price ON listings (price_eur)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS listings_year ON listings (year)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS listings_city ON listings (city)")
+        self.create_price_history()
+        self.connection.commit()
+
+    def create_price_history(self):
+        """
+        Append-only price history: a row (site, item_id, seen_at, price,
+        previous_price) is added by triggers when a listing is first stored
+        with a price and whenever its price changes, unchanged re-crawls
+        add nothing. Covering index on seen_at finds the listings changed
+        in a time window without scanning the history.
+        """
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS price_history (
+                site TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                seen_at REAL NOT NULL,
+                price INTEGER NOT NULL,
+                previous_price INTEGER,
+                PRIMARY KEY (site, item_id, seen_at)
+            ) WITHOUT ROWID
+        """)
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS price_history_seen_at ON price_history (seen_at, site, item_id)"
+        )
+        self.connection.execute("""
+            CREATE TRIGGER IF NOT EXISTS listings_price_added AFTER INSERT ON listings
+            WHEN NEW.price_eur IS NOT NULL
+            BEGIN
+                INSERT OR REPLACE INTO price_history (site, item_id, seen_at, price, previous_price)
+                VALUES (NEW.site, NEW.item_id, NEW.last_seen, NEW.price_eur, NULL);
+            END
+        """)
+        self.connection.execute("""
+            CREATE TRIGGER IF NOT EXISTS listings_price_changed AFTER UPDATE OF price_eur ON listings
+            WHEN NEW.price_eur IS NOT NULL AND NEW.price_eur IS NOT OLD.price_eur
+            BEGIN
+                INSERT OR REPLACE INTO price_history (site, item_id, seen_at, price, previous_price)
+                VALUES (NEW.site, NEW.item_id, NEW.last_seen, NEW.price_eur, OLD.price_eur);
+            END
+        """)
+
+    def upsert(self, items, seen_at=None):
+        """
+        Insert or update items in one transaction, first_seen of known
+        listings is kept. Price changes are added to price_history.
+        Parameters:
+            items (list[dict]): Validated items
+            seen_at (float): Crawl time (UNIX), now by default
+        Returns:
+            int: Number of stored items
+        """
+        seen_at = time.time() if seen_at is None else seen_at
+        rows = [row for row in (listing_row(item, seen_at) for item in items) if row is not None]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in COLUMNS[2:] if column != "first_seen")
+        with self.connection:
+            self.connection.executemany(
+                f"""INSERT INTO listings ({", ".join(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})
+                    ON CONFLICT(site, item_id) DO UPDATE SET {updates}""",
+                rows,
+            )
+        return len(rows)
+
+    def find(self, make=None, model=None, min_price=None, max_price=None, min_year=None, max_year=None,
+             city=None, site=None, include_duplicates=True, order_by="price_eur", limit=100):
+        """
+        Listings matching all given filters (case-insensitive make, model, city).
+
+        Parameters:
+            make (str): e.g. 'Audi'
+            model (str): e.g. 'A4 allroad'
+            min_price, max_price (int): Price range in EUR, inclusive
+            min_year, max_year (int): Year range, inclusive
+            city (str): e.g. 'Kaunas'
+            site (str): 'skelbiu' or 'autoplius'
+            include_duplicates (bool): False skips near-duplicates (Duplicate_Of)
+            order_by (str): Column to sort by, 'price_eur', 'year', 'mileage_km' or 'last_seen'
+            limit (int): Maximum number of rows, None for all
+
+        Returns:
+            list[dict]: Table columns, ``data`` is the full item dict
+        """
+        filters = [
+            ("make = ?", make), ("model = ?", model),
+            ("price_eur >= ?", min_price), ("price_eur <= ?", max_price),
+            ("year >= ?", min_year), ("year <= ?", max_year),
+            ("city = ?", city), ("site = ?", site),
+        ]
+        conditions = [condition for condition, value in filters if value is not None]
+        params = [value for _, value in filters if value is not None]
+        if not include_duplicates:
+            conditions.append("duplicate_of IS NULL")
+        if order_by not in ("price_eur", "year", "mileage_km", "last_seen"):
+            raise ValueError(f"Can not order by {order_by}")
+
+        query = "SELECT * FROM listings"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        rows = [dict(row) for row in self.connection.execute(query, params)]
+        for row in rows:
+            row["data"] = json.loads(row["data"])
+        return rows
+
+    def price_history(self, site, item_id):
+        """
+        Returns:
+            list[tuple[float, int]]: (seen_at, price) of every price change, oldest first
+        """
+        return [tuple(row) for row in self.connection.execute(
+            "SELECT seen_at, price FROM price_history WHERE site = ? AND item_id = ? ORDER BY seen_at",
+            (site, item_id),
+        )]
+
+    def price_drops(self, min_drop_pct=10.0, since=None, site=None, limit=100):
+        """
+        Listings whose price dropped at least min_drop_pct percent since
+        `since` (7 days ago by default): current price compared with the
+        price before the first change in the window, or with the first
+        price for listings new in the window. Only listings with changes
+        in the window are read (price_history_seen_at index).
+
+        Parameters:
+            min_drop_pct (float): Minimum drop in percent, e.g. 10
+            since (float): Window start (UNIX time)
+            site (str): 'skelbiu' or 'autoplius'
+            limit (int): Maximum number of rows, None for all
+
+        Returns:
+            list[dict]: site, item_id, title, link, make, model, old_price,
+                price_eur, drop_pct and changed_at (last change), biggest drop first
+        """
+        since = time.time() - 7 * 24 * 3600 if since is None else since
+        query = """
+            WITH changed AS (
+                SELECT site, item_id, MIN(seen_at) AS first_change, MAX(seen_at) AS changed_at
+                -- Without INDEXED BY the planner scans the primary key for GROUP BY order
+                FROM price_history INDEXED BY price_history_seen_at
+                WHERE seen_at >= ? GROUP BY site, item_id
+            )
+            SELECT listings.site, listings.item_id, listings.title, listings.link, listings.make,
+                   listings.model, COALESCE(first.previous_price, first.price) AS old_price,
+                   listings.price_eur, changed.changed_at,
+                   ROUND(100.0 * (COALESCE(first.previous_price, first.price) - listings.price_eur)
+                         / COALESCE(first.previous_price, first.price), 1) AS drop_pct
+            FROM changed
+            JOIN price_history AS first
+                ON first.site = changed.site AND first.item_id = changed.item_id
+                AND first.seen_at = changed.first_change
+            JOIN listings ON listings.site = changed.site AND listings.item_id = changed.item_id
+            WHERE COALESCE(first.previous_price, first.price) > 0
+              AND listings.price_eur <= COALESCE(first.previous_price, first.price) * (1 - ? / 100.0)
+        """
+        params = [since, min_drop_pct]
+        if site is not None:
+            query += " AND listings.site = ?"
+            params.append(site)
+        query += " ORDER BY drop_pct DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    def count(self, site=None):
+        if site is None:
+            return self.connection.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+        return self.connection.execute("SELECT COUNT(*) FROM listings WHERE site = ?", (site,)).fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -3,11 +3,17 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import hashlib
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from crawler.frontier import request_done
+from crawler.spiders.constants import HTTP_VALIDATORS_FILE
+from crawler.validator_store import ValidatorStore
+
 
 class AutoSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -98,3 +104,98 @@ class AutoDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class ConditionalRequestMiddleware:
+    """
+    Downloader middleware that skips pages which did not change since the
+    previous crawl.
+
+    ETag, Last-Modified and body hash of every downloaded page are kept in
+    ValidatorStore. Next time the page is requested with If-None-Match /
+    If-Modified-Since headers, a 304 answer (or a 200 answer with the same
+    body hash, for servers without validators) is dropped with IgnoreRequest,
+    so the page is neither downloaded again nor parsed.
+
+    Validators of a page are saved only when FrontierMiddleware reports
+    the request done (callback finished, its items went through the
+    pipelines). A page whose callback failed, or whose crawl was killed
+    before its items were exported, is downloaded and parsed again.
+
+    Enabled with CONDITIONAL_REQUESTS_ENABLED setting. Single requests opt
+    out with ``meta={"conditional": False}``.
+
+    Stats:
+        conditional/not_modified: 304 answers
+        conditional/unchanged_body: 200 answers with a known body hash
+        conditional/bytes_saved: body bytes not downloaded thanks to 304
+    """
+
+    def __init__(self, store, stats):
+        self.store = store
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("CONDITIONAL_REQUESTS_ENABLED"):
+            raise NotConfigured
+        path = crawler.settings.get("CONDITIONAL_REQUESTS_FILE", HTTP_VALIDATORS_FILE)
+        s = cls(ValidatorStore(path), crawler.stats)
+        crawler.signals.connect(s.request_done, signal=request_done)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def applies_to(self, request):
+        return request.method == "GET" and request.meta.get("conditional", True)
+
+    def process_request(self, request, spider):
+        if not self.applies_to(request):
+            return None
+
+        validators = self.store.get(request.url)
+        if validators is None:
+            return None
+
+        etag, last_modified, _, _ = validators
+        if etag:
+            request.headers.setdefault("If-None-Match", etag)
+        if last_modified:
+            request.headers.setdefault("If-Modified-Since", last_modified)
+        return None
+
+    def process_response(self, request, response, spider):
+        if not self.applies_to(request):
+            return response
+
+        if response.status == 304:
+            validators = self.store.get(request.url)
+            self.stats.inc_value("conditional/not_modified")
+            if validators is not None:
+                self.stats.inc_value("conditional/bytes_saved", validators[3])
+            raise IgnoreRequest(f"Not modified: {request.url}")
+
+        if response.status != 200:
+            return response
+
+        body_hash = hashlib.sha1(response.body).hexdigest()
+        validators = self.store.get(request.url)
+        if validators is not None and validators[2] == body_hash:
+            self.stats.inc_value("conditional/unchanged_body")
+            raise IgnoreRequest(f"Unchanged: {request.url}")
+
+        # Saved in request_done(), once the page's callback output was processed
+        request.meta["conditional_validators"] = (
+            response.headers.get("ETag", b"").decode("latin-1") or None,
+            response.headers.get("Last-Modified", b"").decode("latin-1") or None,
+            body_hash,
+            len(response.body),
+        )
+        return response
+
+    def request_done(self, request):
+        validators = request.meta.pop("conditional_validators", None)
+        if validators is not None:
+            self.store.set(request.url, *validators)
+
+    def spider_closed(self, spider):
+        self.store.close()
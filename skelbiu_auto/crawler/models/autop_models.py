@@ -1,6 +1,7 @@
 from __future__ import annotations
-from pydantic import BaseModel
+from pydantic import AliasPath, BaseModel, Field
 from typing import List, Dict, Optional
+from crawler.models.normalizers import Euros, YearNumber, Kilometres, Litres, LitresPer100Km
 
 
 class AutopliusCarParameters(BaseModel):
@@ -40,3 +41,15 @@ class AutopliusCarModel(BaseModel):
     Parameters: AutopliusCarParameters
     Description: AutopliusCarDescription
     Features: AutopliusCarFeatures
+
+    # Normalized numbers, parsed from the raw fields above
+    Price_EUR: Euros = Field(None, validation_alias='Price')
+    Year: YearNumber = Field(None, validation_alias=AliasPath('Parameters', 'First_Registration'))
+    Mileage_KM: Kilometres = Field(None, validation_alias=AliasPath('Parameters', 'Mileage'))
+    Engine_Size_L: Litres = Field(None, validation_alias=AliasPath('Parameters', 'Engine'))
+    City_Consumption_L: LitresPer100Km = Field(
+        None, validation_alias=AliasPath('Parameters', 'City_Consumption'))
+    Highway_Consumption_L: LitresPer100Km = Field(
+        None, validation_alias=AliasPath('Parameters', 'Highway_Consumption'))
+    Average_Consumption_L: LitresPer100Km = Field(
+        None, validation_alias=AliasPath('Parameters', 'Average_Consumption'))
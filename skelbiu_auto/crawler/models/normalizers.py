@@ -0,0 +1,74 @@
+import re
+from typing import Annotated, Optional
+from pydantic import BeforeValidator
+
+# Raw site strings -> numbers, missing or unparseable values ("N/A",
+# "Kaina sutartinė") become None
+
+NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+YEAR = re.compile(r"\b(19\d{2}|20\d{2})\b")
+YEAR_PARAM = re.compile(r"^(19\d{2}|20\d{2}) m\.?$")
+MILEAGE_PARAM = re.compile(r"^[\d\s]+km$")
+LITRES = re.compile(r"(\d+[.,]\d)\s*l\b")
+CUBIC_CM = re.compile(r"(\d+)\s*cm³")
+
+
+def _without_spaces(value):
+    # Thousands are separated with spaces (also non-breaking): "12 345 km"
+    return "".join(str(value).split())
+
+
+def parse_int(value):
+    """'6 800 €' -> 6800, '212 000 km' -> 212000"""
+    if value is None or isinstance(value, int):
+        return value
+    match = NUMBER.search(_without_spaces(value))
+    return int(float(match.group().replace(",", "."))) if match else None
+
+
+def parse_float(value):
+    """'7,5 l/100 km' -> 7.5"""
+    if value is None or isinstance(value, float):
+        return value
+    match = NUMBER.search(_without_spaces(value))
+    return float(match.group().replace(",", ".")) if match else None
+
+
+def parse_year(value):
+    """'2011-12' -> 2011, ['2017 m.', 'Dyzelinas'] -> 2017"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, list):
+        return next((int(match.group(1)) for param in value if (match := YEAR_PARAM.match(param.strip()))), None)
+    match = YEAR.search(str(value))
+    return int(match.group(1)) if match else None
+
+
+def parse_mileage(value):
+    """'212 000 km' -> 212000, ['2017 m.', '212 000 km'] -> 212000"""
+    if isinstance(value, list):
+        value = next((param for param in value if MILEAGE_PARAM.match(param.strip())), None)
+    return parse_int(value)
+
+
+def parse_engine_size(value):
+    """
+    Engine displacement in litres: '2000 cm³, 143 AG (105kW)' -> 2.0,
+    'Audi A4 allroad, 3.0 l., universalas' -> 3.0
+    """
+    if value is None or isinstance(value, float):
+        return value
+    if isinstance(value, list):
+        value = " ".join(value)
+    if match := CUBIC_CM.search(str(value)):
+        return round(int(match.group(1)) / 1000, 1)
+    if match := LITRES.search(str(value)):
+        return float(match.group(1).replace(",", "."))
+    return None
+
+
+Euros = Annotated[Optional[int], BeforeValidator(parse_int)]
+YearNumber = Annotated[Optional[int], BeforeValidator(parse_year)]
+Kilometres = Annotated[Optional[int], BeforeValidator(parse_mileage)]
+Litres = Annotated[Optional[float], BeforeValidator(parse_engine_size)]
+LitresPer100Km = Annotated[Optional[float], BeforeValidator(parse_float)]
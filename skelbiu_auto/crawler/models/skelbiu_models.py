@@ -1,6 +1,7 @@
 from __future__ import annotations
 from pydantic import BaseModel, Field
 from typing import List
+from crawler.models.normalizers import Euros, YearNumber, Kilometres, Litres
 
 
 class SkelbiuAutoModel(BaseModel):
@@ -12,3 +13,9 @@ class SkelbiuAutoModel(BaseModel):
     Price: str
     Link: str
     Image_URL: str = Field(..., alias='Image URL')
+
+    # Normalized numbers, parsed from the raw fields above
+    Price_EUR: Euros = Field(None, validation_alias='Price')
+    Year: YearNumber = Field(None, validation_alias='Item Params')
+    Mileage_KM: Kilometres = Field(None, validation_alias='Item Params')
+    Engine_Size_L: Litres = Field(None, validation_alias='Title')
@@ -0,0 +1,164 @@
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+
+# MinHash: NUM_PERMUTATIONS hash functions (a * x + b) mod MERSENNE_PRIME,
+# signature split into LSH_BANDS bands of LSH_ROWS values. 10 x 6 finds 97%
+# of pairs with Jaccard 0.82, but only 6% of same-model ads (Jaccard ~0.43,
+# same title words, fuel and engine) become candidates.
+NUM_PERMUTATIONS = 60
+LSH_BANDS = 10
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+# Fixed seeds, signatures stay comparable between runs
+PERMUTATIONS = [
+    (_hash64(f"a{index}") % (MERSENNE_PRIME - 1) + 1, _hash64(f"b{index}") % MERSENNE_PRIME)
+    for index in range(NUM_PERMUTATIONS)
+]
+
+WORD = re.compile(r"[^\W\d_][\w]+")
+TOKEN_SEPARATOR = "\x1f"
+
+
+def listing_tokens(item):
+    """
+    Feature set of a Skelbiu or Autoplius item (after ValidationPipeline):
+    title words, non-numeric params (fuel, gearbox), normalized year,
+    engine size, mileage (1000 km) and price (100 €) buckets and image URL.
+    Both sites give the same tokens for the same car, except the image.
+
+    Returns:
+        set[str]
+    """
+    title = str(item.get("Title", "")).split("|")[0].lower()
+    tokens = set(WORD.findall(title))
+
+    params = item.get("Item_Params") or []
+    parameters = item.get("Parameters") or {}
+    params = params + [parameters.get("Fuel", "N/A"), parameters.get("Gearbox", "N/A")]
+    tokens.update(f"param={param.strip().lower()}" for param in params
+                  if param and param != "N/A" and not any(char.isdigit() for char in param))
+
+    if item.get("Year") is not None:
+        tokens.add(f"year={item['Year']}")
+    if item.get("Engine_Size_L") is not None:
+        tokens.add(f"engine={item['Engine_Size_L']}")
+    if item.get("Mileage_KM") is not None:
+        tokens.add(f"km={item['Mileage_KM'] // 1000}")
+    if item.get("Price_EUR") is not None:
+        tokens.add(f"price={item['Price_EUR'] // 100}")
+    if item.get("Image_URL"):
+        tokens.add(f"image={item['Image_URL']}")
+    return tokens
+
+
+def minhash(tokens):
+    """MinHash signature (NUM_PERMUTATIONS ints) of a token set."""
+    hashes = [_hash64(token) for token in tokens] or [0]
+    return [min((a * value + b) % MERSENNE_PRIME for value in hashes) for a, b in PERMUTATIONS]
+
+
+def lsh_buckets(signature):
+    """One bucket key per band, listings sharing any bucket are candidates."""
+    return [
+        _hash64(f"{band}:{signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]}") - (1 << 63)
+        for band in range(LSH_BANDS)
+    ]
+
+
+def jaccard(first, second):
+    return len(first & second) / len(first | second) if first or second else 1.0
+
+
+class NearDuplicateIndex:
+    """
+    On-disk LSH index of listings seen by both spiders, keyed by Link.
+    Candidates sharing an LSH bucket are verified with exact Jaccard
+    similarity of their token sets.
+
+    Example:
+        index = NearDuplicateIndex("data/near_duplicates.sqlite3", threshold=0.8)
+        index.add(link, listing_tokens(item))  # -> None, first listing of the car
+        index.add(other_link, listing_tokens(repost))  # -> link of the first listing
+        index.close()
+    """
+
+    def __init__(self, path, threshold=0.8):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        # Shards of a sharded crawl share the index
+        self.connection = sqlite3.connect(str(self.path), timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS listings (
+                link TEXT PRIMARY KEY,
+                tokens TEXT NOT NULL,
+                canonical TEXT
+            )
+        """)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                bucket INTEGER NOT NULL,
+                link TEXT NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS lsh_bucket ON lsh_buckets (bucket)")
+        self.connection.commit()
+
+    def find(self, tokens, buckets):
+        """
+        Most similar indexed listing above threshold.
+        Returns:
+            str | None: Its canonical link (first listing of the car)
+        """
+        placeholders = ",".join("?" * len(buckets))
+        rows = self.connection.execute(
+            f"""SELECT DISTINCT listings.link, listings.tokens, listings.canonical
+                FROM lsh_buckets JOIN listings ON listings.link = lsh_buckets.link
+                WHERE lsh_buckets.bucket IN ({placeholders})""",
+            buckets,
+        ).fetchall()
+
+        best, best_similarity = None, self.threshold
+        for candidate_link, candidate_tokens, canonical in rows:
+            similarity = jaccard(tokens, set(candidate_tokens.split(TOKEN_SEPARATOR)))
+            if similarity >= best_similarity:
+                best, best_similarity = canonical or candidate_link, similarity
+        return best
+
+    def add(self, link, tokens):
+        """
+        Index listing and return what it duplicates. A listing already in
+        the index (re-crawl) keeps its first result.
+        Returns:
+            str | None: Canonical link of the near-duplicate, None for a new car
+        """
+        row = self.connection.execute("SELECT canonical FROM listings WHERE link = ?", (link,)).fetchone()
+        if row is not None:
+            return row[0]
+
+        buckets = lsh_buckets(minhash(tokens))
+        canonical = self.find(tokens, buckets)
+        self.connection.execute(
+            "INSERT INTO listings (link, tokens, canonical) VALUES (?, ?, ?)",
+            (link, TOKEN_SEPARATOR.join(sorted(tokens)), canonical),
+        )
+        self.connection.executemany(
+            "INSERT INTO lsh_buckets (bucket, link) VALUES (?, ?)", [(bucket, link) for bucket in buckets]
+        )
+        # Short write transactions, other shard processes wait for the lock
+        self.connection.commit()
+        return canonical
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
@@ -6,8 +6,235 @@
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from pydantic import TypeAdapter, ValidationError
+from scrapy.exceptions import DropItem, NotConfigured
+from scrapy.utils.reactor import CallLaterOnce
+from twisted.internet import defer
+from twisted.python.failure import Failure
+from crawler.listings_store import ListingsStore
+from crawler.near_duplicates import NearDuplicateIndex, listing_tokens
+from crawler.spiders.constants import NEAR_DUPLICATES_INDEX_FILE, LISTINGS_STORE_FILE
 
 
 class AutoPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class BatchPipeline:
+    """
+    Base of pipelines processing items in batches. process_item() returns
+    a Deferred fired when the item's batch was processed, so item_scraped
+    is sent only after that.
+
+    A batch is processed when batch_size items are waiting or at the end
+    of the current reactor iteration, so items of one response go
+    together without delaying the crawl. Subclasses implement
+    process_batch().
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.batch = []
+        # Flush at the end of the current reactor iteration
+        self.next_flush = CallLaterOnce(self.flush)
+
+    def enqueue(self, item):
+        deferred = defer.Deferred()
+        self.batch.append((item, deferred))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+        else:
+            self.next_flush.schedule()
+        return deferred
+
+    def process_batch(self, items):
+        """
+        Returns:
+            list: Result item or exception (DropItem, ...) for every item
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        entries, self.batch = self.batch, []
+        if not entries:
+            return
+
+        try:
+            results = self.process_batch([item for item, _ in entries])
+        except Exception:
+            failure = Failure()
+            for _, deferred in entries:
+                deferred.errback(failure)
+            return
+
+        for (_, deferred), result in zip(entries, results):
+            if isinstance(result, Exception):
+                deferred.errback(result)
+            else:
+                deferred.callback(result)
+
+    def close_spider(self, spider):
+        self.flush()
+
+
+class ValidationPipeline(BatchPipeline):
+    """
+    Validates and normalizes raw items of spiders with an ``item_model``
+    (Pydantic model) in batches, with one ``TypeAdapter(list[item_model])``
+    call per batch (VALIDATION_BATCH_SIZE) instead of a model instance per
+    item in the callback. Invalid items are dropped (DropItem), valid ones
+    continue as ``model_dump()`` dicts.
+
+    Stats: ``validation/batches``, ``validation/items``, ``validation/invalid``.
+    """
+
+    def __init__(self, stats, batch_size):
+        super().__init__(batch_size)
+        self.stats = stats
+        self.adapter = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.stats, crawler.settings.getint("VALIDATION_BATCH_SIZE", 100))
+
+    def open_spider(self, spider):
+        model = getattr(spider, "item_model", None)
+        if model is not None:
+            self.adapter = TypeAdapter(list[model])
+
+    def process_item(self, item, spider):
+        if self.adapter is None:
+            return item
+        return self.enqueue(ItemAdapter(item).asdict())
+
+    def process_batch(self, items):
+        self.stats.inc_value("validation/batches")
+        self.stats.inc_value("validation/items", len(items))
+
+        errors = {}
+        try:
+            valid = self.adapter.validate_python(items)
+        except ValidationError as exc:
+            # loc[0] is the index of the item in the batch
+            for error in exc.errors():
+                errors.setdefault(error["loc"][0], f"{'.'.join(map(str, error['loc'][1:]))}: {error['msg']}")
+            valid = self.adapter.validate_python([item for index, item in enumerate(items) if index not in errors])
+
+        valid_items = iter(self.adapter.dump_python(valid))
+        results = []
+        for index in range(len(items)):
+            if index in errors:
+                self.stats.inc_value("validation/invalid")
+                results.append(DropItem(f"Invalid item: {errors[index]}"))
+            else:
+                results.append(next(valid_items))
+        return results
+
+
+class NearDuplicatePipeline:
+    """
+    Finds listings of the same car under another Link (reposts, other
+    Item_ID, the other site) with MinHash LSH over title, params, year,
+    engine, mileage, price and image URL (NearDuplicateIndex, on disk, so
+    duplicates of earlier crawls are found too).
+
+    NEAR_DUPLICATES_ACTION:
+        'link' - item gets ``Duplicate_Of`` (Link of the first listing),
+                 detail pages of such Skelbiu items are not requested
+        'drop' - item is dropped
+
+    Runs after ValidationPipeline, tokens use the normalized fields.
+    Stats: ``near_duplicates/checked``, ``near_duplicates/found``.
+    """
+
+    def __init__(self, stats, path, threshold, action):
+        self.stats = stats
+        self.path = path
+        self.threshold = threshold
+        self.action = action
+        self.index = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("NEAR_DUPLICATES_ENABLED"):
+            raise NotConfigured
+        return cls(
+            crawler.stats,
+            settings.get("NEAR_DUPLICATES_INDEX_FILE", NEAR_DUPLICATES_INDEX_FILE),
+            settings.getfloat("NEAR_DUPLICATES_THRESHOLD", 0.8),
+            settings.get("NEAR_DUPLICATES_ACTION", "link"),
+        )
+
+    def open_spider(self, spider):
+        self.index = NearDuplicateIndex(self.path, self.threshold)
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        link = adapter.get("Link")
+        if not link:
+            return item
+
+        canonical = self.index.add(link, listing_tokens(adapter.asdict()))
+        self.stats.inc_value("near_duplicates/checked")
+        if canonical is None:
+            return item
+
+        self.stats.inc_value("near_duplicates/found")
+        if self.action == "drop":
+            raise DropItem(f"Near-duplicate of {canonical}")
+        adapter["Duplicate_Of"] = canonical
+        return item
+
+    def close_spider(self, spider):
+        self.index.close()
+        spider.logger.info(
+            "Near-duplicates: %d of %d items (%s)",
+            self.stats.get_value("near_duplicates/found", 0),
+            self.stats.get_value("near_duplicates/checked", 0),
+            self.action,
+        )
+
+
+class ListingsStorePipeline(BatchPipeline):
+    """
+    Upserts validated items into ListingsStore (LISTINGS_STORE_FILE), one
+    transaction per batch (LISTINGS_STORE_BATCH_SIZE). Items are passed on
+    after their batch was committed, so every scraped item is in the store.
+
+    Stats: ``listings_store/stored``, ``listings_store/transactions``.
+    """
+
+    def __init__(self, stats, path, batch_size):
+        super().__init__(batch_size)
+        self.stats = stats
+        self.path = path
+        self.store = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("LISTINGS_STORE_ENABLED"):
+            raise NotConfigured
+        return cls(
+            crawler.stats,
+            settings.get("LISTINGS_STORE_FILE", LISTINGS_STORE_FILE),
+            settings.getint("LISTINGS_STORE_BATCH_SIZE", 500),
+        )
+
+    def open_spider(self, spider):
+        self.store = ListingsStore(self.path)
+
+    def process_item(self, item, spider):
+        return self.enqueue(item)
+
+    def process_batch(self, items):
+        stored = self.store.upsert([ItemAdapter(item).asdict() for item in items])
+        self.stats.inc_value("listings_store/stored", stored)
+        self.stats.inc_value("listings_store/transactions")
+        return items
+
+    def close_spider(self, spider):
+        super().close_spider(spider)
+        self.store.close()
@@ -0,0 +1,68 @@
+import sqlite3
+import time
+from pathlib import Path
+
+
+class SeenIndex:
+    """
+    Persistent index of already crawled listings (Item_ID -> last price).
+    Used by incremental crawl to detect new and changed ads.
+
+    Example:
+        index = SeenIndex("data/seen_index.sqlite3")
+        index.status("81397611", "16290")  # -> 'new'
+        index.mark_seen("81397611", "16290")
+        index.status("81397611", "16290")  # -> 'unchanged'
+        index.close()
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shards of a sharded incremental crawl write to the same index
+        self.connection = sqlite3.connect(str(self.path), timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS seen_listings (
+                item_id TEXT PRIMARY KEY,
+                price TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+        """)
+        self.connection.commit()
+
+    def status(self, item_id, price):
+        """
+        Compare listing with the index.
+        Returns:
+            str: 'new', 'changed' (price differs) or 'unchanged'
+        """
+        row = self.connection.execute(
+            "SELECT price FROM seen_listings WHERE item_id = ?", (item_id,)
+        ).fetchone()
+
+        if row is None:
+            return "new"
+        return "unchanged" if row[0] == price else "changed"
+
+    def mark_seen(self, item_id, price):
+        """
+        Insert listing or update its price and last_seen time. Call
+        commit() right after, a sharded crawl shares the index.
+        """
+        now = time.time()
+        self.connection.execute(
+            """INSERT INTO seen_listings (item_id, price, first_seen, last_seen)
+               VALUES (?, ?, ?, ?)
+               ON CONFLICT(item_id) DO UPDATE SET price = excluded.price, last_seen = excluded.last_seen""",
+            (item_id, price, now, now),
+        )
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
@@ -26,8 +26,10 @@ DEFAULT_REQUEST_HEADERS = {
 }
 
 ROBOTSTXT_OBEY = False
-CONCURRENT_REQUESTS = 4
-AUTOTHROTTLE_ENABLED = True
+# Global cap, concurrency of each domain is tuned by AdaptiveConcurrency
+CONCURRENT_REQUESTS = 32
+# AutoThrottle delays would fight with adaptive concurrency
+AUTOTHROTTLE_ENABLED = False
 
 # The download delay setting will honor only one of:
 #CONCURRENT_REQUESTS_PER_DOMAIN = 16
@@ -50,24 +52,86 @@ COOKIES_ENABLED = True
 #SPIDER_MIDDLEWARES = {
 #    "crawler.middlewares.CrawlerSpiderMiddleware": 543,
 #}
+SPIDER_MIDDLEWARES = {
+    "crawler.frontier.FrontierMiddleware": 950,
+    # Closest to the spider, times the callbacks alone
+    "crawler.telemetry.CallbackTimingMiddleware": 990,
+}
+
+# Request queue and seen fingerprints in data/frontier/<spider>.sqlite3,
+# a killed crawl resumes from there and its feeds are appended to
+SCHEDULER = "crawler.frontier.FrontierScheduler"
+FEED_STORAGES = {
+    "": "crawler.frontier.UnbufferedFileFeedStorage",
+    "file": "crawler.frontier.UnbufferedFileFeedStorage",
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #DOWNLOADER_MIDDLEWARES = {
 #    "crawler.middlewares.CrawlerDownloaderMiddleware": 543,
 #}
+# Runs after HttpCompressionMiddleware (590), so body hash is of decompressed body
+DOWNLOADER_MIDDLEWARES = {
+    "crawler.middlewares.ConditionalRequestMiddleware": 580,
+}
+
+# Skip pages unchanged since previous crawl (ETag / Last-Modified / body hash),
+# enabled by `python3 main.py --incremental`
+CONDITIONAL_REQUESTS_ENABLED = False
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
 #EXTENSIONS = {
 #    "scrapy.extensions.telnet.TelnetConsole": None,
 #}
+EXTENSIONS = {
+    "crawler.extensions.AdaptiveConcurrency": 500,
+    "crawler.telemetry.CrawlTelemetry": 600,
+}
+
+# AIMD per-domain concurrency (crawler/extensions.py), live value in stats
+# as adaptive_concurrency/<domain>
+ADAPTIVE_CONCURRENCY_ENABLED = True
+ADAPTIVE_CONCURRENCY_START = 4
+ADAPTIVE_CONCURRENCY_MIN = 1
+ADAPTIVE_CONCURRENCY_MAX = 16
+# Share of 429/5xx/failed downloads in a window that halves concurrency
+ADAPTIVE_CONCURRENCY_ERROR_RATE = 0.05
+# Window latency above best seen latency times this factor halves concurrency
+ADAPTIVE_CONCURRENCY_LATENCY_FACTOR = 2.0
+
+# Per-callback timing, per-domain latency percentiles, bytes, retries and
+# items/sec (crawler/telemetry.py), written every TELEMETRY_INTERVAL seconds
+# to TELEMETRY_FILE ({spider} -> spider name) and printed when a spider closes
+TELEMETRY_ENABLED = True
+TELEMETRY_INTERVAL = 10.0
+# 'jsonl' appends snapshots, 'prometheus' keeps the latest one in text format
+TELEMETRY_FORMAT = "jsonl"
+# Callbacks taking this share of the crawl time are flagged hot
+TELEMETRY_HOT_SHARE = 0.2
+# Latest download latencies per domain used for percentiles
+TELEMETRY_LATENCY_SAMPLES = 10000
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "crawler.pipelines.CrawlerPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "crawler.pipelines.ValidationPipeline": 300,
+    "crawler.pipelines.NearDuplicatePipeline": 400,
+    "crawler.pipelines.ListingsStorePipeline": 500,
+}
+# Items validated with one TypeAdapter call (spider item_model)
+VALIDATION_BATCH_SIZE = 100
+
+# Near-duplicate listings (MinHash LSH, Jaccard >= threshold):
+# 'link' adds Duplicate_Of and skips their detail pages, 'drop' drops them
+NEAR_DUPLICATES_ENABLED = True
+NEAR_DUPLICATES_THRESHOLD = 0.8
+NEAR_DUPLICATES_ACTION = "link"
+
+# Listings upserted into data/listings.sqlite3, one transaction per batch
+LISTINGS_STORE_ENABLED = True
+LISTINGS_STORE_BATCH_SIZE = 500
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
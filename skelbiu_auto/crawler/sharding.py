@@ -0,0 +1,149 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from crawler.spiders.constants import TELEMETRY_FILE
+
+
+def partition(values, shards):
+    """
+    Split values round-robin into at most `shards` non-empty parts.
+    Example:
+        partition(["a", "b", "c"], 2)  # -> [["a", "c"], ["b"]]
+    """
+    parts = [values[index::shards] for index in range(shards)]
+    return [part for part in parts if part]
+
+
+def shard_file(path, shard):
+    """
+    data/skelbiu_output.jsonl -> data/shards/skelbiu_output.<shard>.jsonl
+    data/telemetry_{spider}.jsonl -> data/shards/telemetry_{spider}.<shard>.jsonl
+    """
+    path = Path(path)
+    return str(path.parent / "shards" / f"{path.stem}.{shard}{path.suffix}")
+
+
+def crawl_shard(spider_name, shard, output_file, spider_kwargs, settings_overrides=None):
+    """
+    Run one spider in this process, writing items to its own output file.
+    Called in a fresh worker process for every shard, Twisted reactor can
+    not be restarted.
+
+    Parameters:
+        spider_name (str): 'skelbiu' or 'autoplius'
+        shard (int): Shard number, used in the report
+        output_file (str): JSONL output of the shard
+        spider_kwargs (dict): Spider arguments (start_urls, input_file, ...)
+        settings_overrides (dict): Scrapy settings on top of crawler/settings.py
+
+    Returns:
+        dict: shard, items, requests, runtime and items_per_sec
+    """
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "crawler.settings")
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+    from crawler.spiders.skelbiu_auto import SkelbiuAutoSpider
+    from crawler.spiders.autoplius import AutopliusSpider
+
+    spiders = {"skelbiu": SkelbiuAutoSpider, "autoplius": AutopliusSpider}
+
+    settings = get_project_settings()
+    for name, value in (settings_overrides or {}).items():
+        settings.set(name, value)
+    # cmdline priority wins over the spider's custom_settings FEEDS
+    settings.set("FEEDS", {
+        output_file: {"format": "jsonlines", "encoding": "utf-8", "overwrite": True}
+    }, priority="cmdline")
+    # Every shard resumes its own frontier
+    settings.set("FRONTIER_JOB_SUFFIX", f".{shard}", priority="cmdline")
+    # and writes its own telemetry file
+    settings.set("TELEMETRY_FILE", shard_file(settings.get("TELEMETRY_FILE", TELEMETRY_FILE), shard),
+                 priority="cmdline")
+
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(spiders[spider_name])
+    started_at = time.monotonic()
+    process.crawl(crawler, **spider_kwargs)
+    process.start()
+    runtime = time.monotonic() - started_at
+
+    items = crawler.stats.get_value("item_scraped_count", 0)
+    return {
+        "spider": spider_name,
+        "shard": shard,
+        "items": items,
+        "requests": crawler.stats.get_value("downloader/request_count", 0),
+        "runtime": round(runtime, 2),
+        "items_per_sec": round(items / runtime, 1) if runtime else 0.0,
+    }
+
+
+def run_shards(spider_name, parts, output_file, settings_overrides=None):
+    """
+    Crawl every part in its own process, all parts at once.
+
+    Parameters:
+        spider_name (str): 'skelbiu' or 'autoplius'
+        parts (list[dict]): Spider arguments of every shard
+        output_file (str): Final output file, shard files are named after it
+        settings_overrides (dict): Scrapy settings on top of crawler/settings.py
+
+    Returns:
+        tuple[list[str], list[dict]]: Shard output files and shard reports
+    """
+    files = [shard_file(output_file, shard) for shard in range(len(parts))]
+    Path(files[0]).parent.mkdir(parents=True, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=len(parts), max_tasks_per_child=1) as executor:
+        futures = [
+            executor.submit(crawl_shard, spider_name, shard, files[shard], part, settings_overrides)
+            for shard, part in enumerate(parts)
+        ]
+        reports = [future.result() for future in futures]
+
+    return files, reports
+
+
+def merge_jsonl(shard_files, output_file, key):
+    """
+    Merge shard outputs into one JSONL file sorted by `key`, so the result
+    does not depend on which shard finished first. Records with an already
+    written key (ad listed in two categories) are dropped. Records without
+    a real key (missing, empty or "N/A") are all kept, after the keyed
+    ones, sorted by Link.
+
+    Returns:
+        int: Number of records written
+    """
+    records = {}
+    unkeyed = []
+    for path in shard_files:
+        if not Path(path).exists():
+            continue
+        with open(path, "r", encoding="utf-8") as jsonl_file:
+            for line in jsonl_file:
+                record = json.loads(line)
+                line = line if line.endswith("\n") else line + "\n"
+                record_key = record.get(key)
+                if record_key in (None, "", "N/A"):
+                    unkeyed.append((str(record.get("Link", "")), line))
+                else:
+                    records.setdefault(str(record_key), line)
+
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as jsonl_file:
+        for record_key in sorted(records):
+            jsonl_file.write(records[record_key])
+        for _, line in sorted(unkeyed):
+            jsonl_file.write(line)
+    return len(records) + len(unkeyed)
+
+
+def write_links(links, path):
+    """Write Link records in SkelbiuAutoSpider output format, input of AutopliusSpider shard."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as jsonl_file:
+        for link in links:
+            jsonl_file.write(json.dumps({"Link": link}) + "\n")
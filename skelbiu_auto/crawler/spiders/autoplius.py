@@ -1,12 +1,105 @@
 import scrapy
 import json
-from crawler.models.autop_models import (
-    AutopliusCarModel,
-    AutopliusCarParameters,
-    AutopliusCarDescription,
-    AutopliusCarFeatures)
+from lxml import etree
+from crawler.models.autop_models import AutopliusCarModel
 from crawler.spiders.constants import AUTOP_OUTPUT_FILE, SKELBIU_AUTO_OUTPUT_FILE
 from rich import print
+from crawler.frontier import apply_frontier_settings
+
+
+# Autoplius parameter label -> AutopliusCarParameters field
+PARAMETER_FIELDS = {
+    "Pirma registracija": "First_Registration",
+    "Rida": "Mileage",
+    "Variklis": "Engine",
+    "Kuro tipas": "Fuel",
+    "Kėbulo tipas": "Body_Type",
+    "Durų skaičius": "Doors",
+    "Varantieji ratai": "Drive",
+    "Pavarų dėžė": "Gearbox",
+    "Klimato valdymas": "Climate_Control",
+    "Spalva": "Color",
+    "Tech. apžiūra iki": "Tech_Inspection",
+    "Ratlankių skersmuo": "Rim_Size",
+    "Nuosava masė, kg": "Weight",
+    "Sėdimų vietų skaičius": "Seats",
+    "Euro standartas": "Euro_Standard",
+    "CO₂ emisija, g/km": "CO2_Emission",
+    "Taršos mokestis": "Pollution_Tax",
+    "Mieste": "City_Consumption",
+    "Užmiestyje": "Highway_Consumption",
+    "Vidutinės": "Average_Consumption",
+}
+
+
+def _has_class(class_name):
+    """XPath predicate matching one class token, same as CSS `.class_name`."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+# XPath expressions are compiled once, not per page
+TITLE = etree.XPath("//title/text()", smart_strings=False)
+DESCRIPTION = etree.XPath(f"//div[{_has_class('announcement-description')}]")
+PHONE = etree.XPath(f"//div[{_has_class('js-phone-number')}]/text()", smart_strings=False)
+PRICE = etree.XPath(f"//div[{_has_class('price')}]/text()", smart_strings=False)
+AD_ID = etree.XPath(f"//span[{_has_class('announcement-id')}]/text()", smart_strings=False)
+PARAMETER_ROWS = etree.XPath(f"//div[{_has_class('parameter-row')}]")
+PARAMETER_LABEL = etree.XPath(f".//div[{_has_class('parameter-label')}]/text()", smart_strings=False)
+PARAMETER_VALUE = etree.XPath(f".//div[{_has_class('parameter-value')}]/text()", smart_strings=False)
+FEATURE_ROWS = etree.XPath(f"//div[{_has_class('feature-row')}]")
+FEATURE_LABEL = etree.XPath(f".//div[{_has_class('feature-label')}]/text()", smart_strings=False)
+FEATURE_ITEMS = etree.XPath(
+    f".//div[{_has_class('feature-list')}]//span[{_has_class('feature-item')}]/text()",
+    smart_strings=False,
+)
+STRING_VALUE = etree.XPath("string(.)", smart_strings=False)
+
+
+def _first(values, default="N/A"):
+    return values[0] if values else default
+
+
+def extract_car_data(root, url):
+    """
+    Extract Autoplius ad fields from parsed page in one pass over parameter
+    and feature rows.
+
+    Parameters:
+        root (lxml.html.HtmlElement): Parsed page, ``response.selector.root``
+            in a spider or ``lxml.html.fromstring(html)`` outside Scrapy.
+        url (str): Ad URL.
+
+    Returns:
+        dict: Data for AutopliusCarModel.model_validate(), missing parameters are "N/A".
+    """
+    descriptions = DESCRIPTION(root)
+    description = STRING_VALUE(descriptions[0]).strip() if descriptions else "N/A"
+
+    parameters = dict.fromkeys(PARAMETER_FIELDS.values(), "N/A")
+    for row in PARAMETER_ROWS(root):
+        label = _first(PARAMETER_LABEL(row)).strip()
+        value = _first(PARAMETER_VALUE(row)).strip()
+        field = PARAMETER_FIELDS.get(label)
+        if field and value:
+            parameters[field] = value
+
+    features = {}
+    for row in FEATURE_ROWS(root):
+        label = _first(FEATURE_LABEL(row), "").strip()
+        items = [item.strip() for item in FEATURE_ITEMS(row) if item.strip()]
+        if label and items:
+            features[label] = items
+
+    return {
+        "Id": _first(AD_ID(root)).strip(" ID:"),
+        "Price": _first(PRICE(root)).strip().replace(" ", ""),
+        "Phone": _first(PHONE(root)).strip(),
+        "Link": url,
+        "Title": _first(TITLE(root)).strip(),
+        "Parameters": parameters,
+        "Description": {"Description": [description.replace("\r", "").replace("\n", "")]},
+        "Features": {"Features": features},
+    }
 
 
 class AutopliusSpider(scrapy.Spider):
@@ -14,8 +107,13 @@ class AutopliusSpider(scrapy.Spider):
     Scrapy spider that loads previously collected Autoplius listing URLs
     from a JSONL file, then visits each ad page and extracts detailed car data.
 
+    With ``pipelined=True`` the file is not read, requests are scheduled by
+    LinkFeeder while SkelbiuAutoSpider is still running. ``input_file``
+    replaces the default SKELBIU_AUTO_OUTPUT_FILE (sharded runs).
+
     Output:
-        Yields dictionaries compliant with AutopliusCarModel Pydantic schema.
+        Yields raw dictionaries, ValidationPipeline validates them with
+        AutopliusCarModel (``item_model``).
     """
     custom_settings = {
         "FEEDS": {
@@ -28,25 +126,53 @@ class AutopliusSpider(scrapy.Spider):
     }
 
     name = "autoplius_spider"
+    item_model = AutopliusCarModel
+
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        apply_frontier_settings(cls.name, settings)
+
+    def __init__(self, pipelined=False, input_file=SKELBIU_AUTO_OUTPUT_FILE, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pipelined = str(pipelined).lower() in ("1", "true", "yes")
+        self.input_file = input_file
+
+    async def start(self):
+        """Scrapy >= 2.13 entry point, yields start_requests() output."""
+        for request in self.start_requests():
+            yield request
 
     def start_requests(self):
         """
-        Reads AUTOP_OUTPUT_FILE (JSONL format), extracts the 'Link' field from
-        each line, and schedules a scrapy.Request for each URL.
+        Reads input_file (SKELBIU_AUTO_OUTPUT_FILE by default, JSONL format),
+        extracts the 'Link' field from each line, and schedules a
+        scrapy.Request for each URL. Listings with 'Duplicate_Of'
+        (NearDuplicatePipeline) are skipped.
 
         Yields:
             scrapy.Request: Requests to individual Autoplius car listing pages.
         """
+        if self.pipelined:
+            return
+
         urls = []
+        duplicates = 0
 
-        with open(SKELBIU_AUTO_OUTPUT_FILE, "r", encoding="utf-8") as jsonl_file:
+        with open(self.input_file, "r", encoding="utf-8") as jsonl_file:
             for line in jsonl_file:
                 data = json.loads(line)
                 link = data.get("Link")
-                if link:
+                if link and data.get("Duplicate_Of"):
+                    # Near-duplicate of another listing, its details are crawled once
+                    duplicates += 1
+                elif link:
                     urls.append(link)
 
         print(f"Found {len(urls)} URLs to crawl")
+        if duplicates:
+            print(f"Skipped {duplicates} near-duplicate listings")
+            self.crawler.stats.inc_value("near_duplicates/detail_requests_saved", duplicates)
 
         for url in urls:
             yield scrapy.Request(url=url, callback=self.parse)
@@ -65,107 +191,16 @@ class AutopliusSpider(scrapy.Spider):
             response (scrapy.http.Response): The page response.
 
         Yields:
-            dict: Serialized AutopliusCarModel using `model_dump()`.
+            dict: Raw ad data, validated and normalized with AutopliusCarModel
+            by ValidationPipeline.
         """
         status = response.status
 
         if status != 200:
             print(f"error Failed to fetch the page, status code: {status}")
             return
-        else:
-            title = response.css("title::text").get(default="N/A").strip()
-            description = (
-                response.css("div.announcement-description")
-                .xpath("string(.)")
-                .get(default="N/A")
-                .strip()
-            )
-            clean_description = description.replace("\r", "").replace("\n", "")
-            phone = response.css("div.js-phone-number::text").get(default="N/A").strip()
-            price = (
-                response.css("div.price::text")
-                .get(default="N/A")
-                .strip()
-                .replace(" ", "")
-            )
-            id = (
-                response.css("span.announcement-id::text")
-                .get(default="N/A")
-                .strip(" ID:")
-            )
-            parse_url = response.url
-
-            parameter_data = {}
-            rows = response.css("div.parameter-row")
-            for row in rows:
-                label = row.css("div.parameter-label::text").get(default="N/A").strip()
-                value = row.css("div.parameter-value::text").get(default="N/A").strip()
-                if label and value:
-                    parameter_data[label] = value
-
-            year = parameter_data.get("Pirma registracija", "N/A")
-            mileage = parameter_data.get("Rida", "N/A")
-            engine = parameter_data.get("Variklis", "N/A")
-            fuel = parameter_data.get("Kuro tipas", "N/A")
-            body_type = parameter_data.get("Kėbulo tipas", "N/A")
-            doors = parameter_data.get("Durų skaičius", "N/A")
-            drive = parameter_data.get("Varantieji ratai", "N/A")
-            gearbox = parameter_data.get("Pavarų dėžė", "N/A")
-            climate_control = parameter_data.get("Klimato valdymas", "N/A")
-            color = parameter_data.get("Spalva", "N/A")
-            tech_inspection = parameter_data.get("Tech. apžiūra iki", "N/A")
-            rim_size = parameter_data.get("Ratlankių skersmuo", "N/A")
-            weight = parameter_data.get("Nuosava masė, kg", "N/A")
-            seats = parameter_data.get("Sėdimų vietų skaičius", "N/A")
-            euro_standard = parameter_data.get("Euro standartas", "N/A")
-            co2_emission = parameter_data.get("CO₂ emisija, g/km", "N/A")
-            pollution_tax = parameter_data.get("Taršos mokestis", "N/A")
-            city_consumption = parameter_data.get("Mieste", "N/A")
-            highway_consumption = parameter_data.get("Užmiestyje", "N/A")
-            average_consumption = parameter_data.get("Vidutinės", "N/A")
-
-            features_data = {}
-            feature_rows = response.css("div.feature-row")
-            for row in feature_rows:
-                label = row.css("div.feature-label::text").get(default="").strip()
-                items = row.css("div.feature-list span.feature-item::text").getall()
-                cleaned_items = [item.strip() for item in items if item.strip()]
-                if label and cleaned_items:
-                    features_data[label] = cleaned_items
-
-            car_data = AutopliusCarModel(
-                Id=id,
-                Price=price,
-                Phone=phone,
-                Link=parse_url,
-                Title=title,
-                Parameters=AutopliusCarParameters(
-                    First_Registration=year,
-                    Mileage=mileage,
-                    Engine=engine,
-                    Fuel=fuel,
-                    Body_Type=body_type,
-                    Doors=doors,
-                    Drive=drive,
-                    Gearbox=gearbox,
-                    Climate_Control=climate_control,
-                    Color=color,
-                    Tech_Inspection=tech_inspection,
-                    Rim_Size=rim_size,
-                    Weight=weight,
-                    Seats=seats,
-                    Euro_Standard=euro_standard,
-                    CO2_Emission=co2_emission,
-                    Pollution_Tax=pollution_tax,
-                    City_Consumption=city_consumption,
-                    Highway_Consumption=highway_consumption,
-                    Average_Consumption=average_consumption,
-                ),
-                Description=AutopliusCarDescription(Description=[clean_description]),
-                Features=AutopliusCarFeatures(Features=features_data),
-            )
-
-            yield car_data.model_dump()
+
+        yield extract_car_data(response.selector.root, response.url)
 
     def closed(self, reason):
         """
@@ -23,3 +23,32 @@ SKELBIU_AUTO_OUTPUT_FILE = "data/skelbiu_output.jsonl"
 
 # Output file for AutopliusSpider
 AUTOP_OUTPUT_FILE = "data/autoplius_output.jsonl"
+
+
+# Autoplius links given to every shard of a sharded run (data/shards/autoplius_links.<n>.jsonl)
+AUTOP_LINKS_FILE = "data/autoplius_links.jsonl"
+
+
+# Index of already crawled Skelbiu listings for incremental crawl
+SEEN_INDEX_FILE = "data/seen_index.sqlite3"
+
+
+# ETag / Last-Modified / body hash store for conditional requests
+HTTP_VALIDATORS_FILE = "data/http_validators.sqlite3"
+
+
+# Persistent crawl frontier (request queue + seen fingerprints) of unfinished crawls
+FRONTIER_DIR = "data/frontier"
+
+
+# MinHash LSH index of Skelbiu and Autoplius listings for near-duplicate detection
+NEAR_DUPLICATES_INDEX_FILE = "data/near_duplicates.sqlite3"
+
+
+# SQLite store of all crawled listings (ListingsStorePipeline, ListingsStore queries)
+LISTINGS_STORE_FILE = "data/listings.sqlite3"
+
+
+# Crawl telemetry snapshots (CrawlTelemetry), one JSON line per snapshot,
+# {spider} -> spider name, so spiders of one process write separate files
+TELEMETRY_FILE = "data/telemetry_{spider}.jsonl"
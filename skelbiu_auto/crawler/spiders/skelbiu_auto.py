@@ -1,8 +1,11 @@
 import scrapy
+from scrapy import signals
 from crawler.spiders.constants import AUTO_URLS, ADS_PER_PAGE
 from crawler.models.skelbiu_models import SkelbiuAutoModel
 from rich import print
-from crawler.spiders.constants import SKELBIU_AUTO_OUTPUT_FILE
+from crawler.frontier import apply_frontier_settings
+from crawler.spiders.constants import SKELBIU_AUTO_OUTPUT_FILE, SEEN_INDEX_FILE
+from crawler.seen_index import SeenIndex
 
 
 class SkelbiuAutoSpider(scrapy.Spider):
@@ -14,7 +17,13 @@ class SkelbiuAutoSpider(scrapy.Spider):
         2. Extracts total number of ads and calculates pagination count.
         3. Queues all paginated listing pages.
         4. Extracts structured ad data from each listing page.
-        5. Outputs items as dictionaries via Pydantic model validation.
+        5. Outputs raw ad dictionaries, validated and normalized in batches
+           by ValidationPipeline (``item_model``).
+
+    Incremental mode (``scrapy crawl skelbiu_spider -a incremental=1``):
+        Pages are requested one by one and every ad is compared with the
+        SeenIndex (Item_ID + price). Only new or changed ads are output and
+        pagination stops at the first page with only unchanged ads.
 
     Attributes
     ----------
@@ -24,6 +33,8 @@ class SkelbiuAutoSpider(scrapy.Spider):
         Initial category URLs defined in AUTO_URLS.
     collected_urls : list[str]
         Internal list storing every paginated URL that is crawled.
+    incremental : bool
+        Crawl only new or changed ads (spider argument).
     """
     custom_settings = {
         "FEEDS": {
@@ -36,9 +47,40 @@ class SkelbiuAutoSpider(scrapy.Spider):
     }
 
     name = 'skelbiu_spider'
+    item_model = SkelbiuAutoModel
     start_urls = AUTO_URLS
     collected_urls = []
 
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        apply_frontier_settings(cls.name, settings)
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        if spider.incremental:
+            crawler.signals.connect(spider.item_scraped, signal=signals.item_scraped)
+            crawler.signals.connect(spider.item_dropped, signal=signals.item_dropped)
+        return spider
+
+    def __init__(self, incremental=False, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.incremental = str(incremental).lower() in ("1", "true", "yes")
+        self.seen_index = SeenIndex(SEEN_INDEX_FILE) if self.incremental else None
+        self.skipped_unchanged = 0
+
+    async def start(self):
+        """
+        Request category pages. In full crawl the category page is needed for
+        pagination every time, so it is excluded from conditional requests.
+        """
+        for url in self.start_urls:
+            yield scrapy.Request(url, dont_filter=True, meta={"conditional": self.incremental})
+
+    def page_url(self, base_url, page):
+        return base_url if page == 1 else f"{base_url}{page}"
+
     def parse(self, response):
         """
         Parse the initial category page to determine pagination.
@@ -62,11 +104,15 @@ class SkelbiuAutoSpider(scrapy.Spider):
         total_pages = (ads_count // ADS_PER_PAGE) + (1 if ads_count % 24 != 0 else 0)
         print(f"Total ads: {ads_count if ads_count_text else 'unknown'} Total pages: {total_pages}")
 
+        if self.incremental:
+            # Newest ads come first, next page is requested only while pages contain changes
+            self.collected_urls.append(response.url)
+            response.meta.update({"base_url": response.url, "page": 1, "total_pages": total_pages})
+            yield from self.parse_ads(response)
+            return
+
         for page in range(1, total_pages + 1):
-            if page == 1:
-                url = response.url
-            else:
-                url = f"{response.url}{page}"
+            url = self.page_url(response.url, page)
             self.collected_urls.append(url)
             print(f"Queueing URL: {url}")
             yield scrapy.Request(url, callback=self.parse_ads)
@@ -82,8 +128,9 @@ class SkelbiuAutoSpider(scrapy.Spider):
             - Price
             - Listing URL
             - Image URL
-        Each ad is converted to a Pydantic `SkelbiuAutoModel`,
-        validated, and output as a dictionary.
+        Each ad is output as a raw dictionary, ValidationPipeline
+        validates it in batches with `SkelbiuAutoModel` and adds
+        normalized numeric fields.
 
         Parameters
         ----------
@@ -93,6 +140,7 @@ class SkelbiuAutoSpider(scrapy.Spider):
         print(f"Parsing page: {response.url}")
         ads = response.css('a.gallery-item-element-link.js-cfuser-link')
         print(f"Number of ads on this page: {len(ads)}")
+        page_has_changes = False
 
         for ad in ads:
             href = ad.attrib.get('href')
@@ -117,8 +165,59 @@ class SkelbiuAutoSpider(scrapy.Spider):
                 "Image URL": image_url
             }
 
-            item = SkelbiuAutoModel(**data)
-            yield item.model_dump()
+            if self.incremental:
+                # New and changed ads are marked seen in item_scraped()
+                if self.seen_index.status(item_id, price) == "unchanged":
+                    self.skipped_unchanged += 1
+                    continue
+                page_has_changes = True
+
+            yield data
+
+        if self.incremental:
+            yield from self.next_incremental_page(response, page_has_changes)
+
+    def item_scraped(self, item, response, spider):
+        """
+        Mark ad seen in incremental mode once it went through the item
+        pipelines and was exported. An ad lost with a killed crawl (or a
+        pipeline error) stays new / changed and is output next time.
+        """
+        self.seen_index.mark_seen(item["Item_ID"], item["Price"])
+        self.seen_index.commit()
+
+    def item_dropped(self, item, response, exception, spider):
+        """
+        Mark ad seen when a pipeline dropped it (DropItem: invalid item,
+        near-duplicate). The drop would repeat on the next crawl, so the
+        ad is not retried and does not keep its page counted as changed.
+        """
+        if item.get("Item_ID"):
+            self.item_scraped(item, response, spider)
+
+    def next_incremental_page(self, response, page_has_changes):
+        """
+        Queue next listing page in incremental mode.
+        Stops paginating when the current page has only already seen,
+        unchanged ads.
+        """
+        page = response.meta["page"]
+        total_pages = response.meta["total_pages"]
+
+        if not page_has_changes:
+            print(f"No new or changed ads on page {page}, stopping pagination")
+            return
+        if page >= total_pages:
+            return
+
+        url = self.page_url(response.meta["base_url"], page + 1)
+        self.collected_urls.append(url)
+        print(f"Queueing URL: {url}")
+        yield scrapy.Request(
+            url,
+            callback=self.parse_ads,
+            meta={"base_url": response.meta["base_url"], "page": page + 1, "total_pages": total_pages},
+        )
 
 
     def closed(self, reason):
@@ -138,4 +237,7 @@ class SkelbiuAutoSpider(scrapy.Spider):
         print(f"Total collected URLs: {len(self.collected_urls)}")
         for url in self.collected_urls:
             print(url)
+        if self.incremental:
+            print(f"Unchanged ads skipped: {self.skipped_unchanged}")
+            self.seen_index.close()
         print(f"Reason for closure Skelbiu crawler: {reason}")
@@ -0,0 +1,331 @@
+import json
+import logging
+import os
+import time
+from collections import deque
+from pathlib import Path
+from rich import print
+from scrapy import Request, signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet import task
+from crawler.spiders.constants import TELEMETRY_FILE
+
+
+logger = logging.getLogger(__name__)
+
+# Sent by CallbackTimingMiddleware when a callback's output was consumed
+callback_timed = object()
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted values, None for no values."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+
+class CallbackTimingMiddleware:
+    """
+    Spider middleware measuring the time spent inside every callback.
+    Callbacks are generators, so their code runs while their output is
+    iterated: only the next() calls of the callback output are timed, not
+    the middlewares and pipelines processing what it yielded. Closest to
+    the spider (highest order), the time is of the callback alone.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("TELEMETRY_ENABLED"):
+            raise NotConfigured
+        return cls(crawler)
+
+    def process_spider_output(self, response, result, spider):
+        callback = response.request.callback if response.request is not None else None
+        name = getattr(callback, "__name__", None) or "parse"
+        seconds, items, requests = 0.0, 0, 0
+        output = iter(result)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item_or_request = next(output)
+                except StopIteration:
+                    break
+                finally:
+                    seconds += time.perf_counter() - started
+                if isinstance(item_or_request, Request):
+                    requests += 1
+                else:
+                    items += 1
+                yield item_or_request
+        finally:
+            self.crawler.signals.send_catch_log(
+                callback_timed, callback=name, seconds=seconds, items=items, requests=requests
+            )
+
+
+class CallbackStats:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.items = 0
+        self.requests = 0
+
+    def add(self, seconds, items, requests):
+        self.calls += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.items += items
+        self.requests += requests
+
+
+class DomainStats:
+    def __init__(self, latency_samples):
+        self.responses = 0
+        self.failures = 0
+        self.retries = 0
+        self.bytes = 0
+        self.statuses = {}
+        # Latest download latencies, percentiles are of these
+        self.latencies = deque(maxlen=latency_samples)
+
+    def add(self, response, latency):
+        self.responses += 1
+        self.bytes += len(response.body)
+        self.statuses[response.status] = self.statuses.get(response.status, 0) + 1
+        if latency is not None:
+            self.latencies.append(latency)
+
+
+class CrawlTelemetry:
+    """
+    Crawl metrics written every TELEMETRY_INTERVAL seconds and when the
+    spider closes, to tune throughput with data instead of guesses:
+
+        - per callback: calls, total / mean / max time, items and requests
+          yielded (CallbackTimingMiddleware) and share of the crawl time
+          spent in it
+        - per domain: responses, bytes, status codes, download latency
+          p50 / p90 / p99, retries and failed downloads
+        - items scraped, items/sec overall and since the last snapshot
+
+    A callback running longer than TELEMETRY_HOT_SHARE of the crawl time
+    is flagged hot: callbacks run in the single reactor thread, so such a
+    callback limits throughput whatever the concurrency.
+
+    TELEMETRY_FORMAT:
+        'jsonl'      - one snapshot per line appended to TELEMETRY_FILE
+        'prometheus' - TELEMETRY_FILE replaced with the latest snapshot in
+                       Prometheus text format (node_exporter textfile collector)
+    ``{spider}`` in TELEMETRY_FILE is replaced with the spider name.
+    """
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.interval = settings.getfloat("TELEMETRY_INTERVAL", 10.0)
+        self.format = settings.get("TELEMETRY_FORMAT", "jsonl")
+        self.path = settings.get("TELEMETRY_FILE", TELEMETRY_FILE)
+        self.hot_share = settings.getfloat("TELEMETRY_HOT_SHARE", 0.2)
+        self.latency_samples = settings.getint("TELEMETRY_LATENCY_SAMPLES", 10000)
+        if self.format not in ("jsonl", "prometheus"):
+            raise NotConfigured(f"Unknown TELEMETRY_FORMAT {self.format}")
+
+        self.callbacks = {}
+        self.domains = {}
+        self.responded = set()
+        self.items = 0
+        self.hot = set()
+        self.started_at = None
+        self.last_snapshot = (None, 0)
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("TELEMETRY_ENABLED"):
+            raise NotConfigured
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.callback_timed, signal=callback_timed)
+        crawler.signals.connect(ext.request_scheduled, signal=signals.request_scheduled)
+        crawler.signals.connect(ext.response_downloaded, signal=signals.response_downloaded)
+        crawler.signals.connect(ext.request_left_downloader, signal=signals.request_left_downloader)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        return ext
+
+    def domain(self, request):
+        key = urlparse_cached(request).hostname or ""
+        if key not in self.domains:
+            self.domains[key] = DomainStats(self.latency_samples)
+        return self.domains[key]
+
+    def spider_opened(self, spider):
+        self.path = str(self.path).format(spider=spider.name)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.started_at = time.monotonic()
+        self.last_snapshot = (self.started_at, 0)
+        self.task = task.LoopingCall(self.write, spider)
+        self.task.start(self.interval, now=False)
+
+    def callback_timed(self, callback, seconds, items, requests):
+        if callback not in self.callbacks:
+            self.callbacks[callback] = CallbackStats()
+        self.callbacks[callback].add(seconds, items, requests)
+        self.stats.inc_value(f"telemetry/callback/{callback}/seconds", seconds)
+
+    def request_scheduled(self, request, spider):
+        # RetryMiddleware schedules a copy with retry_times incremented
+        if request.meta.get("retry_times", 0) > 0:
+            self.domain(request).retries += 1
+
+    def response_downloaded(self, response, request, spider):
+        self.responded.add(id(request))
+        self.domain(request).add(response, request.meta.get("download_latency"))
+
+    def request_left_downloader(self, request, spider):
+        if id(request) in self.responded:
+            self.responded.discard(id(request))
+            return
+        # Download failed without a response (timeout, connection error)
+        self.domain(request).failures += 1
+
+    def item_scraped(self, item, spider):
+        self.items += 1
+
+    def snapshot(self, spider):
+        """
+        Returns:
+            dict: Current metrics, as written to a JSONL telemetry file
+        """
+        now = time.monotonic()
+        elapsed = now - self.started_at
+        last_at, last_items = self.last_snapshot
+        self.last_snapshot = (now, self.items)
+
+        callbacks = {}
+        for name, stats in sorted(self.callbacks.items(), key=lambda entry: -entry[1].seconds):
+            share = stats.seconds / elapsed if elapsed else 0.0
+            callbacks[name] = {
+                "calls": stats.calls,
+                "seconds": round(stats.seconds, 4),
+                "mean_ms": round(stats.seconds / stats.calls * 1000, 3) if stats.calls else 0.0,
+                "max_ms": round(stats.max_seconds * 1000, 3),
+                "items": stats.items,
+                "requests": stats.requests,
+                "share": round(share, 4),
+                "hot": share >= self.hot_share,
+            }
+            if share >= self.hot_share and name not in self.hot:
+                self.hot.add(name)
+                logger.warning(
+                    "Hot callback %s.%s: %.0f%% of crawl time, %.1f ms per call",
+                    spider.name, name, share * 100, callbacks[name]["mean_ms"],
+                )
+
+        domains = {}
+        for name, stats in sorted(self.domains.items()):
+            latencies = sorted(stats.latencies)
+            domains[name] = {
+                "responses": stats.responses,
+                "bytes": stats.bytes,
+                "statuses": {str(status): count for status, count in sorted(stats.statuses.items())},
+                "retries": stats.retries,
+                "failures": stats.failures,
+                "latency_p50": percentile(latencies, 0.5),
+                "latency_p90": percentile(latencies, 0.9),
+                "latency_p99": percentile(latencies, 0.99),
+            }
+
+        return {
+            "time": round(time.time(), 3),
+            "spider": spider.name,
+            "elapsed": round(elapsed, 3),
+            "items": self.items,
+            "items_per_sec": round(self.items / elapsed, 2) if elapsed else 0.0,
+            "items_per_sec_interval": round((self.items - last_items) / (now - last_at), 2) if now > last_at else 0.0,
+            "callbacks": callbacks,
+            "domains": domains,
+        }
+
+    def write(self, spider):
+        snapshot = self.snapshot(spider)
+        if self.format == "jsonl":
+            with open(self.path, "a", encoding="utf-8") as telemetry_file:
+                telemetry_file.write(json.dumps(snapshot) + "\n")
+        else:
+            # Readers never see a half-written file
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as telemetry_file:
+                telemetry_file.write(prometheus_text(snapshot))
+            os.replace(temporary, self.path)
+        return snapshot
+
+    def spider_closed(self, spider, reason):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+        snapshot = self.write(spider)
+        print_summary(snapshot)
+
+
+def prometheus_text(snapshot):
+    """Snapshot -> Prometheus text exposition format."""
+    spider = snapshot["spider"]
+    metrics = [
+        ("crawler_items_scraped_total", "counter", [({}, snapshot["items"])]),
+        ("crawler_items_per_second", "gauge", [({}, snapshot["items_per_sec_interval"])]),
+        ("crawler_elapsed_seconds", "gauge", [({}, snapshot["elapsed"])]),
+    ]
+    callbacks = snapshot["callbacks"].items()
+    metrics += [
+        ("crawler_callback_calls_total", "counter",
+         [({"callback": name}, stats["calls"]) for name, stats in callbacks]),
+        ("crawler_callback_seconds_total", "counter",
+         [({"callback": name}, stats["seconds"]) for name, stats in callbacks]),
+        ("crawler_callback_max_seconds", "gauge",
+         [({"callback": name}, stats["max_ms"] / 1000) for name, stats in callbacks]),
+        ("crawler_callback_hot", "gauge",
+         [({"callback": name}, int(stats["hot"])) for name, stats in callbacks]),
+    ]
+    domains = snapshot["domains"].items()
+    metrics += [
+        ("crawler_responses_total", "counter",
+         [({"domain": name, "status": status}, count)
+          for name, stats in domains for status, count in stats["statuses"].items()]),
+        ("crawler_response_bytes_total", "counter", [({"domain": name}, stats["bytes"]) for name, stats in domains]),
+        ("crawler_retries_total", "counter", [({"domain": name}, stats["retries"]) for name, stats in domains]),
+        ("crawler_download_failures_total", "counter",
+         [({"domain": name}, stats["failures"]) for name, stats in domains]),
+        ("crawler_download_latency_seconds", "summary",
+         [({"domain": name, "quantile": quantile}, stats[f"latency_p{key}"])
+          for name, stats in domains for quantile, key in (("0.5", 50), ("0.9", 90), ("0.99", 99))
+          if stats[f"latency_p{key}"] is not None]),
+    ]
+
+    lines = []
+    for metric, metric_type, samples in metrics:
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for labels, value in samples:
+            labels = ",".join(f'{name}="{value}"' for name, value in {"spider": spider, **labels}.items())
+            lines.append(f"{metric}{{{labels}}} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def print_summary(snapshot):
+    """Callback and domain table of the final snapshot."""
+    print(f"[bold]{snapshot['spider']}[/bold]: {snapshot['items']} items in {snapshot['elapsed']:.1f}s "
+          f"({snapshot['items_per_sec']} items/s)")
+    for name, stats in snapshot["callbacks"].items():
+        print(f"  {name:<24} {stats['calls']:>6} calls {stats['mean_ms']:>8.2f} ms/call "
+              f"{stats['share'] * 100:>5.1f}%" + (" [red]HOT[/red]" if stats["hot"] else ""))
+    for name, stats in snapshot["domains"].items():
+        p50, p99 = stats["latency_p50"], stats["latency_p99"]
+        latency = f"p50 {p50 * 1000:.0f} ms p99 {p99 * 1000:.0f} ms" if p50 is not None else "no latency"
+        print(f"  {name:<20} {stats['responses']:>6} resp {stats['bytes'] / 1e6:>7.1f} MB "
+              f"{latency}, {stats['retries']} retries")
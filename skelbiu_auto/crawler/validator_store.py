@@ -0,0 +1,63 @@
+import sqlite3
+import time
+from pathlib import Path
+
+
+class ValidatorStore:
+    """
+    Persistent HTTP validators of crawled pages
+    (URL -> ETag, Last-Modified, body hash and size).
+    Used by ConditionalRequestMiddleware to send conditional requests and
+    to recognize pages that did not change since the previous crawl.
+
+    Example:
+        store = ValidatorStore("data/http_validators.sqlite3")
+        store.set(url, '"abc"', "Sat, 18 Oct 2026 10:00:00 GMT", body_hash, 52000)
+        store.get(url)  # -> ('"abc"', 'Sat, 18 Oct 2026 10:00:00 GMT', body_hash, 52000)
+        store.close()
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shards of a sharded crawl write to the same store
+        self.connection = sqlite3.connect(str(self.path), timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS http_validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT NOT NULL,
+                body_size INTEGER NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        self.connection.commit()
+
+    def get(self, url):
+        """
+        Returns:
+            tuple | None: (etag, last_modified, body_hash, body_size) or None
+                for a page that was not crawled yet
+        """
+        return self.connection.execute(
+            "SELECT etag, last_modified, body_hash, body_size FROM http_validators WHERE url = ?",
+            (url,),
+        ).fetchone()
+
+    def set(self, url, etag, last_modified, body_hash, body_size):
+        """Insert or replace validators of a page."""
+        self.connection.execute(
+            """INSERT OR REPLACE INTO http_validators
+               (url, etag, last_modified, body_hash, body_size, updated)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (url, etag, last_modified, body_hash, body_size, time.time()),
+        )
+        # Short write transactions, other shard processes wait for the lock
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
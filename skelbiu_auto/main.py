@@ -1,19 +1,141 @@
+import json
+import sys
+import time
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
+from twisted.internet import defer
 from crawler.spiders.skelbiu_auto import SkelbiuAutoSpider
 from crawler.spiders.autoplius import AutopliusSpider
-from crawler.spiders.constants import SKELBIU_AUTO_OUTPUT_FILE, AUTOP_OUTPUT_FILE
+from crawler.spiders.constants import (
+    AUTO_URLS, SKELBIU_AUTO_OUTPUT_FILE, AUTOP_OUTPUT_FILE, AUTOP_LINKS_FILE, LISTINGS_STORE_FILE)
+from crawler.listings_store import ListingsStore
+from crawler.link_feeder import LinkFeeder
+from crawler.sharding import partition, run_shards, merge_jsonl, shard_file, write_links
 from rich import print
 
 
+def run_pipelined(process, incremental, start_urls=AUTO_URLS):
+    """
+    Run both spiders at once, each Skelbiu item's Link is scheduled
+    to AutopliusSpider as soon as the item is scraped.
+
+    Returns:
+        dict: LinkFeeder.summary() (latency and runtime)
+    """
+    skelbiu_crawler = process.create_crawler(SkelbiuAutoSpider)
+    autoplius_crawler = process.create_crawler(AutopliusSpider)
+    feeder = LinkFeeder(skelbiu_crawler, autoplius_crawler)
+
+    process.crawl(skelbiu_crawler, incremental=incremental, start_urls=list(start_urls))
+    process.crawl(autoplius_crawler, pipelined=True)
+    process.start()
+
+    summary = feeder.summary()
+    print(f"Pipelined crawl summary: {summary}")
+    return summary
+
+
+def run_sequential(process, incremental, start_urls=AUTO_URLS):
+    """Run AutopliusSpider after SkelbiuAutoSpider has written its output file."""
+    @defer.inlineCallbacks
+    def crawl():
+        yield process.crawl(SkelbiuAutoSpider, incremental=incremental, start_urls=list(start_urls))
+        yield process.crawl(AutopliusSpider)
+
+    def stop_reactor(_):
+        # Imported here, CrawlerProcess installs the reactor on first crawl
+        from twisted.internet import reactor
+        reactor.stop()
+
+    crawl().addBoth(stop_reactor)
+    process.start(stop_after_crawl=False)
+
+
+def run_sharded(shards, incremental, start_urls=AUTO_URLS, settings_overrides=None):
+    """
+    Run the crawl in worker processes, each with its own reactor and CPU core.
+    Categories (start_urls) are split between Skelbiu shards, collected ad
+    links between Autoplius shards. Shard outputs are merged into
+    SKELBIU_AUTO_OUTPUT_FILE (sorted by Item_ID) and AUTOP_OUTPUT_FILE
+    (sorted by Id).
+
+    Returns:
+        list[dict]: Per-shard reports (spider, shard, items, requests,
+            runtime, items_per_sec)
+    """
+    listing_parts = [{"start_urls": urls, "incremental": incremental}
+                     for urls in partition(list(start_urls), shards)]
+    files, reports = run_shards("skelbiu", listing_parts, SKELBIU_AUTO_OUTPUT_FILE, settings_overrides)
+    listings = merge_jsonl(files, SKELBIU_AUTO_OUTPUT_FILE, "Item_ID")
+    print(f"Merged {listings} Skelbiu ads into {SKELBIU_AUTO_OUTPUT_FILE}")
+
+    with open(SKELBIU_AUTO_OUTPUT_FILE, "r", encoding="utf-8") as jsonl_file:
+        ads = [json.loads(line) for line in jsonl_file]
+    # Near-duplicate listings (Duplicate_Of) are not crawled again
+    links = [ad["Link"] for ad in ads if ad.get("Link") and not ad.get("Duplicate_Of")]
+    skipped = sum(1 for ad in ads if ad.get("Duplicate_Of"))
+    if skipped:
+        print(f"Skipped {skipped} near-duplicate listings")
+
+    detail_parts = []
+    for shard, part in enumerate(partition(links, shards)):
+        links_file = shard_file(AUTOP_LINKS_FILE, shard)
+        write_links(part, links_file)
+        detail_parts.append({"input_file": links_file})
+
+    if detail_parts:
+        files, detail_reports = run_shards("autoplius", detail_parts, AUTOP_OUTPUT_FILE, settings_overrides)
+        reports += detail_reports
+        details = merge_jsonl(files, AUTOP_OUTPUT_FILE, "Id")
+        print(f"Merged {details} Autoplius ads into {AUTOP_OUTPUT_FILE}")
+
+    print("\n--- Shard throughput ---")
+    for report in reports:
+        print(f"{report['spider']:<10} shard {report['shard']}: {report['items']} items, "
+              f"{report['requests']} requests in {report['runtime']}s ({report['items_per_sec']} items/s)")
+    return reports
+
+
+def print_price_drops(min_drop_pct):
+    """Listings whose price dropped at least min_drop_pct percent in the last 7 days."""
+    store = ListingsStore(LISTINGS_STORE_FILE)
+    drops = store.price_drops(min_drop_pct, limit=None)
+    store.close()
+
+    print(f"{len(drops)} listings dropped more than {min_drop_pct}% this week")
+    for drop in drops:
+        print(f"{drop['site']:<10} {drop['item_id']:<12} {drop['old_price']} -> {drop['price_eur']} € "
+              f"(-{drop['drop_pct']}%) {drop['title']} {drop['link']}")
+
+
 if __name__ == "__main__":
+    # python3 main.py --price-drops 10 -> listings 10% cheaper than a week ago, no crawl
+    if "--price-drops" in sys.argv:
+        print_price_drops(float(sys.argv[sys.argv.index("--price-drops") + 1]))
+        sys.exit()
+
     print("Starting crawlers...")
 
+    # python3 main.py --incremental -> only new or changed Skelbiu ads,
+    # pages unchanged since previous crawl are not downloaded again
+    incremental = "--incremental" in sys.argv
+    started_at = time.monotonic()
+
+    # python3 main.py --shards 4 -> categories and ad links split between 4 processes
+    if "--shards" in sys.argv:
+        shards = int(sys.argv[sys.argv.index("--shards") + 1])
+        run_sharded(shards, incremental, settings_overrides={"CONDITIONAL_REQUESTS_ENABLED": incremental})
+        print(f"All crawlers finished in {time.monotonic() - started_at:.1f}s.")
+        sys.exit()
+
     settings = get_project_settings()
+    settings.set("CONDITIONAL_REQUESTS_ENABLED", incremental)
     process = CrawlerProcess(settings)
 
-    process.crawl(SkelbiuAutoSpider)
-    process.crawl(AutopliusSpider)
+    # python3 main.py --sequential -> Autoplius starts after Skelbiu finished
+    if "--sequential" in sys.argv:
+        run_sequential(process, incremental)
+    else:
+        run_pipelined(process, incremental)
 
-    process.start()
-    print("All crawlers finished.")
+    print(f"All crawlers finished in {time.monotonic() - started_at:.1f}s.")
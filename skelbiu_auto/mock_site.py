@@ -0,0 +1,331 @@
+import hashlib
+import sys
+import threading
+import zlib
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CATEGORY_PATH = "/skelbimai/transportas/automobiliai/audi/a4-allroad/"
+CATEGORY_PREFIX = "/skelbimai/transportas/automobiliai/"
+
+AUTOPLIUS_PARAMETERS = [
+    ("Pirma registracija", "2011-12"),
+    ("Rida", "212 000 km"),
+    ("Variklis", "2000 cm³, 143 AG (105kW)"),
+    ("Kuro tipas", "Dyzelinas"),
+    ("Kėbulo tipas", "Universalas"),
+    ("Durų skaičius", "4/5"),
+    ("Varantieji ratai", "Visi varantys (4х4)"),
+    ("Pavarų dėžė", "Automatinė"),
+    ("Klimato valdymas", "Klimato kontrolė"),
+    ("Spalva", "Pilka"),
+    ("Tech. apžiūra iki", "2026-05"),
+    ("Ratlankių skersmuo", "R18"),
+    ("Nuosava masė, kg", "1720"),
+    ("Sėdimų vietų skaičius", "5"),
+    ("Euro standartas", "Euro 5"),
+    ("CO₂ emisija, g/km", "159"),
+    ("Taršos mokestis", "136 €"),
+    ("Mieste", "7,5 l/100 km"),
+    ("Užmiestyje", "5,1 l/100 km"),
+    ("Vidutinės", "6,0 l/100 km"),
+]
+
+AUTOPLIUS_FEATURES = {
+    "Salonas": ["Šildomos sėdynės", "Odinis salonas", "Elektra reguliuojamos sėdynės"],
+    "Saugumas": ["ESP", "Lietaus jutiklis", "Parkavimo jutikliai"],
+    "Multimedija": ["Navigacija", "Bluetooth", "USB jungtis"],
+}
+
+
+def category_id_base(category_path: str) -> int:
+    """First Item_ID of a category, a4-allroad keeps 1000000 so IDs stay short in examples."""
+    if category_path == CATEGORY_PATH:
+        return 1000000
+    return 2000000 + (zlib.crc32(category_path.encode()) % 1000) * 10000
+
+
+def mock_car(item_id: int, duplicate_every: int = 0) -> dict:
+    """
+    Car of an ad, every ad is a different car except every
+    `duplicate_every`-th ad, a repost of the previous ad's car.
+    Returns:
+        dict: car_id, year, mileage (km) and price
+    """
+    car_id = item_id - 1 if duplicate_every and item_id % duplicate_every == 0 else item_id
+    seed = int(hashlib.md5(str(car_id).encode()).hexdigest(), 16)
+    return {
+        "car_id": car_id,
+        "year": 2005 + seed % 18,
+        "mileage": 20000 + (seed >> 8) % 330000,
+        "price": 1500 + (seed >> 32) % 40000,
+    }
+
+
+def format_mileage(mileage: int) -> str:
+    return f"{mileage:,} km".replace(",", " ")
+
+
+def listing_html(ads_total: int, page: int, prices: dict, base_url: str,
+                 ads_per_page: int = 24, padding: int = 0, id_base: int = 1000000,
+                 duplicate_every: int = 0) -> str:
+    """
+    Build Skelbiu category page with the same markup the spider parses.
+    Args:
+        ads_total: Total number of ads in the category
+        page: Page number, 1 based
+        prices: Item_ID -> price overrides, default price is the mock_car() price
+        base_url: Server base URL used for ad links
+        ads_per_page: Ads shown on one page
+        padding: Extra bytes of markup, to get page size close to the real site
+        id_base: Item_ID offset of the category
+        duplicate_every: Every n-th ad is a repost (mock_car())
+    Returns:
+        str: HTML page
+    """
+    first = (page - 1) * ads_per_page
+    ads = []
+    for position in range(first, min(first + ads_per_page, ads_total)):
+        item_id = id_base + ads_total - position
+        car = mock_car(item_id, duplicate_every)
+        price = prices.get(item_id, car["price"])
+        ads.append(
+            f'<a class="gallery-item-element-link js-cfuser-link" '
+            f'href="{base_url}/autoplius/skelbimai/audi-a4-allroad-{item_id}.html" data-item-id="{item_id}">'
+            f'<h3>Audi A4 allroad, 3.0 l., universalas</h3><img src="{base_url}/img/{car["car_id"]}.jpg"/>'
+            f'<div class="info-line">Kaunas, rugsėjo 30 d.</div><div class="price">{price} €</div>'
+            f'<div class="params"><span class="param">{car["year"]} m.</span><span class="param">Dyzelinas</span>'
+            f'<span class="param">3.0 l.</span><span class="param">{format_mileage(car["mileage"])}</span>'
+            f'</div></a>'
+        )
+    return (
+        f'<html><head><title>Audi A4 allroad</title></head><body>'
+        f'<ul><li class="change-and-submit active"><span>({ads_total})</span></li></ul>'
+        f'{"".join(ads)}<div class="footer">{"x" * padding}</div></body></html>'
+    )
+
+
+def autoplius_html(item_id: int, price: int, padding: int = 0, car: dict = None) -> str:
+    """
+    Build Autoplius ad page with all parameter and feature rows.
+    Args:
+        item_id: Ad ID
+        price: Ad price
+        padding: Extra bytes of markup
+        car: mock_car() of the ad, first registration and mileage of the page
+    Returns:
+        str: HTML page
+    """
+    parameters = dict(AUTOPLIUS_PARAMETERS)
+    if car:
+        parameters["Pirma registracija"] = f"{car['year']}-06"
+        parameters["Rida"] = format_mileage(car["mileage"])
+    rows = "".join(
+        f'<div class="parameter-row"><div class="parameter-label">{label}</div>'
+        f'<div class="parameter-value">{value}</div></div>'
+        for label, value in parameters.items()
+    )
+    features = "".join(
+        f'<div class="feature-row"><div class="feature-label">{label}</div><div class="feature-list">'
+        + "".join(f'<span class="feature-item">{item}</span>' for item in items)
+        + '</div></div>'
+        for label, items in AUTOPLIUS_FEATURES.items()
+    )
+    return (
+        f'<html><head><title>Audi A4 allroad, 2011 | A{item_id}</title></head><body>'
+        f'<div class="price">{price} €</div><span class="announcement-id">ID: {item_id}</span>'
+        f'<div class="js-phone-number">+370 600 00000</div>'
+        f'<div class="announcement-description">Parduodamas tvarkingas automobilis.\r\n'
+        f'Keista alyva, nauji stabdžiai.</div>'
+        f'{rows}{features}<div class="footer">{"x" * padding}</div></body></html>'
+    )
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    """
+    Serves Skelbiu category pages and Autoplius ad pages after a configurable
+    delay. Sends ETag and Last-Modified and answers conditional requests
+    with 304 when server.validators is True.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            in_flight = server.in_flight
+        try:
+            self.answer(server, in_flight)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def answer(self, server, in_flight):
+        if server.capacity and in_flight > 2 * server.capacity:
+            # Overloaded server sheds requests
+            with server.lock:
+                server.overload_count += 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        latency = server.latency_for(self.path)
+        if server.capacity:
+            # Requests above capacity queue behind each other
+            latency *= max(1.0, in_flight / server.capacity)
+        time.sleep(latency)
+
+        path = self.path.split("?")[0]
+        if path.startswith("/autoplius/"):
+            item_id = int(path.rsplit("-", 1)[1].split(".")[0])
+            car = mock_car(item_id, server.duplicate_every)
+            body = autoplius_html(item_id, server.prices.get(item_id, car["price"]), server.padding, car)
+        elif path.startswith(CATEGORY_PREFIX):
+            category, _, last = path.rstrip("/").rpartition("/")
+            if last.isdigit():
+                page = int(last)
+            else:
+                category, page = path.rstrip("/"), 1
+            body = listing_html(server.ads_total, page, server.prices, server.base_url,
+                                padding=server.padding, id_base=category_id_base(category + "/"),
+                                duplicate_every=server.duplicate_every)
+        else:
+            self.send_error(404)
+            return
+
+        if server.should_fail():
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        payload = body.encode("utf-8")
+        etag = '"' + hashlib.md5(payload).hexdigest() + '"'
+
+        if server.validators and self.headers.get("If-None-Match") == etag:
+            with server.lock:
+                server.not_modified_count += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        with server.lock:
+            server.bytes_sent += len(payload)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        if server.validators:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(server.started_at, usegmt=True))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockSite(ThreadingHTTPServer):
+    """
+    Local stand-in for skelbiu.lt and autoplius.lt.
+
+    Attributes
+    ----------
+    prices : dict
+        Item_ID -> price overrides, change them between crawls to simulate
+        price updates.
+    latency : float
+        Seconds to wait before answering each request.
+    latency_by_prefix : dict
+        Path prefix -> latency override, e.g. slower ad pages.
+    error_rate : float
+        Share of requests answered with 503.
+    capacity : int | None
+        Concurrent requests the server handles at base latency. Above it
+        latency grows proportionally, above twice the capacity requests
+        are answered with 503.
+    duplicate_every : int
+        Every n-th ad is a repost of the previous ad's car (0 - none).
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, ads_total=120, latency=0.05, validators=True, padding=20000,
+                 error_rate=0.0, capacity=None, duplicate_every=0):
+        super().__init__(("127.0.0.1", 0), MockSiteHandler)
+        self.base_url = f"http://127.0.0.1:{self.server_port}"
+        self.ads_total = ads_total
+        self.latency = latency
+        self.latency_by_prefix = {}
+        self.validators = validators
+        self.padding = padding
+        self.error_rate = error_rate
+        self.capacity = capacity
+        self.duplicate_every = duplicate_every
+        self.prices = {}
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+        self.not_modified_count = 0
+        self.overload_count = 0
+        self.in_flight = 0
+        self.bytes_sent = 0
+
+    @property
+    def category_url(self):
+        return self.base_url + CATEGORY_PATH
+
+    def category_urls(self, count):
+        """URLs of `count` different categories with ads_total ads each."""
+        return [f"{self.base_url}{CATEGORY_PREFIX}mock/model-{index}/" for index in range(count)]
+
+    def latency_for(self, path):
+        for prefix, latency in self.latency_by_prefix.items():
+            if path.startswith(prefix):
+                return latency
+        return self.latency
+
+    def should_fail(self):
+        """Count request, fail it when error budget grows, so error rate is deterministic."""
+        with self.lock:
+            self.request_count += 1
+            if int(self.request_count * self.error_rate) > self.error_count:
+                self.error_count += 1
+                return True
+            return False
+
+    def reset_counters(self):
+        with self.lock:
+            self.request_count = 0
+            self.error_count = 0
+            self.not_modified_count = 0
+            self.overload_count = 0
+            self.bytes_sent = 0
+
+    def handle_error(self, request, client_address):
+        # Killed crawler resets its connections, not an error of the site
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+def start_mock_site(**kwargs) -> MockSite:
+    """
+    Start local mock site in a background thread.
+    Args:
+        **kwargs: Passed to MockSite (ads_total, latency, validators, padding,
+            error_rate, capacity, duplicate_every)
+    Returns:
+        MockSite: Running server, category URL is server.category_url,
+            call .shutdown() when done.
+    """
+    server = MockSite(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server